@@ -0,0 +1,135 @@
+"""
+Agent pool for reusing configured ReAct agents across learning path generations
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Any, Callable, Dict, List
+
+PoolKey = Tuple[str, str, str, str]
+
+
+def fingerprint_api_key(google_api_key: str) -> str:
+    """Return a short, non-reversible fingerprint of an API key."""
+    return hashlib.sha256((google_api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def make_pool_key(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None
+) -> PoolKey:
+    """Build the pool key for an API key and Pipedream URL combination."""
+    return (
+        fingerprint_api_key(google_api_key),
+        (youtube_pipedream_url or "").strip(),
+        (drive_pipedream_url or "").strip(),
+        (notion_pipedream_url or "").strip(),
+    )
+
+
+@dataclass
+class PooledAgent:
+    """A ready-to-use agent with the tools, models (by tier) and status report from its setup."""
+    agent: Any
+    status_report: Dict[str, Any]
+    tools: List[Any] = field(default_factory=list)
+    models: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class AgentPool:
+    """
+    Thread-safe LRU pool of agents with TTL expiry and health checks.
+    Entries are evicted when they expire, fail a health check, are explicitly
+    invalidated, or when the pool grows beyond max_size.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        ttl_seconds: float = 1800,
+        health_check: Optional[Callable[[PooledAgent], bool]] = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.health_check = health_check or default_health_check
+        self._entries: "OrderedDict[PoolKey, PooledAgent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: PoolKey) -> Optional[PooledAgent]:
+        """Return a healthy pooled agent for the key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            if self._is_expired(entry) or not self._is_healthy(entry):
+                del self._entries[key]
+                self._stats["evictions"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+            self._stats["hits"] += 1
+            return entry
+
+    def put(
+        self,
+        key: PoolKey,
+        agent: Any,
+        status_report: Dict[str, Any],
+        tools: Optional[List[Any]] = None,
+        models: Optional[Dict[str, Any]] = None
+    ) -> PooledAgent:
+        """Store an agent under the key, evicting least recently used entries."""
+        entry = PooledAgent(agent=agent, status_report=status_report, tools=tools or [], models=models or {})
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return entry
+
+    def invalidate(self, key: Optional[PoolKey] = None) -> int:
+        """Drop one entry, or every entry when no key is given. Returns the count removed."""
+        with self._lock:
+            if key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(key, None) is not None else 0
+            self._stats["evictions"] += removed
+            return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current pool size."""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+    def _is_expired(self, entry: PooledAgent) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _is_healthy(self, entry: PooledAgent) -> bool:
+        try:
+            return bool(self.health_check(entry))
+        except Exception as e:
+            print(f"Agent pool health check failed: {str(e)}")
+            return False
+
+
+def default_health_check(entry: PooledAgent) -> bool:
+    """An agent is healthy if its setup found YouTube tools and reported no errors."""
+    report = entry.status_report
+    return entry.agent is not None and report.get("youtube_available", False) and not report.get("errors")
@@ -1,6 +1,17 @@
-import streamlit as st
-from utils import run_agent_sync, format_learning_path_result, validate_url
 import time
+_script_started = time.perf_counter()
+
+import streamlit as st
+from utils import (
+    start_generation_job, get_generation_job, cancel_generation_job, start_warm_up, get_history_store,
+    format_learning_path_result, validate_url, invalidate_agent_pool, start_server_probe,
+    get_server_probe_status, server_probes, start_revision_job
+)
+from agent_pool import fingerprint_api_key
+from config import JOB_CONFIG, STARTUP_CONFIG, HISTORY_CONFIG, TOOL_CONFIG, PROBE_CONFIG, PIPELINE_CONFIG
+from learning_path import LearningPath
+from jobs import JobLimitExceeded
+from progress import ProgressEvent
 
 st.set_page_config(
     page_title="MCP Learning Path Generator", 
@@ -78,8 +89,18 @@ if 'is_generating' not in st.session_state:
     st.session_state.is_generating = False
 if 'status_report' not in st.session_state:
     st.session_state.status_report = {}
-if 'result_history' not in st.session_state:
-    st.session_state.result_history = []
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'job_goal' not in st.session_state:
+    st.session_state.job_goal = ""
+if 'job_owner' not in st.session_state:
+    st.session_state.job_owner = ""
+if 'current_path' not in st.session_state:
+    st.session_state.current_path = None
+if 'current_goal' not in st.session_state:
+    st.session_state.current_goal = ""
 
 # Sidebar for configuration
 with st.sidebar:
@@ -140,26 +161,50 @@ with st.sidebar:
         drive_pipedream_url = None
         notion_pipedream_url = None
     
-    # Status display
-    if st.session_state.status_report:
+    # Probe the servers in the background as soon as their URLs are entered
+    if PROBE_CONFIG["enabled"]:
+        start_server_probe(youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url)
+    probe_status = get_server_probe_status(youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url)
+    
+    # Status display: live probe results, else the last generation's status report
+    if probe_status or st.session_state.status_report:
         st.markdown("---")
         st.subheader("📊 Tool Status")
         
         status = st.session_state.status_report
-        if status.get("youtube_available"):
-            st.markdown('<span class="tool-status tool-available">✅ YouTube</span>', unsafe_allow_html=True)
-        else:
-            st.markdown('<span class="tool-status tool-unavailable">❌ YouTube</span>', unsafe_allow_html=True)
-            
-        if status.get("drive_available"):
-            st.markdown('<span class="tool-status tool-available">✅ Drive</span>', unsafe_allow_html=True)
-        elif secondary_tool == "Drive":
-            st.markdown('<span class="tool-status tool-unavailable">❌ Drive</span>', unsafe_allow_html=True)
-            
-        if status.get("notion_available"):
-            st.markdown('<span class="tool-status tool-available">✅ Notion</span>', unsafe_allow_html=True)
-        elif secondary_tool == "Notion":
-            st.markdown('<span class="tool-status tool-unavailable">❌ Notion</span>', unsafe_allow_html=True)
+        for server, label in (("youtube", "YouTube"), ("drive", "Drive"), ("notion", "Notion")):
+            probe = probe_status.get(server)
+            if probe and probe["status"] == "pending":
+                st.markdown(f'<span class="tool-status">⏳ {label}</span>', unsafe_allow_html=True)
+            elif probe and probe["status"] == "ok":
+                st.markdown(
+                    f'<span class="tool-status tool-available">✅ {label} · {probe["latency_ms"]:.0f} ms</span>',
+                    unsafe_allow_html=True
+                )
+            elif probe:
+                st.markdown(f'<span class="tool-status tool-unavailable">❌ {label}</span>', unsafe_allow_html=True)
+                st.caption(probe["error"])
+            elif status.get(f"{server}_available"):
+                st.markdown(f'<span class="tool-status tool-available">✅ {label}</span>', unsafe_allow_html=True)
+            elif server == "youtube" or secondary_tool == label:
+                st.markdown(f'<span class="tool-status tool-unavailable">❌ {label}</span>', unsafe_allow_html=True)
+
+        if st.button("♻️ Reconnect Tools", help="Discard the cached agent and connections and rediscover tools on the next run"):
+            invalidate_agent_pool(
+                google_api_key, youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url,
+                close_connections=True
+            )
+            st.session_state.status_report = {}
+            st.rerun()
+
+# Import the generation dependencies in the background while the form is filled in,
+# and create the model client as soon as a plausible API key has been entered
+if STARTUP_CONFIG["warm_up"]:
+    warm_key = google_api_key if google_api_key and google_api_key.startswith("AI") else ""
+    warm_fingerprint = fingerprint_api_key(warm_key) if warm_key else ""
+    if st.session_state.get("warm_up_fingerprint") != warm_fingerprint:
+        st.session_state.warm_up_fingerprint = warm_fingerprint
+        start_warm_up(warm_key or None)
 
 # Main content area
 st.header("🎯 Enter Your Learning Goal")
@@ -195,59 +240,205 @@ user_goal = st.text_area(
     help="Describe your learning goal in detail. Be specific about the topic and timeframe."
 )
 
-# Progress area
-progress_container = st.container()
+# Offer the latest saved learning path for the same goal before generating it again
+if user_goal.strip():
+    goal_owner = fingerprint_api_key(google_api_key)
+    earlier = get_history_store().find(goal_owner, user_goal, limit=1)
+    if earlier:
+        timestamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(earlier[0]["created_at"]))
+        with st.expander(f"📜 You already generated a learning path for this goal on {timestamp}"):
+            if st.toggle("Show learning path", key=f"show_earlier_{earlier[0]['id']}"):
+                payload = get_history_store().get(goal_owner, earlier[0]["id"])
+                if payload is not None:
+                    st.markdown(format_learning_path_result({"learning_path": LearningPath.from_dict(payload)}))
+
+generation_engine = st.radio(
+    "🧠 Generation engine:",
+    ["Step-by-step agent", "Parallel planner"],
+    horizontal=True,
+    help="The parallel planner plans all days in one call and researches their videos concurrently, which is faster for long goals"
+)
+
+stream_output = st.checkbox(
+    "⚡ Stream output live",
+    value=True,
+    disabled=generation_engine == "Parallel planner",
+    help="Show the model's output and tool calls as they happen instead of waiting for the full run"
+)
+
+refresh_cache = st.checkbox(
+    "🔄 Regenerate (bypass cache)",
+    value=False,
+    help="Ignore any cached learning path for this goal and generate a fresh one"
+)
+
+# Progress area: one live bar and one status line, repainted in place
 progress_bar = st.empty()
+progress_status = st.empty()
+
+PHASE_LABELS = {
+    "setup": "Setup",
+    "integration": "Integration",
+    "tools": "Tools",
+    "agent": "Agent",
+    "mode": "Mode",
+    "generation": "Generation",
+    "complete": "Complete"
+}
 
-def update_progress(message: str):
-    """Update progress in the Streamlit UI with enhanced feedback"""
-    st.session_state.current_step = message
+def render_progress(event: ProgressEvent):
+    """Repaint the progress widgets from a structured progress event"""
+    st.session_state.current_step = event.message
+    st.session_state.progress = event.fraction
+    st.session_state.last_section = event.phase
     
-    # Determine section and update progress
-    if "Setting up agent with tools" in message:
-        section = "Setup"
-        st.session_state.progress = 0.1
-    elif "Added Google Drive integration" in message or "Added Notion integration" in message:
-        section = "Integration"
-        st.session_state.progress = 0.2
-    elif "Creating AI agent" in message:
-        section = "Setup"
-        st.session_state.progress = 0.3
-    elif "Available tools" in message:
-        section = "Tools"
-        st.session_state.progress = 0.4
-    elif "Using full learning path generation" in message or "Using YouTube-only learning path generation" in message:
-        section = "Mode"
-        st.session_state.progress = 0.5
-    elif "Generating your learning path" in message:
-        section = "Generation"
-        st.session_state.progress = 0.6
-    elif "Learning path generation complete" in message:
-        section = "Complete"
-        st.session_state.progress = 1.0
-        st.session_state.is_generating = False
+    section = PHASE_LABELS.get(event.phase, "Progress")
+    progress_bar.progress(min(event.fraction, 1.0), text=f"**{section}** · {event.message.replace('✅', '').strip()}")
+    
+    if event.phase == "complete":
+        progress_status.success("🎉 All steps completed!")
+    elif event.phase == "generation" and event.step:
+        remaining = f", ~{event.estimated_remaining_steps} steps left" if event.estimated_remaining_steps else ""
+        progress_status.caption(f"⚡ Step {event.step} · {event.tools_called} tool calls{remaining}")
     else:
-        section = st.session_state.last_section or "Progress"
+        progress_status.caption(f"🔄 {section}")
+
+def render_job_output(job):
+    """Show the model output and tool calls a streaming job has produced so far"""
+    streamed_text = ""
+    tool_calls = []
+    for event in list(job.events):
+        if event["type"] == "token":
+            streamed_text += event["text"]
+        elif event["type"] == "tool_start":
+            tool_calls.append(event["name"])
+            streamed_text += "\n\n"
     
-    st.session_state.last_section = section
+    if tool_calls:
+        with st.status(f"🛠️ Calling {tool_calls[-1]}...", expanded=False, state="running"):
+            for name in tool_calls:
+                st.write(f"🔎 `{name}`")
+    if streamed_text.strip():
+        st.markdown(streamed_text + " ▌")
+
+def render_performance_panel(performance: dict, prompt_report: dict = None):
+    """Show per-phase timings, prompt token cost and individual spans in a collapsible panel"""
+    with st.expander(f"⏱️ Performance ({performance['total_ms'] / 1000:.1f}s total)", expanded=False):
+        if prompt_report:
+            dropped = f", dropped: {', '.join(prompt_report['dropped'])}" if prompt_report["dropped"] else ""
+            st.caption(
+                f"📝 Prompt: ~{prompt_report['tokens']} tokens ({prompt_report['mode']} mode{dropped}), "
+                f"~{prompt_report.get('run_tokens', prompt_report['tokens'])} tokens across "
+                f"{prompt_report.get('llm_turns', 1)} model turns"
+            )
+        st.markdown("**Phases**")
+        st.table([
+            {"Phase": name, "Count": phase["count"], "Total (ms)": phase["total_ms"]}
+            for name, phase in sorted(performance["phases"].items(), key=lambda item: -item[1]["total_ms"])
+        ])
+        tool_spans = [s for s in performance["spans"] if s["name"] == "tool_call"]
+        if tool_spans:
+            st.markdown("**Tool calls**")
+            st.table([
+                {
+                    "Tool": s["attributes"].get("tool"),
+                    "Server": s["attributes"].get("server"),
+                    "Duration (ms)": s["duration_ms"],
+                    "Response (bytes)": s["attributes"].get("response_bytes"),
+                    "Status": s["status"]
+                }
+                for s in tool_spans
+            ])
+
+def show_learning_path(result: dict, goal: str, owner: str):
+    """Display a finished generation and add it to the history"""
+    # Store status report
+    if "status_report" in result:
+        st.session_state.status_report = result["status_report"]
     
-    # Show progress bar
-    progress_bar.progress(st.session_state.progress)
+    # Display results
+    st.header("📚 Your Learning Path")
     
-    # Update progress container with current status
-    with progress_container:
-        # Show section header if it changed
-        if section != st.session_state.last_section and section != "Complete":
-            st.write(f"**{section}**")
+    if result and "learning_path" in result:
+        # Format and display the result
+        formatted_result = format_learning_path_result(result)
         
-        # Show message with appropriate icon
-        if message == "Learning path generation complete!":
-            st.success("🎉 All steps completed!")
-        elif "✅" in message:
-            st.info(f"✅ {message.replace('✅', '').strip()}")
-        else:
-            prefix = "🔄" if st.session_state.progress < 0.5 else "⚡"
-            st.write(f"{prefix} {message}")
+        # Display in a nice format
+        st.markdown(formatted_result)
+        
+        # Add to history
+        get_history_store().add(owner, goal, result["learning_path"].to_dict())
+        st.session_state.history_page = 0
+        # Keep the path so individual days can be regenerated or added later
+        st.session_state.current_path = result["learning_path"] if result["learning_path"].days else None
+        st.session_state.current_goal = goal
+        
+        # Show success message
+        st.success("🎉 Learning path generated successfully!")
+        if result.get("status_report", {}).get("cache_hit"):
+            st.caption("⚡ Served from cache. Tick 'Regenerate (bypass cache)' for a fresh path.")
+        if result.get("status_report", {}).get("deduplicated"):
+            st.caption("🤝 An identical generation was already running, so its result was shared.")
+        revision = result.get("status_report", {}).get("revision")
+        if revision:
+            changed = []
+            if revision["regenerated"]:
+                changed.append(f"regenerated day {', '.join(map(str, revision['regenerated']))}")
+            if revision["added"]:
+                changed.append(f"added day {', '.join(map(str, revision['added']))}")
+            st.caption(
+                f"✏️ {'; '.join(changed).capitalize()} (~{revision['prompt_tokens']} prompt tokens, "
+                f"{revision['searches']} searches); the other {revision['days_summarized']} days were kept."
+            )
+        governor = result.get("status_report", {}).get("governor")
+        if governor and governor["stopped"]:
+            if "revision" in result["status_report"]:
+                st.warning(f"⏱️ Update stopped early ({governor['stop_reason']}); the learning path is unchanged.")
+            else:
+                st.warning(f"⏱️ Generation stopped early ({governor['stop_reason']}); showing a partial learning path.")
+        degraded = result.get("status_report", {}).get("degraded")
+        if degraded:
+            names = ", ".join(TOOL_CONFIG[server]["name"] for server in degraded)
+            st.warning(f"⚠️ {names} unavailable; generated a YouTube-only learning path instead.")
+        
+        # Show tool status
+        if st.session_state.status_report:
+            st.info(f"**Tools Used:** {', '.join(st.session_state.status_report.get('available_tools', []))}")
+            tool_cache = st.session_state.status_report.get("tool_cache")
+            if tool_cache and (tool_cache["hits"] or tool_cache["misses"]):
+                st.caption(f"🗂️ Tool cache: {tool_cache['hits']} hits, {tool_cache['misses']} misses")
+            compaction = st.session_state.status_report.get("compaction")
+            if compaction and compaction["tokens_saved"]:
+                st.caption(
+                    f"🗜️ Context compaction saved ~{compaction['tokens_saved']} tokens "
+                    f"over {compaction['turns']} model turns"
+                )
+            connections = st.session_state.status_report.get("connections")
+            if connections and connections["requests"]:
+                st.caption(
+                    f"🔌 MCP connections: {connections['opened']} opened, {connections['reused']} reused, "
+                    f"{connections.get('sessions', 0)} sessions started"
+                )
+            resilience = st.session_state.status_report.get("resilience")
+            if resilience and (resilience["retries"] or resilience["hedges"]):
+                st.caption(
+                    f"🛟 Recovered from slow or failed tool calls: {resilience['retries']} retries, "
+                    f"{resilience['hedges']} hedged requests"
+                )
+            tool_selection = st.session_state.status_report.get("tool_selection")
+            if tool_selection and tool_selection["schema_tokens_removed"]:
+                st.caption(
+                    f"🧰 Bound {tool_selection['selected']} of {tool_selection['discovered']} tools, "
+                    f"~{tool_selection['schema_tokens_removed']} fewer schema tokens per model turn"
+                )
+        
+        # Show where the time went
+        performance = st.session_state.status_report.get("performance")
+        if performance:
+            render_performance_panel(performance, st.session_state.status_report.get("prompt"))
+        
+    else:
+        st.error("❌ No results were generated. Please try again.")
 
 # Generate button with enhanced validation
 col1, col2, col3 = st.columns([1, 2, 1])
@@ -288,74 +479,144 @@ if generate_button:
         for error in validation_errors:
             st.error(error)
     else:
+        generation_kwargs = {
+            "google_api_key": google_api_key,
+            "youtube_pipedream_url": youtube_pipedream_url,
+            "drive_pipedream_url": drive_pipedream_url,
+            "notion_pipedream_url": notion_pipedream_url,
+            "user_goal": user_goal,
+            "refresh_cache": refresh_cache
+        }
+        stream_job = stream_output and generation_engine == "Step-by-step agent"
+        if not stream_job:
+            generation_kwargs["engine"] = "pipeline" if generation_engine == "Parallel planner" else "react"
+        
         try:
-            # Set generating flag
+            # Run the agent off the script thread; the page polls the job below
+            st.session_state.job_id = start_generation_job(stream=stream_job, **generation_kwargs)
+            st.session_state.job_goal = user_goal
+            st.session_state.job_owner = fingerprint_api_key(google_api_key)
             st.session_state.is_generating = True
             
             # Reset progress
             st.session_state.current_step = ""
             st.session_state.progress = 0
             st.session_state.last_section = ""
-            
-            # Run the agent
-            result = run_agent_sync(
-                google_api_key=google_api_key,
-                youtube_pipedream_url=youtube_pipedream_url,
-                drive_pipedream_url=drive_pipedream_url,
-                notion_pipedream_url=notion_pipedream_url,
-                user_goal=user_goal,
-                progress_callback=update_progress
+            st.rerun()
+        except JobLimitExceeded as e:
+            st.error(f"❌ {str(e)}")
+
+# Poll the running generation, or show it once it has finished
+poll_job = False
+if st.session_state.job_id:
+    job = get_generation_job(st.session_state.job_id)
+    progress_events = [event["event"] for event in list(job.events) if event["type"] == "progress"] if job else []
+    if progress_events:
+        render_progress(progress_events[-1])
+    
+    if job is None or job.done:
+        st.session_state.job_id = None
+        st.session_state.is_generating = False
+    
+    if job is None:
+        st.error("❌ The generation was lost, possibly because the app restarted. Please try again.")
+    elif not job.done:
+        if job.status == "queued":
+            progress_status.caption("⏳ Waiting for a free generation slot...")
+        render_job_output(job)
+        if st.button("⏹️ Cancel generation"):
+            cancel_generation_job(job.job_id)
+        poll_job = True
+    elif job.status == "succeeded":
+        show_learning_path(job.result or {}, st.session_state.job_goal, st.session_state.job_owner)
+    elif job.status == "cancelled":
+        progress_status.warning("⏹️ Generation cancelled")
+    else:
+        st.error(f"❌ An error occurred: {job.error}")
+        st.error("Please check your API keys and URLs, and try again.")
+
+
+# Regenerate individual days or extend the last learning path without generating it again
+if st.session_state.current_path is not None and not st.session_state.is_generating:
+    current_path = st.session_state.current_path
+    with st.expander("✏️ Revise this learning path"):
+        with st.form("revise_form"):
+            day_titles = {day.number: f"Day {day.number}: {day.title}" for day in current_path.days}
+            regenerate_days = st.multiselect(
+                "Regenerate days", list(day_titles), format_func=day_titles.get,
+                help="Only these days are rewritten; the others keep their content and videos"
             )
-            
-            # Store status report
-            if "status_report" in result:
-                st.session_state.status_report = result["status_report"]
-            
-            # Display results
-            st.header("📚 Your Learning Path")
-            
-            if result and "messages" in result:
-                # Format and display the result
-                formatted_result = format_learning_path_result(result)
-                
-                # Display in a nice format
-                st.markdown(formatted_result)
-                
-                # Add to history
-                st.session_state.result_history.append({
-                    "goal": user_goal,
-                    "result": formatted_result,
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
-                
-                # Show success message
-                st.success("🎉 Learning path generated successfully!")
-                
-                # Show tool status
-                if st.session_state.status_report:
-                    st.info(f"**Tools Used:** {', '.join(st.session_state.status_report.get('available_tools', []))}")
-                
-            else:
-                st.error("❌ No results were generated. Please try again.")
-                st.session_state.is_generating = False
-                
-        except Exception as e:
-            st.error(f"❌ An error occurred: {str(e)}")
-            st.error("Please check your API keys and URLs, and try again.")
-            st.session_state.is_generating = False
+            extend_days = st.number_input(
+                "Add days at the end", min_value=0,
+                max_value=max(0, PIPELINE_CONFIG["max_days"] - len(current_path.days)), value=0
+            )
+            feedback = st.text_input("What should change? (optional)", placeholder="e.g. more hands-on, shorter videos")
+            revise_button = st.form_submit_button("🔁 Update Learning Path", use_container_width=True)
+    
+    if revise_button:
+        if not regenerate_days and not extend_days:
+            st.error("❌ Choose days to regenerate or a number of days to add")
+        elif not google_api_key or not youtube_pipedream_url:
+            st.error("❌ Please enter your API key and YouTube URL")
+        else:
+            try:
+                st.session_state.job_id = start_revision_job(
+                    google_api_key=google_api_key,
+                    youtube_pipedream_url=youtube_pipedream_url,
+                    drive_pipedream_url=drive_pipedream_url,
+                    notion_pipedream_url=notion_pipedream_url,
+                    user_goal=st.session_state.current_goal,
+                    learning_path=current_path,
+                    regenerate_days=regenerate_days,
+                    extend_days=int(extend_days),
+                    feedback=feedback
+                )
+                st.session_state.job_goal = st.session_state.current_goal
+                st.session_state.job_owner = fingerprint_api_key(google_api_key)
+                st.session_state.is_generating = True
+                st.session_state.current_step = ""
+                st.session_state.progress = 0
+                st.session_state.last_section = ""
+                st.rerun()
+            except JobLimitExceeded as e:
+                st.error(f"❌ {str(e)}")
 
-# History section
-if st.session_state.result_history:
+# History section: one page of titles per rerun; a learning path is only loaded when opened
+history_store = get_history_store()
+history_owner = fingerprint_api_key(google_api_key)
+history_total = history_store.count(history_owner)
+if history_total:
     st.markdown("---")
     st.header("📜 Previous Learning Paths")
     
-    for i, history_item in enumerate(reversed(st.session_state.result_history)):
-        with st.expander(f"🎯 {history_item['goal']} - {history_item['timestamp']}"):
-            st.markdown(history_item['result'])
+    page_size = HISTORY_CONFIG["page_size"]
+    page_count = (history_total + page_size - 1) // page_size
+    st.session_state.history_page = min(st.session_state.history_page, page_count - 1)
+    
+    for history_item in history_store.page(history_owner, st.session_state.history_page * page_size, page_size):
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(history_item["created_at"]))
+        with st.expander(f"🎯 {history_item['goal']} - {timestamp}"):
+            if st.toggle("Show learning path", key=f"show_{history_item['id']}"):
+                payload = history_store.get(history_owner, history_item["id"])
+                if payload is not None:
+                    st.markdown(format_learning_path_result({"learning_path": LearningPath.from_dict(payload)}))
             
             # Add delete button
-            if st.button(f"🗑️ Delete", key=f"delete_{i}"):
-                st.session_state.result_history.pop(len(st.session_state.result_history) - 1 - i)
+            if st.button(f"🗑️ Delete", key=f"delete_{history_item['id']}"):
+                history_store.delete(history_owner, history_item["id"])
+                st.rerun()
+    
+    if page_count > 1:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("◀ Newer", disabled=st.session_state.history_page == 0, use_container_width=True):
+                st.session_state.history_page -= 1
+                st.rerun()
+        with page_col:
+            st.caption(f"Page {st.session_state.history_page + 1} of {page_count} · {history_total} learning paths")
+        with next_col:
+            if st.button("Older ▶", disabled=st.session_state.history_page >= page_count - 1, use_container_width=True):
+                st.session_state.history_page += 1
                 st.rerun()
 
 # Footer
@@ -366,3 +627,13 @@ st.markdown("""
     <p>Integrates with YouTube, Google Drive, and Notion for comprehensive learning experiences</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Log how long the first page render took for this session, imports included
+if 'startup_seconds' not in st.session_state:
+    st.session_state.startup_seconds = time.perf_counter() - _script_started
+    print(f"Startup: first render in {st.session_state.startup_seconds:.3f}s")
+
+# Rerun while a generation or server probe is in flight so its progress keeps updating
+if poll_job or server_probes.pending():
+    time.sleep(JOB_CONFIG["poll_interval"])
+    st.rerun()
@@ -0,0 +1,158 @@
+"""
+Headless batch generation of learning paths.
+
+Reads goals from a text file (one per line) or a JSONL file (objects with a
+"goal" field), generates them concurrently and appends one JSON line per
+finished goal to the output file. Goals already recorded as successful in the
+output file are skipped, so an interrupted batch can simply be re-run.
+
+Example:
+    python batch.py goals.txt -o learning_paths.jsonl --workers 4 --engine pipeline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Optional, Any, Dict, List, Set
+
+from cache import normalize_goal
+from utils import run_agent, format_learning_path_result, configure_rate_limits, validate_url, ENGINES
+
+
+def load_goals(path: str) -> List[str]:
+    """Load goals from a text or JSONL file, skipping blanks and # comments."""
+    goals = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                goal = json.loads(line).get("goal", "")
+            else:
+                goal = line
+            if goal.strip():
+                goals.append(goal.strip())
+    return goals
+
+
+def load_completed_goals(output_path: str) -> Set[str]:
+    """Return normalized goals that already have a successful record in the output file."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(normalize_goal(record.get("goal", "")))
+    return completed
+
+
+async def run_batch(
+    goals: List[str],
+    output_path: str,
+    workers: int,
+    agent_kwargs: Dict[str, Any]
+) -> Dict[str, int]:
+    """Generate every goal with at most `workers` in flight, appending results as they finish."""
+    semaphore = asyncio.Semaphore(workers)
+    counts = {"ok": 0, "partial": 0, "error": 0}
+    write_lock = asyncio.Lock()
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def _generate(goal: str) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                record: Dict[str, Any] = {"goal": goal}
+                try:
+                    result = await run_agent(user_goal=goal, **agent_kwargs)
+                    # Runs stopped early by the governor are retried on the next resume
+                    stopped = result.get("status_report", {}).get("governor", {}).get("stopped")
+                    record.update({
+                        "status": "partial" if stopped else "ok",
+                        "learning_path": format_learning_path_result(result),
+                        "status_report": result.get("status_report", {})
+                    })
+                except Exception as e:
+                    record.update({"status": "error", "error": str(e)})
+                record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+                record["completed_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+            async with write_lock:
+                output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                output.flush()
+                counts[record["status"]] += 1
+                print(f"[{record['status']}] {goal} ({record['elapsed_seconds']}s)")
+
+        await asyncio.gather(*(_generate(goal) for goal in goals))
+
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate learning paths for a file of goals")
+    parser.add_argument("goals_file", help="Text file with one goal per line, or JSONL with a 'goal' field")
+    parser.add_argument("-o", "--output", default="learning_paths.jsonl", help="JSONL file to append results to")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of goals generated concurrently")
+    parser.add_argument("--engine", choices=ENGINES, default="pipeline", help="Generation engine")
+    parser.add_argument("--gemini-rps", type=float, default=None, help="Max Gemini requests per second")
+    parser.add_argument("--mcp-rps", type=float, default=None, help="Max MCP tool calls per second")
+    parser.add_argument("--refresh", action="store_true", help="Bypass the result cache")
+    parser.add_argument("--google-api-key", default=os.environ.get("GOOGLE_API_KEY"))
+    parser.add_argument("--youtube-url", default=os.environ.get("YOUTUBE_PIPEDREAM_URL"))
+    parser.add_argument("--drive-url", default=os.environ.get("DRIVE_PIPEDREAM_URL"))
+    parser.add_argument("--notion-url", default=os.environ.get("NOTION_PIPEDREAM_URL"))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if not args.google_api_key:
+        print("❌ Please provide a Google AI Studio API key (--google-api-key or GOOGLE_API_KEY)")
+        return 2
+    if not args.youtube_url or not validate_url(args.youtube_url):
+        print("❌ A valid YouTube URL is required (--youtube-url or YOUTUBE_PIPEDREAM_URL)")
+        return 2
+    if args.workers < 1:
+        print("❌ --workers must be at least 1")
+        return 2
+
+    goals = load_goals(args.goals_file)
+    completed = load_completed_goals(args.output)
+    pending = []
+    seen = set(completed)
+    for goal in goals:
+        if normalize_goal(goal) not in seen:
+            seen.add(normalize_goal(goal))
+            pending.append(goal)
+    print(f"{len(goals)} goals, {len(goals) - len(pending)} already done, {len(pending)} to generate")
+
+    configure_rate_limits(args.gemini_rps, args.mcp_rps)
+    counts = asyncio.run(run_batch(
+        pending,
+        args.output,
+        args.workers,
+        agent_kwargs={
+            "google_api_key": args.google_api_key,
+            "youtube_pipedream_url": args.youtube_url,
+            "drive_pipedream_url": args.drive_url,
+            "notion_pipedream_url": args.notion_url,
+            "refresh_cache": args.refresh,
+            "engine": args.engine
+        }
+    ))
+    print(f"Done: {counts['ok']} succeeded, {counts['partial']} partial, {counts['error']} failed")
+    return 0 if counts["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+A scripted chat model that drives the agent through a realistic tool-calling run without Gemini.
+
+In the ReAct loop it issues one YouTube search per day of the goal, then the
+document/playlist calls when those tools are bound, then writes the final path.
+It also answers the pipeline engine's planning and synthesis prompts.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Optional, Any, Dict, List, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+def goal_days(text: str, default: int = 3) -> int:
+    """Read the duration out of a goal like 'learn X in 10 days' or 'in 2 weeks'."""
+    match = re.search(r"in (\d+) (day|week)", text, re.IGNORECASE)
+    if not match:
+        return default
+    count = int(match.group(1))
+    return count * 7 if match.group(2).lower() == "week" else count
+
+
+def render_learning_path(days: int) -> str:
+    sections = [
+        "# Learning Path: Benchmark Topic\n\n## Overview\n- **Goal**: Benchmark\n"
+        f"- **Duration**: {days} days\n- **Difficulty**: Beginner\n\n## Daily Breakdown"
+    ]
+    for day in range(1, days + 1):
+        sections.append(
+            f"### Day {day}: Topic {day}\n**Learning Objectives:**\n- Objective A\n- Objective B\n\n"
+            f"**Recommended Videos:**\n1. Video {day}.1 - https://www.youtube.com/watch?v=day{day}a\n"
+            f"2. Video {day}.2 - https://www.youtube.com/watch?v=day{day}b\n\n"
+            f"**Practice Exercise:**\nPractice topic {day}.\n\n**Progress Check:**\nExplain topic {day}."
+        )
+    sections.append("## Additional Resources\n- **Recommended Channels:** Channel 0")
+    return "\n\n".join(sections)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatGoogleGenerativeAI with a configurable per-turn latency."""
+
+    latency: float = 0.02
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ScriptedChatModel":
+        names = [tool["name"] if isinstance(tool, dict) else tool.name for tool in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _tool(self, *keywords: str) -> Optional[str]:
+        for name in self.tool_names:
+            if all(keyword in name.lower() for keyword in keywords):
+                return name
+        return None
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        human_index = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        prompt = messages[human_index].content if isinstance(messages[human_index].content, str) else ""
+        called = [m.name for m in messages[human_index + 1:] if isinstance(m, ToolMessage)]
+        days = goal_days(prompt)
+
+        if "Return ONLY a JSON object" in prompt:
+            return AIMessage(content=json.dumps({
+                "topic": "Benchmark Topic",
+                "difficulty": "Beginner",
+                "days": [{"day": d, "title": f"Topic {d}", "search_query": f"topic {d} tutorial"}
+                         for d in range(1, days + 1)]
+            }))
+        if "You are writing the final learning path" in prompt:
+            return AIMessage(content=render_learning_path(days))
+
+        plan: List[Dict[str, Any]] = []
+        search = self._tool("search")
+        if search and "Save the learning path below" not in prompt:
+            plan += [{"name": search, "args": {"q": f"topic {d} tutorial", "maxResults": 3}}
+                     for d in range(1, days + 1)]
+        document = self._tool("drive", "create") or self._tool("notion", "create")
+        if document:
+            plan.append({"name": document, "args": {"name": "Learning Path", "title": "Learning Path",
+                                                    "content": render_learning_path(days)}})
+        playlist = self._tool("playlist", "create")
+        if playlist and document:
+            plan.append({"name": playlist, "args": {"title": "Learning Path"}})
+
+        if len(called) < len(plan):
+            step = plan[len(called)]
+            return AIMessage(content="", tool_calls=[{**step, "id": f"call_{len(called)}"}])
+        return AIMessage(content=render_learning_path(days))
@@ -0,0 +1,152 @@
+"""
+Local streamable-HTTP MCP servers that stand in for the Pipedream YouTube, Drive and Notion apps.
+
+Each service runs on its own port in a background thread, with a configurable
+per-call latency and search payload size, and counts the calls it receives.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+
+class FakeServiceStats:
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str) -> None:
+        with self._lock:
+            self.calls[tool_name] = self.calls.get(tool_name, 0) + 1
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_youtube_server(latency: float, results_per_search: int, stats: FakeServiceStats) -> FastMCP:
+    server = FastMCP("youtube")
+
+    @server.tool(name="youtube_data_api-search-videos", description="Search YouTube for videos matching a query")
+    async def search_videos(q: str, maxResults: int = 5) -> str:
+        stats.record("youtube_data_api-search-videos")
+        await asyncio.sleep(latency)
+        items = [
+            {
+                "id": {"videoId": f"vid{abs(hash((q, i))) % 10**8:08d}"},
+                "snippet": {
+                    "title": f"{q.title()} - Part {i + 1}",
+                    "channelTitle": f"Channel {i % 4}",
+                    "description": f"A complete walkthrough of {q}. " * 8,
+                    "publishedAt": "2025-01-01T00:00:00Z",
+                    "thumbnails": {size: {"url": f"https://i.ytimg.com/{size}.jpg", "width": 480, "height": 360}
+                                   for size in ("default", "medium", "high")}
+                },
+                "contentDetails": {"duration": f"PT{10 + i}M"}
+            }
+            for i in range(min(maxResults, results_per_search))
+        ]
+        return json.dumps({"kind": "youtube#searchListResponse", "items": items})
+
+    @server.tool(name="youtube_data_api-create-playlist", description="Create a YouTube playlist")
+    async def create_playlist(title: str, description: str = "", privacyStatus: str = "public") -> str:
+        stats.record("youtube_data_api-create-playlist")
+        await asyncio.sleep(latency)
+        return json.dumps({"id": "PLfake", "url": "https://www.youtube.com/playlist?list=PLfake"})
+
+    @server.tool(name="youtube_data_api-add-playlist-items", description="Add a video to a YouTube playlist")
+    async def add_playlist_items(playlistId: str, videoIds: List[str]) -> str:
+        stats.record("youtube_data_api-add-playlist-items")
+        await asyncio.sleep(latency)
+        return json.dumps({"added": len(videoIds)})
+
+    return server
+
+
+def build_drive_server(latency: float, stats: FakeServiceStats) -> FastMCP:
+    server = FastMCP("drive")
+
+    @server.tool(name="google_drive-create-file-from-text", description="Create a Google Drive document from text")
+    async def create_document(name: str, content: str) -> str:
+        stats.record("google_drive-create-file-from-text")
+        await asyncio.sleep(latency)
+        return json.dumps({"id": "docfake", "webViewLink": "https://docs.google.com/document/d/docfake"})
+
+    return server
+
+
+def build_notion_server(latency: float, stats: FakeServiceStats) -> FastMCP:
+    server = FastMCP("notion")
+
+    @server.tool(name="notion-create-page", description="Create a Notion page")
+    async def create_page(title: str, content: str) -> str:
+        stats.record("notion-create-page")
+        await asyncio.sleep(latency)
+        return json.dumps({"id": "pagefake", "url": "https://www.notion.so/pagefake"})
+
+    return server
+
+
+class FakeMCPServers:
+    """Runs the fake YouTube, Drive and Notion MCP servers for the duration of a benchmark."""
+
+    def __init__(self, latency: float = 0.05, results_per_search: int = 5):
+        self.latency = latency
+        self.results_per_search = results_per_search
+        self.stats = FakeServiceStats()
+        self.urls: Dict[str, str] = {}
+        self._servers: List[uvicorn.Server] = []
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> Dict[str, str]:
+        apps = {
+            "youtube": build_youtube_server(self.latency, self.results_per_search, self.stats),
+            "drive": build_drive_server(self.latency, self.stats),
+            "notion": build_notion_server(self.latency, self.stats)
+        }
+        for name, mcp_server in apps.items():
+            port = _free_port()
+            server = uvicorn.Server(uvicorn.Config(
+                mcp_server.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning"
+            ))
+            thread = threading.Thread(target=server.run, name=f"fake-mcp-{name}", daemon=True)
+            thread.start()
+            self._servers.append(server)
+            self._threads.append(thread)
+            self.urls[name] = f"http://127.0.0.1:{port}/mcp"
+
+        deadline = time.monotonic() + 10
+        while not all(server.started for server in self._servers):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake MCP servers did not start within 10 seconds")
+            time.sleep(0.05)
+        return self.urls
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.should_exit = True
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeMCPServers":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
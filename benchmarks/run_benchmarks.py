@@ -0,0 +1,245 @@
+"""
+Offline benchmark for agent setup and learning path generation.
+
+Measures the cold import cost of utils and its warm-up in a fresh interpreter,
+then starts the fake MCP servers, swaps the Gemini model for the scripted fake, and
+measures setup latency, per-step (LLM turn / tool call) latency, tool call
+counts and end-to-end p50/p95 for each engine across goal sizes.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks                    # run and compare with the baseline
+    python -m benchmarks.run_benchmarks --save-baseline    # record new baseline numbers
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tracers.context import collect_runs
+
+import utils
+from benchmarks.fake_chat_model import ScriptedChatModel
+from benchmarks.fake_mcp_server import FakeMCPServers
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOAL_TEMPLATE = "I want to learn Python basics in {days} days"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; good enough for small benchmark samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "mean": round(statistics.fmean(values), 4) if values else 0.0
+    }
+
+
+def _flatten_runs(runs: List[Any]) -> List[Any]:
+    flat = []
+    stack = list(runs)
+    while stack:
+        run = stack.pop()
+        flat.append(run)
+        stack.extend(run.child_runs or [])
+    return flat
+
+
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+import utils
+imported = time.perf_counter()
+utils.warm_up()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def measure_startup(iterations: int) -> Dict[str, Dict[str, float]]:
+    """Time `import utils` (what every app worker pays before first render) and warm_up() in fresh interpreters."""
+    imports, warm_ups = [], []
+    for _ in range(iterations):
+        completed = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        import_seconds, warm_up_seconds = map(float, completed.stdout.split()[-2:])
+        imports.append(import_seconds)
+        warm_ups.append(warm_up_seconds)
+    return {"import": summarize(imports), "warm_up": summarize(warm_ups)}
+
+
+async def measure_setup(urls: Dict[str, str], iterations: int) -> Dict[str, float]:
+    """Time a cold setup (tool discovery, model and agent creation) with no pooling."""
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await utils.setup_agent_with_tools(
+            google_api_key="AI-benchmark",
+            youtube_pipedream_url=urls["youtube"],
+            drive_pipedream_url=urls["drive"]
+        )
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+async def measure_generation(
+    urls: Dict[str, str],
+    servers: FakeMCPServers,
+    engine: str,
+    days: int,
+    iterations: int
+) -> Dict[str, Any]:
+    """Time end-to-end generations with a warm agent pool and no result/tool caching."""
+    totals, llm_steps, tool_steps, tool_calls = [], [], [], []
+    for _ in range(iterations):
+        servers.stats.reset()
+        with collect_runs() as collector:
+            started = time.perf_counter()
+            await utils.run_agent(
+                google_api_key="AI-benchmark",
+                youtube_pipedream_url=urls["youtube"],
+                drive_pipedream_url=urls["drive"],
+                user_goal=GOAL_TEMPLATE.format(days=days),
+                use_cache=False,
+                engine=engine
+            )
+            totals.append(time.perf_counter() - started)
+        for run in _flatten_runs(collector.traced_runs):
+            if run.end_time is None:
+                continue
+            duration = (run.end_time - run.start_time).total_seconds()
+            if run.run_type in ("llm", "chat_model"):
+                llm_steps.append(duration)
+            elif run.run_type == "tool":
+                tool_steps.append(duration)
+        tool_calls.append(servers.stats.total())
+
+    return {
+        "end_to_end": summarize(totals),
+        "llm_step": summarize(llm_steps),
+        "tool_step": summarize(tool_steps),
+        "tool_calls": round(statistics.fmean(tool_calls), 1)
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    # Route model creation to the scripted fake and keep caches out of the measurements
+    utils.initialize_model = lambda google_api_key, tier="tool_calling": ScriptedChatModel(latency=args.model_latency)
+    utils.TOOL_CACHE_CONFIG["enabled"] = False
+    utils.TOOL_MANIFEST_CONFIG["enabled"] = False
+
+    with FakeMCPServers(latency=args.tool_latency, results_per_search=args.results_per_search) as servers:
+        results: Dict[str, Any] = {
+            "settings": {
+                "tool_latency": args.tool_latency,
+                "model_latency": args.model_latency,
+                "iterations": args.iterations
+            },
+            "startup": measure_startup(args.iterations),
+            "setup": await measure_setup(servers.urls, args.iterations),
+            "generation": {}
+        }
+        for engine in args.engines:
+            for days in args.days:
+                name = f"{engine}/{days}d"
+                print(f"Running {name}...", flush=True)
+                results["generation"][name] = await measure_generation(
+                    servers.urls, servers, engine, days, args.iterations
+                )
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every p50/p95 that got slower than the baseline by more than threshold."""
+    regressions = []
+
+    def check(label: str, current: Dict[str, float], previous: Optional[Dict[str, float]]) -> None:
+        if not previous:
+            return
+        for stat in ("p50", "p95"):
+            before, after = previous.get(stat, 0), current.get(stat, 0)
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append(f"{label} {stat}: {before:.3f}s -> {after:.3f}s (+{(after / before - 1):.0%})")
+
+    check("startup import", results["startup"]["import"], baseline.get("startup", {}).get("import"))
+    check("setup", results["setup"], baseline.get("setup"))
+    for name, metrics in results["generation"].items():
+        previous = baseline.get("generation", {}).get(name, {})
+        check(f"{name} end_to_end", metrics["end_to_end"], previous.get("end_to_end"))
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    startup = results["startup"]
+    print(f"\nStartup: import p50 {startup['import']['p50']:.3f}s  warm-up p50 {startup['warm_up']['p50']:.3f}s")
+    setup = results["setup"]
+    print(f"Setup: p50 {setup['p50']:.3f}s  p95 {setup['p95']:.3f}s")
+    print(f"{'run':<16}{'e2e p50':>10}{'e2e p95':>10}{'llm p50':>10}{'tool p50':>10}{'tools':>8}")
+    for name, metrics in results["generation"].items():
+        print(f"{name:<16}{metrics['end_to_end']['p50']:>10.3f}{metrics['end_to_end']['p95']:>10.3f}"
+              f"{metrics['llm_step']['p50']:>10.3f}{metrics['tool_step']['p50']:>10.3f}{metrics['tool_calls']:>8}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline learning path generation benchmark")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 7, 14])
+    parser.add_argument("--engines", nargs="+", choices=utils.ENGINES, default=list(utils.ENGINES))
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Seconds per fake MCP tool call")
+    parser.add_argument("--model-latency", type=float, default=0.02, help="Seconds per fake model turn")
+    parser.add_argument("--results-per-search", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging a regression")
+    parser.add_argument("--output", help="Also write the results JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run_suite(args))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline found; run with --save-baseline to record one.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print("\n⚠️ Regressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
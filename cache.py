@@ -0,0 +1,301 @@
+"""
+Caches for learning path generation results and MCP tool calls
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Tuple
+
+
+def normalize_goal(user_goal: str) -> str:
+    """Normalize a learning goal so trivially different phrasings share a cache key."""
+    goal = re.sub(r"\s+", " ", (user_goal or "").strip().lower())
+    return goal.rstrip(" .!?")
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Hash JSON-serializable parts into a stable cache key."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    A small SQLite-backed key/value cache with TTL expiry and LRU eviction.
+    Values must be JSON-serializable and are stored zlib-compressed.
+    """
+
+    def __init__(self, path: str, max_entries: int = 500, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for the key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats["misses"] += 1
+                self._stats["evictions"] += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        blob = zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, now, now)
+            )
+            overflow = self._conn.execute(
+                "SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            ).fetchall()
+            if overflow:
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", overflow)
+                self._stats["evictions"] += len(overflow)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the number of stored entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {**self._stats, "size": size}
+
+
+# Per-run hit/miss counters; each run sets its own dict so concurrent runs don't mix
+_run_tool_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "run_tool_stats", default=None
+)
+
+
+def start_tool_cache_run() -> Dict[str, int]:
+    """Start per-run tool cache counters for the current context and return them."""
+    stats = {"hits": 0, "misses": 0}
+    _run_tool_stats.set(stats)
+    return stats
+
+
+class ToolCallCache:
+    """
+    In-memory memoization of read-only MCP tool calls.
+
+    Tools are matched against ordered rules by name; the first matching rule sets
+    the TTL and whether results are shared across servers (e.g. public YouTube
+    search) or scoped to the originating server configuration. Tools that match
+    never_cache_pattern (playlist creation, document writes, ...) always run.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], never_cache_pattern: str, max_entries: int = 2000):
+        self.rules = [(re.compile(rule["pattern"], re.IGNORECASE), rule) for rule in rules]
+        self.never_cache = re.compile(never_cache_pattern, re.IGNORECASE)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def rule_for(self, tool_name: str) -> Optional[Dict[str, Any]]:
+        """Return the caching rule for a tool, or None if it must not be cached."""
+        if self.never_cache.search(tool_name):
+            return None
+        for pattern, rule in self.rules:
+            if pattern.search(tool_name):
+                return rule
+        return None
+
+    def wrap_tools(self, tools: List[Any], scope: str = "") -> List[Any]:
+        """Return the tools with cacheable ones wrapped; scope isolates non-shared results."""
+        return [self.wrap_tool(tool, scope) for tool in tools]
+
+    def wrap_tool(self, tool: Any, scope: str = "") -> Any:
+        rule = self.rule_for(tool.name)
+        original = getattr(tool, "coroutine", None)
+        if rule is None or original is None:
+            return tool
+
+        tool_name = tool.name
+        ttl_seconds = rule["ttl_seconds"]
+        tool_scope = "" if rule.get("shared") else scope
+        casefold = rule.get("casefold", False)
+
+        async def cached_call(**arguments):
+            key = make_cache_key(tool_scope, tool_name, _canonical_arguments(arguments, casefold))
+            hit, value = self._lookup(key)
+            self._count(tool_name, "hits" if hit else "misses")
+            if hit:
+                return value
+            value = await original(**arguments)
+            self._store(key, value, ttl_seconds)
+            return value
+
+        return tool.model_copy(update={"coroutine": cached_call})
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def _store(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, tool_name: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+        run_stats = _run_tool_stats.get()
+        if run_stats is not None:
+            run_stats[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return overall and per-tool hit/miss counters."""
+        with self._lock:
+            per_tool = {name: dict(counters) for name, counters in self._stats.items()}
+            return {
+                "hits": sum(c["hits"] for c in per_tool.values()),
+                "misses": sum(c["misses"] for c in per_tool.values()),
+                "size": len(self._entries),
+                "tools": per_tool
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _canonical_arguments(arguments: Dict[str, Any], casefold: bool) -> Any:
+    """Normalize whitespace (and optionally case) in string arguments and drop empty values."""
+    def canonical(value):
+        if isinstance(value, str):
+            value = re.sub(r"\s+", " ", value.strip())
+            return value.casefold() if casefold else value
+        if isinstance(value, dict):
+            return {k: canonical(v) for k, v in sorted(value.items()) if v not in (None, "", [], {})}
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        return value
+    return canonical(arguments)
+
+
+def tool_manifest(tools: List[Any]) -> List[Dict[str, Any]]:
+    """Describe LangChain MCP tools as MCP tool definitions (name, description, input schema)."""
+    manifest = []
+    for tool in tools:
+        schema = tool.args_schema
+        if not isinstance(schema, dict):
+            schema = schema.model_json_schema() if schema is not None else {"type": "object", "properties": {}}
+        manifest.append({"name": tool.name, "description": tool.description or "", "inputSchema": schema})
+    return manifest
+
+
+def tools_from_manifest(
+    manifest: List[Dict[str, Any]],
+    connection: Optional[Dict[str, Any]] = None,
+    session: Any = None
+) -> List[Any]:
+    """
+    Rebuild LangChain tools from a cached manifest. The tools call through session if
+    given, otherwise each call opens a session on the connection.
+    """
+    from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+    from mcp.types import Tool
+
+    return [
+        convert_mcp_tool_to_langchain_tool(session, Tool(**definition), connection=None if session else connection)
+        for definition in manifest
+    ]
+
+
+class ToolManifestCache:
+    """
+    Persistent cache of each MCP server's tool manifest, keyed by server URL.
+
+    Entries older than ttl_seconds are discarded; entries older than
+    refresh_after_seconds are still served but reported as stale so the caller
+    can rediscover in the background. Each manifest carries a fingerprint so
+    a refresh can tell whether the server's tools actually changed.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, refresh_after_seconds: float, max_entries: int = 200):
+        self.store = DiskCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.refresh_after_seconds = refresh_after_seconds
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return make_cache_key("tool_manifest", url.strip())
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return {"tools", "fingerprint", "fetched_at", "stale"} for the server, or None."""
+        entry = self.store.get(self._key(url))
+        if entry is None:
+            return None
+        entry["stale"] = time.time() - entry["fetched_at"] > self.refresh_after_seconds
+        return entry
+
+    def put(self, url: str, manifest: List[Dict[str, Any]]) -> bool:
+        """Store a freshly discovered manifest; returns True if it differs from the cached one."""
+        fingerprint = make_cache_key(manifest)
+        previous = self.store.get(self._key(url))
+        self.store.set(self._key(url), {"tools": manifest, "fingerprint": fingerprint, "fetched_at": time.time()})
+        return previous is not None and previous["fingerprint"] != fingerprint
+
+    def invalidate(self, url: str) -> None:
+        self.store.delete(self._key(url))
@@ -0,0 +1,114 @@
+"""
+LangChain callback handlers that observe the agent loop: timing spans and progress events
+"""
+
+import json
+import time
+from typing import Optional, Any, Dict
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from progress import ProgressCallback, emit, generation_fraction
+from telemetry import RunTrace
+
+
+def _payload_size(value: Any) -> int:
+    if value is None:
+        return 0
+    content = getattr(value, "content", value)
+    return len(content if isinstance(content, str) else json.dumps(content, default=str))
+
+
+class TimingCallbackHandler(BaseCallbackHandler):
+    """Records an llm_turn span per model call and a tool_call span per tool call."""
+
+    run_inline = True
+
+    def __init__(self, trace: RunTrace, tool_servers: Optional[Dict[str, str]] = None):
+        self.trace = trace
+        self.tool_servers = tool_servers or {}
+        self._open: Dict[Any, tuple] = {}
+
+    def _start(self, run_id: Any, attributes: Dict[str, Any]) -> None:
+        self._open[run_id] = (time.time(), time.perf_counter(), attributes)
+
+    def _end(self, run_id: Any, name: str, kind: str, status: str = "ok", **extra: Any) -> None:
+        opened = self._open.pop(run_id, None)
+        if opened is None:
+            return
+        start_time, started, attributes = opened
+        attributes.update(extra)
+        self.trace.add_span(name, start_time, (time.perf_counter() - started) * 1000, kind, attributes, status)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, {"input_messages": len(messages[0]) if messages else 0})
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, {"input_messages": len(prompts)})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        try:
+            message = response.generations[0][0].message
+            usage = getattr(message, "usage_metadata", None) or {}
+        except (AttributeError, IndexError):
+            pass
+        self._end(
+            run_id, "llm_turn", "client",
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens")
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "llm_turn", "client", status="error", error=str(error))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, inputs=None, **kwargs):
+        tool_name = (serialized or {}).get("name", "unknown")
+        self._start(run_id, {
+            "tool": tool_name,
+            "server": self.tool_servers.get(tool_name, "unknown"),
+            "request_bytes": _payload_size(inputs if inputs is not None else input_str)
+        })
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, "tool_call", "client", response_bytes=_payload_size(output))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "tool_call", "client", status="error", error=str(error))
+
+
+class AgentProgressHandler(BaseCallbackHandler):
+    """
+    Emits generation-phase events from inside the ReAct loop: one per model turn
+    and one per tool call, with an estimate of the steps still to come.
+    """
+
+    run_inline = True
+
+    def __init__(self, callback: ProgressCallback, expected_steps: int):
+        self.callback = callback
+        self.expected_steps = expected_steps
+        self.step = 0
+        self.tools_called = 0
+
+    def _emit(self, message: str) -> None:
+        # The estimate grows if the agent needs more steps than expected
+        self.expected_steps = max(self.expected_steps, self.step + 1)
+        emit(
+            self.callback,
+            "generation",
+            message,
+            fraction=generation_fraction(self.step, self.expected_steps),
+            step=self.step,
+            tools_called=self.tools_called,
+            estimated_remaining_steps=self.expected_steps - self.step
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self.step += 1
+        self._emit(f"Agent step {self.step} complete")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self.tools_called += 1
+        self._emit(f"Calling {(serialized or {}).get('name', 'tool')}...")
+
@@ -0,0 +1,141 @@
+"""
+Compaction of accumulated tool outputs in the ReAct agent's message history
+"""
+
+import contextvars
+import json
+from typing import Optional, Any, Collection, Dict, List
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+from content import content_text
+from prompt import estimate_tokens
+
+_run_compaction_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "run_compaction_stats", default=None
+)
+
+
+def start_compaction_run() -> Dict[str, int]:
+    """Start per-run compaction counters for the current context and return them."""
+    stats = {"turns": 0, "tool_tokens_before": 0, "tool_tokens_after": 0, "tokens_saved": 0}
+    _run_compaction_stats.set(stats)
+    return stats
+
+
+def _video_fields(item: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Pull title, URL, channel and duration out of a YouTube API item or a flat video record."""
+    snippet = item.get("snippet") or {}
+    details = item.get("contentDetails") or {}
+    item_id = item.get("id")
+    video_id = (item_id.get("videoId") if isinstance(item_id, dict) else item_id) or item.get("videoId")
+    title = snippet.get("title") or item.get("title")
+    url = item.get("url") or (f"https://www.youtube.com/watch?v={video_id}" if video_id else None)
+    if not title or not url:
+        return None
+    return {
+        "title": title,
+        "url": url,
+        "channel": snippet.get("channelTitle") or item.get("channelTitle") or item.get("channel") or "",
+        "duration": details.get("duration") or item.get("duration") or ""
+    }
+
+
+def extract_videos(text: str) -> Optional[List[Dict[str, str]]]:
+    """Return the videos in a search tool response, or None if it is not a video listing."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return None
+    videos = [video for video in (_video_fields(item) for item in items if isinstance(item, dict)) if video]
+    return videos if videos or not items else None
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}… [{len(text) - max_chars} chars truncated]"
+
+
+def compact_tool_output(content: Any, max_chars: int = 2000, exclude_urls: Collection[str] = ()) -> str:
+    """
+    Reduce a tool response to one line per video (title, URL, channel, duration), else truncate it.
+    Videos whose URL is in exclude_urls are left out.
+    """
+    text = content_text(content, "\n")
+    videos = extract_videos(text)
+    if videos is None:
+        return _truncate(text, max_chars)
+    lines = [
+        " | ".join(value for value in (video["title"], video["url"], video["channel"], video["duration"]) if value)
+        for video in videos
+        if video["url"] not in exclude_urls
+    ]
+    return _truncate("\n".join(lines) or "No videos found.", max_chars)
+
+
+def summarize_tool_output(content: Any, max_chars: int = 300) -> str:
+    """Summarize an older tool response to the titles and URLs the final answer may still cite."""
+    text = content_text(content, "\n")
+    videos = extract_videos(text)
+    if videos is None:
+        return _truncate(text, max_chars)
+    summary = "; ".join(f"{video['title']} - {video['url']}" for video in videos)
+    return f"[Earlier result] {summary or 'No videos found.'}"
+
+
+class MessageCompactor:
+    """
+    A pre-model hook for create_react_agent that shrinks tool messages before each model turn.
+
+    The most recent tool messages are reduced to the fields the planner needs; older
+    ones are summarized to titles and URLs. Only the model's input is rewritten; the
+    agent state keeps the full messages.
+    """
+
+    def __init__(
+        self,
+        recent_tool_messages: int = 4,
+        max_tool_chars: int = 2000,
+        stale_tool_chars: int = 300,
+        chars_per_token: float = 4.0
+    ):
+        self.recent_tool_messages = recent_tool_messages
+        self.max_tool_chars = max_tool_chars
+        self.stale_tool_chars = stale_tool_chars
+        self.chars_per_token = chars_per_token
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Return the messages with every tool message compacted or summarized."""
+        tool_indexes = [i for i, message in enumerate(messages) if isinstance(message, ToolMessage)]
+        recent = set(tool_indexes[-self.recent_tool_messages:]) if self.recent_tool_messages > 0 else set()
+        before = after = 0
+        compacted = []
+        for i, message in enumerate(messages):
+            if not isinstance(message, ToolMessage):
+                compacted.append(message)
+                continue
+            original = content_text(message.content, "\n")
+            if i in recent:
+                content = compact_tool_output(original, self.max_tool_chars)
+            else:
+                content = summarize_tool_output(original, self.stale_tool_chars)
+            if len(content) >= len(original):
+                content = original
+            before += estimate_tokens(original, self.chars_per_token)
+            after += estimate_tokens(content, self.chars_per_token)
+            compacted.append(message if content is original else message.model_copy(update={"content": content}))
+
+        run_stats = _run_compaction_stats.get()
+        if run_stats is not None:
+            run_stats["turns"] += 1
+            run_stats["tool_tokens_before"] += before
+            run_stats["tool_tokens_after"] += after
+            run_stats["tokens_saved"] += before - after
+        return compacted
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {"llm_input_messages": self.compact(state["messages"])}
@@ -3,11 +3,223 @@ Configuration settings for the MCP Learning Path Generator
 """
 
 # Model Configuration
+# Each generation phase uses its own tier; a tier's settings are passed to
+# ChatGoogleGenerativeAI as-is. The ReAct loop searches with the tool-calling tier
+# and switches to the synthesis tier for the turns that write and save the path;
+# the pipeline engine plans with the planning tier (a 30-day JSON plan needs a few
+# thousand tokens) and writes the path with the synthesis tier.
 MODEL_CONFIG = {
-    "model_name": "gemini-2.5-flash",
-    "temperature": 0.7,
-    "max_tokens": 4000,
-    "recursion_limit": 100
+    "tiers": {
+        "planning": {"model": "gemini-2.5-flash-lite", "temperature": 0.3, "max_tokens": 4096},
+        "tool_calling": {"model": "gemini-2.5-flash-lite", "temperature": 0.2, "max_tokens": 4000},
+        "synthesis": {"model": "gemini-2.5-flash", "temperature": 0.7, "max_tokens": 4000}
+    }
+}
+
+# Agent Pool Configuration
+POOL_CONFIG = {
+    "max_size": 8,
+    "ttl_seconds": 1800
+}
+
+# Result Cache Configuration
+CACHE_CONFIG = {
+    "result_cache_path": ".cache/learning_paths.sqlite3",
+    "result_max_entries": 500,
+    "result_ttl_seconds": 7 * 24 * 3600
+}
+
+# MCP Tool Call Cache Configuration
+# Rules are matched in order against tool names; "shared" results are reused
+# across server configurations, others are scoped to the configured URLs.
+TOOL_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 2000,
+    "rules": [
+        {"pattern": r"search", "ttl_seconds": 6 * 3600, "shared": True, "casefold": True},
+        {"pattern": r"(list|get|retrieve|find|details)", "ttl_seconds": 600, "shared": False}
+    ],
+    "never_cache_pattern": r"(create|add|insert|update|delete|remove|upload|write|append|post|send|move|copy|share)"
+}
+
+# MCP Tool Manifest Cache Configuration
+# Tool schemas are cached per server URL so setup can skip discovery; manifests
+# older than refresh_after_seconds are served while being rediscovered in the background
+TOOL_MANIFEST_CONFIG = {
+    "enabled": True,
+    "path": ".cache/tool_manifests.sqlite3",
+    "ttl_seconds": 7 * 24 * 3600,
+    "refresh_after_seconds": 6 * 3600,
+    "max_entries": 200
+}
+
+# MCP Connection Pool Configuration
+# Sessions to each streamable_http server share one keep-alive connection pool,
+# so tool calls reuse TCP/TLS connections instead of reconnecting every time.
+# With persistent_sessions, tool calls also share one long-lived MCP session per
+# server instead of opening and initializing a session for every call
+CONNECTION_POOL_CONFIG = {
+    "enabled": True,
+    "persistent_sessions": True,
+    "max_connections": 10,
+    "max_keepalive_connections": 5,
+    "keepalive_expiry": 60.0,
+    "connect_retries": 2
+}
+
+# MCP Resilience Configuration
+# Per-server timeouts, retries with jittered backoff and a circuit breaker per server URL.
+# Retries and hedging apply only to read-only tools (see TOOL_CACHE_CONFIG's
+# never_cache_pattern); slow YouTube searches are hedged with a duplicate request.
+# A failing or circuit-open Drive/Notion server switches the run to YouTube-only mode.
+RESILIENCE_CONFIG = {
+    "enabled": True,
+    "servers": {
+        "youtube": {
+            "connect_timeout": 10.0,
+            "discovery_timeout": 15.0,
+            "call_timeout": 30.0,
+            "retries": 2,
+            "hedge_after_seconds": 5.0
+        },
+        "drive": {
+            "connect_timeout": 5.0,
+            "discovery_timeout": 8.0,
+            "call_timeout": 30.0,
+            "retries": 1,
+            "hedge_after_seconds": None
+        },
+        "notion": {
+            "connect_timeout": 5.0,
+            "discovery_timeout": 8.0,
+            "call_timeout": 30.0,
+            "retries": 1,
+            "hedge_after_seconds": None
+        }
+    },
+    "hedge_pattern": r"search",
+    "backoff_base_seconds": 0.5,
+    "backoff_max_seconds": 4.0,
+    "failure_threshold": 3,
+    "reset_timeout_seconds": 60.0
+}
+
+# MCP Server Probe Configuration
+# Servers are discovered in the background as soon as their URLs are entered, all
+# under one shared deadline; setup uses the answers and waits for pending ones at
+# most until the deadline. Answers stay fresh for ttl_seconds (failures for failure_ttl_seconds)
+PROBE_CONFIG = {
+    "enabled": True,
+    "deadline_seconds": 8.0,
+    "ttl_seconds": 300,
+    "failure_ttl_seconds": 30
+}
+
+# Single-flight Configuration
+# Identical generations (same normalized goal, mode, destination and engine) in flight
+# at the same time in this process run once and share their result and progress events.
+# With file_lock, identical generations in other worker processes on this host run one
+# at a time, so the later ones are served from the result cache.
+SINGLE_FLIGHT_CONFIG = {
+    "enabled": True,
+    "file_lock": False,
+    "lock_dir": ".cache/locks",
+    "lock_poll_interval": 0.2
+}
+
+# MCP Tool Selection Configuration
+# Only tools whose names match the current mode's patterns are bound to the agent,
+# ranked by the first pattern they match; servers without a match keep all their tools
+TOOL_SELECTION_CONFIG = {
+    "enabled": True,
+    "max_tools_per_server": 4,
+    "modes": {
+        "youtube_only": {
+            "youtube": [r"search"]
+        },
+        "full": {
+            "youtube": [r"search", r"create.*playlist|playlist.*create", r"(add|insert).*playlist|playlist.*item"],
+            "drive": [r"create.*(doc|file)", r"(doc|file).*create"],
+            "notion": [r"create.*page", r"append.*block"]
+        }
+    }
+}
+
+# Plan-then-fan-out Pipeline Configuration
+PIPELINE_CONFIG = {
+    "max_concurrent_searches": 4,
+    "videos_per_day": 3,
+    "max_days": 30,
+    "max_result_chars_per_day": 4000
+}
+
+# Incremental Revision Configuration
+# Regenerating or adding days sends the model only those days; every other day is
+# summarized in one line of at most max_summary_chars_per_day characters.
+# Searches, result sizes and the day limit follow PIPELINE_CONFIG.
+REVISION_CONFIG = {
+    "max_summary_chars_per_day": 160
+}
+
+# Telemetry Configuration
+# Set spans_export_path (e.g. ".cache/spans.jsonl") to append OpenTelemetry-style spans per run
+TELEMETRY_CONFIG = {
+    "spans_export_path": None
+}
+
+# Prompt Configuration
+# Optional prompt sections are dropped until the learning path prompt fits the budget
+PROMPT_CONFIG = {
+    "input_token_budget": 1000,
+    "chars_per_token": 4.0
+}
+
+# Agent Context Compaction Configuration
+# Before each ReAct model turn, the latest tool results are cut down to video
+# title/URL/channel/duration and older ones to titles and URLs
+COMPACTION_CONFIG = {
+    "enabled": True,
+    "recent_tool_messages": 4,
+    "max_tool_chars": 2000,
+    "stale_tool_chars": 300
+}
+
+# Agent Run Governor Configuration
+# Each ReAct run may take base_steps + steps_per_day * days model turns (capped at
+# max_steps) and must finish within deadline_seconds (None for no deadline); a tool
+# called with the same arguments more than max_repeated_tool_calls times is a loop.
+# Runs that hit a limit return the best partial learning path instead of failing.
+GOVERNOR_CONFIG = {
+    "deadline_seconds": 300,
+    "base_steps": 4,
+    "steps_per_day": 2,
+    "max_steps": 50,
+    "max_repeated_tool_calls": 2
+}
+
+# Background Job Configuration
+# Jobs beyond max_concurrent_jobs wait in a queue of up to max_queued_jobs;
+# the page polls a running job every poll_interval seconds
+JOB_CONFIG = {
+    "max_concurrent_jobs": 2,
+    "max_queued_jobs": 4,
+    "max_finished_jobs": 50,
+    "poll_interval": 0.5
+}
+
+# Startup Configuration
+# warm_up imports LangChain, LangGraph and the Gemini client on a background thread
+# after the first render, and creates the model client once an API key is entered
+STARTUP_CONFIG = {
+    "warm_up": True
+}
+
+# History Configuration
+# Generated learning paths are kept per API key, newest first, up to max_entries
+HISTORY_CONFIG = {
+    "path": ".cache/history.sqlite3",
+    "max_entries": 1000,
+    "page_size": 5
 }
 
 # UI Configuration
@@ -52,6 +264,7 @@ PROGRESS_CONFIG = {
         "setup": 0.1,
         "integration": 0.2,
         "tools": 0.4,
+        "agent": 0.45,
         "mode": 0.5,
         "generation": 0.6,
         "complete": 1.0
@@ -0,0 +1,289 @@
+"""
+Pooled keep-alive HTTP connections and long-lived sessions for streamable_http MCP servers
+"""
+
+import asyncio
+import contextvars
+import threading
+from typing import Optional, Any, Callable, Dict
+
+import anyio
+import httpx
+
+# Same defaults as the MCP SDK's own client factory
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+# Failures that mean a kept-alive connection was closed by the server while idle; a
+# request is only resent if it failed this way before any of it was written
+STALE_CONNECTION_ERRORS = (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)
+
+# Failures that mean a session's stream to the server is broken and must be reopened
+SESSION_ERRORS = (httpx.TransportError, anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+_run_connection_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "run_connection_stats", default=None
+)
+
+
+def start_connection_run() -> Dict[str, int]:
+    """Start per-run connection counters for the current context and return them."""
+    stats = {"requests": 0, "opened": 0, "reused": 0, "reconnects": 0, "sessions": 0}
+    _run_connection_stats.set(stats)
+    return stats
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    A keep-alive connection pool for one MCP server, shared by all of its sessions.
+
+    The MCP SDK opens a new httpx client for every session and closes it afterwards;
+    clients built on this transport leave the pool open, so later sessions reuse the
+    established TCP/TLS connections. A request that fails on a reused connection before
+    any of it was sent is retried once on a fresh one; requests are never resent after
+    that point, so tool calls are not repeated.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 60.0,
+        connect_retries: int = 2
+    ):
+        self.loop = asyncio.get_running_loop()
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            retries=connect_retries
+        )
+        self._stats = {"requests": 0, "opened": 0, "reused": 0, "reconnects": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        self._stats[name] += 1
+        run_stats = _run_connection_stats.get()
+        if run_stats is not None and name in run_stats:
+            run_stats[name] += 1
+
+    async def _send(self, request: httpx.Request, progress: Dict[str, bool]) -> httpx.Response:
+        """Send on a pooled connection, recording in progress whether it was opened and written to."""
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                progress["opened"] = True
+            elif event_name.endswith("send_request_headers.started"):
+                progress["sent"] = True
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            self._count("opened" if progress["opened"] else "reused")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._count("requests")
+        progress = {"opened": False, "sent": False}
+        try:
+            return await self._send(request, progress)
+        except STALE_CONNECTION_ERRORS:
+            # Once any of the request was written the server may have acted on it
+            # (e.g. created a playlist), so only a reused connection that failed
+            # before sending is retried
+            if progress["sent"] or progress["opened"]:
+                self._count("errors")
+                raise
+            self._count("reconnects")
+        except httpx.TransportError:
+            self._count("errors")
+            raise
+        try:
+            return await self._send(request, {"opened": False, "sent": False})
+        except httpx.TransportError:
+            self._count("errors")
+            raise
+
+    async def aclose(self) -> None:
+        # Called whenever a session's client closes; the pool outlives sessions
+        pass
+
+    async def close_pool(self) -> None:
+        await self._transport.aclose()
+
+    def close_soon(self) -> None:
+        """Schedule closing the pool on the event loop it belongs to; callable from any thread."""
+        # A pool whose loop has already shut down went with it
+        if not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.close_pool(), self.loop)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+class PersistentSession:
+    """
+    One long-lived MCP ClientSession for a server, shared by every tool call on an event loop.
+
+    Tools built on it call call_tool() here instead of opening and initializing a session
+    per call. A holder task on the loop keeps the session open until it is closed. A call
+    that fails on a broken stream closes it, and the next call opens a new one; the failed
+    call itself is not resent. Used from another event loop, the session is reopened there.
+    """
+
+    def __init__(self, connection: Dict[str, Any]):
+        self.connection = connection
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._holder: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closed: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self._stats = {"sessions": 0, "calls": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        self._stats[name] += 1
+        run_stats = _run_connection_stats.get()
+        if run_stats is not None and name in run_stats:
+            run_stats[name] += 1
+
+    async def _hold(self, ready: asyncio.Future, closed: asyncio.Event) -> None:
+        from langchain_mcp_adapters.sessions import create_session
+
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                ready.set_result(session)
+                await closed.wait()
+        except Exception as e:
+            # Failing to open is reported to the callers waiting for the session; a
+            # session lost later is reopened by the next call
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            if not ready.done():
+                ready.cancel()
+
+    def _close_locked(self) -> None:
+        if self._closed is not None and self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._closed.set)
+        self._holder = None
+        self._closed = None
+
+    async def session(self) -> Any:
+        """Return the open session on the running event loop, opening it if needed."""
+        loop = asyncio.get_running_loop()
+        opened = False
+        with self._lock:
+            if loop is not self.loop:
+                self._close_locked()
+                self.loop = loop
+            if self._holder is None or self._holder.done():
+                self._ready = loop.create_future()
+                self._closed = asyncio.Event()
+                self._holder = loop.create_task(self._hold(self._ready, self._closed))
+                opened = True
+            ready = self._ready
+        if opened:
+            self._count("sessions")
+        return await asyncio.shield(ready)
+
+    async def call_tool(self, *args: Any, **kwargs: Any) -> Any:
+        session = await self.session()
+        self._count("calls")
+        try:
+            return await session.call_tool(*args, **kwargs)
+        except SESSION_ERRORS:
+            self._count("errors")
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the session on its own event loop; callable from any thread. The next call reopens it."""
+        with self._lock:
+            self._close_locked()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+class ConnectionPools:
+    """
+    One PooledTransport and one PersistentSession per MCP server URL, created on first use.
+    client_factory() plugs a server's pool into a streamable_http connection config;
+    session() returns the long-lived session that tools can call through.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 60.0,
+        connect_retries: int = 2
+    ):
+        self.settings = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "connect_retries": connect_retries
+        }
+        self._transports: Dict[str, PooledTransport] = {}
+        self._sessions: Dict[str, PersistentSession] = {}
+        self._lock = threading.Lock()
+
+    def transport(self, url: str) -> PooledTransport:
+        """Return the server's pool, replacing one that belongs to another event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(url)
+            if transport is None or transport.loop is not loop:
+                transport = PooledTransport(**self.settings)
+                self._transports[url] = transport
+            return transport
+
+    def client_factory(self, url: str) -> Callable[..., httpx.AsyncClient]:
+        """Return an MCP httpx client factory whose clients share the server's pool."""
+        def create_client(
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[httpx.Timeout] = None,
+            auth: Optional[httpx.Auth] = None
+        ) -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                transport=self.transport(url),
+                headers=headers,
+                timeout=timeout or DEFAULT_TIMEOUT,
+                auth=auth,
+                follow_redirects=True
+            )
+        return create_client
+
+    def session(self, url: str, connection: Dict[str, Any]) -> PersistentSession:
+        """Return the server's long-lived session, created on first use with the given connection config."""
+        with self._lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = PersistentSession(connection)
+                self._sessions[url] = session
+            return session
+
+    def stats(self, url: str) -> Optional[Dict[str, int]]:
+        """Return lifetime counters for a server's pool, or None if it has not been used."""
+        with self._lock:
+            transport = self._transports.get(url)
+        return transport.stats() if transport is not None else None
+
+    def close(self, url: Optional[str] = None) -> None:
+        """
+        Close one server's pool and session, or every one when no URL is given. Each is
+        closed on its own event loop; sessions started afterwards open a new pool.
+        """
+        with self._lock:
+            urls = [url] if url is not None else list(self._transports.keys() | self._sessions.keys())
+            transports = [self._transports.pop(key) for key in urls if key in self._transports]
+            sessions = [self._sessions.pop(key) for key in urls if key in self._sessions]
+        for session in sessions:
+            session.close()
+        for transport in transports:
+            transport.close_soon()
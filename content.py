@@ -0,0 +1,21 @@
+"""
+Text of LangChain message and MCP tool output content
+"""
+
+from typing import Any
+
+
+def content_text(content: Any, separator: str = "") -> str:
+    """
+    Return the text of message, chunk or tool output content, which may be a string or
+    a list of string and {"type": "text", "text": ...} parts joined with separator.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return separator.join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return "" if content is None else str(content)
@@ -0,0 +1,147 @@
+"""
+Step, time and loop limits for agent runs
+"""
+
+import time
+from typing import Optional, Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from cache import make_cache_key
+from compaction import extract_videos
+from content import content_text
+
+
+class RunLimitExceeded(RuntimeError):
+    """Raised inside the agent loop once a run has hit one of its governor's limits."""
+
+
+def step_budget(days: int, base_steps: int, steps_per_day: int, max_steps: int) -> int:
+    """Model turns allowed for a plan of this many days, capped at max_steps."""
+    return max(1, min(base_steps + steps_per_day * days, max_steps))
+
+
+class RunGovernor(BaseCallbackHandler):
+    """
+    Enforces a model-turn budget, a wall-clock deadline and a repeated-tool-call limit.
+
+    Limits are checked from the callbacks: a tool called again with the same arguments
+    more than max_repeated_tool_calls times, or a model turn past the budget or the
+    deadline, sets stop_reason and raises RunLimitExceeded. The messages seen so far
+    are kept so the caller can return a partial learning path.
+    """
+
+    run_inline = True
+    raise_error = True
+
+    def __init__(self, max_steps: int, deadline_seconds: Optional[float] = None, max_repeated_tool_calls: int = 2):
+        self.max_steps = max_steps
+        self.deadline_seconds = deadline_seconds
+        self.max_repeated_tool_calls = max_repeated_tool_calls
+        self.steps = 0
+        self.tool_calls = 0
+        self.stop_reason: Optional[str] = None
+        self.messages: List[BaseMessage] = []
+        self._call_counts: Dict[str, int] = {}
+        self._started = time.monotonic()
+
+    @property
+    def recursion_limit(self) -> int:
+        # Each model turn and each tool round is one graph step
+        return 2 * self.max_steps + 1
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if there is no deadline."""
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed())
+
+    def stop(self, reason: str) -> None:
+        """Record why the run is stopping; the first reason wins."""
+        if self.stop_reason is None:
+            self.stop_reason = reason
+
+    def _check_model_turn(self) -> None:
+        if self.steps >= self.max_steps:
+            self.stop(f"step budget of {self.max_steps} model turns used up")
+        elif self.remaining() == 0.0:
+            self.stop(f"deadline of {self.deadline_seconds:.0f}s reached")
+        if self.stop_reason:
+            raise RunLimitExceeded(self.stop_reason)
+        self.steps += 1
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._check_model_turn()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._check_model_turn()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        try:
+            self.messages.append(response.generations[0][0].message)
+        except (AttributeError, IndexError):
+            pass
+
+    def on_tool_start(self, serialized, input_str, *, run_id, inputs=None, **kwargs):
+        tool_name = (serialized or {}).get("name", "unknown")
+        key = make_cache_key(tool_name, inputs if inputs is not None else input_str)
+        self._call_counts[key] = self._call_counts.get(key, 0) + 1
+        self.tool_calls += 1
+        if self._call_counts[key] > self.max_repeated_tool_calls:
+            self.stop(f"loop detected: {tool_name} called {self._call_counts[key]} times with the same arguments")
+            raise RunLimitExceeded(self.stop_reason)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        if isinstance(output, ToolMessage):
+            self.messages.append(output)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "steps": self.steps,
+            "max_steps": self.max_steps,
+            "tool_calls": self.tool_calls,
+            "elapsed_seconds": round(self.elapsed(), 2),
+            "deadline_seconds": self.deadline_seconds,
+            "stopped": self.stop_reason is not None,
+            "stop_reason": self.stop_reason
+        }
+
+
+def partial_learning_path(messages: List[BaseMessage], reason: str) -> str:
+    """
+    Build the best available learning path from an interrupted run: the agent's last
+    written answer if it got that far, otherwise the videos its searches found so far.
+    """
+    notice = f"> ⚠️ Generation stopped early ({reason}); this learning path may be incomplete."
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and not message.tool_calls:
+            text = content_text(message.content)
+            if text.strip():
+                return f"{notice}\n\n{text.strip()}"
+
+    queries = {}
+    for message in messages:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                arguments = call.get("args") or {}
+                queries[call.get("id")] = next(
+                    (str(value) for value in arguments.values() if isinstance(value, str)), call.get("name")
+                )
+    sections = []
+    for message in messages:
+        if not isinstance(message, ToolMessage):
+            continue
+        videos = extract_videos(content_text(message.content, "\n"))
+        if not videos:
+            continue
+        lines = [f"- {video['title']} - {video['url']}" + (f" ({video['channel']})" if video["channel"] else "")
+                 for video in videos]
+        sections.append(f"### {queries.get(message.tool_call_id, 'Search results')}\n" + "\n".join(lines))
+
+    if not sections:
+        return f"{notice}\n\nNo videos were found before the run stopped. Please try again."
+    return f"# Partial Learning Path\n\n{notice}\n\n## Videos Found So Far\n\n" + "\n\n".join(sections)
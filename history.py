@@ -0,0 +1,96 @@
+"""
+Persistent learning path history, stored in SQLite with compressed payloads
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Any, Dict, List
+
+from cache import normalize_goal
+
+
+class HistoryStore:
+    """
+    Saved learning paths per owner (an API key fingerprint), newest first.
+    Listing reads only the goal and timestamp; payloads are zlib-compressed JSON
+    loaded one entry at a time. Each owner keeps at most max_entries entries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, owner TEXT NOT NULL, goal TEXT NOT NULL, "
+            "goal_key TEXT NOT NULL, created_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_owner_created ON history(owner, created_at)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_owner_goal_created ON history(owner, goal_key, created_at)"
+        )
+        self._conn.commit()
+
+    def add(self, owner: str, goal: str, payload: Dict[str, Any]) -> int:
+        """Save an entry and return its id, dropping the owner's oldest entries beyond max_entries."""
+        blob = zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO history (owner, goal, goal_key, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (owner, goal, normalize_goal(goal), time.time(), blob)
+            )
+            self._conn.execute(
+                "DELETE FROM history WHERE id IN ("
+                "SELECT id FROM history WHERE owner = ? ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (owner, self.max_entries)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def count(self, owner: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def page(self, owner: str, offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return one page of the owner's entries (id, goal, created_at), newest first, without payloads."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, goal, created_at FROM history WHERE owner = ? "
+                "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (owner, limit, offset)
+            ).fetchall()
+        return [{"id": row[0], "goal": row[1], "created_at": row[2]} for row in rows]
+
+    def find(self, owner: str, goal: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the owner's latest entries for a goal, matched after normalization."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, goal, created_at FROM history WHERE owner = ? AND goal_key = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (owner, normalize_goal(goal), limit)
+            ).fetchall()
+        return [{"id": row[0], "goal": row[1], "created_at": row[2]} for row in rows]
+
+    def get(self, owner: str, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Return an entry's decompressed payload, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM history WHERE id = ? AND owner = ?", (entry_id, owner)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def delete(self, owner: str, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE id = ? AND owner = ?", (entry_id, owner))
+            self._conn.commit()
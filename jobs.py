@@ -0,0 +1,137 @@
+"""
+Background generation jobs with polling and cancellation
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Any, Awaitable, Callable, Dict, List
+
+from runtime import BackgroundLoop, get_background_loop
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobLimitExceeded(RuntimeError):
+    """Raised when a job is submitted while the process already has the maximum number of jobs."""
+
+
+@dataclass
+class Job:
+    """A generation running on the background loop. events holds the progress/stream events so far."""
+    job_id: str
+    status: str = "queued"
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[concurrent.futures.Future] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record an event for pollers; called on the loop thread."""
+        self.events.append(event)
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    """
+    Runs jobs on the shared background loop, at most max_concurrent at a time.
+    Further jobs wait in a queue of up to max_queued; beyond that submit() raises
+    JobLimitExceeded. Cancelling a job cancels its asyncio task, which interrupts
+    whatever model or tool call it is awaiting.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        max_queued: int = 4,
+        max_finished: int = 50,
+        loop: Optional[BackgroundLoop] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._loop = loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> BackgroundLoop:
+        if self._loop is None:
+            self._loop = get_background_loop()
+        return self._loop
+
+    def submit(self, run: Callable[[Job], Awaitable[dict]]) -> str:
+        """Start run(job) as a background job and return the job id."""
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.done)
+            if active >= self.max_concurrent + self.max_queued:
+                raise JobLimitExceeded(
+                    f"{active} generations are already running or queued; please wait for one to finish"
+                )
+            job = Job(job_id=uuid.uuid4().hex[:12])
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = self.loop.submit(self._execute(job, run))
+        job.future.add_done_callback(lambda future: self._on_future_done(job, future))
+        return job.job_id
+
+    async def _execute(self, job: Job, run: Callable[[Job], Awaitable[dict]]) -> Optional[dict]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = time.time()
+                job.result = await run(job)
+                job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+        return job.result
+
+    @staticmethod
+    def _on_future_done(job: Job, future: concurrent.futures.Future) -> None:
+        # A job cancelled before its task started never reaches _execute's handlers
+        if future.cancelled() and not job.done:
+            job.status = "cancelled"
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.created_at)
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None or job.done or job.future is None:
+            return False
+        return job.future.cancel()
+
+    def active(self) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
@@ -0,0 +1,282 @@
+"""
+Structured learning path results, parsed once from the agent's final answer
+"""
+
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Any, Dict, List
+
+from content import content_text
+
+TITLE_PATTERN = re.compile(r"^#\s+(?:Learning Path:\s*)?(?P<title>.+)$", re.IGNORECASE)
+SECTION_PATTERN = re.compile(r"^##\s+(?P<name>.+)$")
+DAY_PATTERN = re.compile(r"^(?:#{2,4}\s*|\*\*)?Day\s+(?P<number>\d+)\s*[:.\-–]?\s*(?P<title>.*?)(?:\*\*)?$", re.IGNORECASE)
+LABEL_PATTERN = re.compile(r"^\*\*(?P<label>[^*]+?):?\*\*:?\s*(?P<rest>.*)$")
+BULLET_PATTERN = re.compile(r"^(?:[-*•]|\d+[.)])\s+(?P<text>.+)$")
+FIELD_PATTERN = re.compile(r"^\*\*(?P<key>[^*]+?)\*\*:?\s*:?\s*(?P<value>.*)$")
+URL_PATTERN = re.compile(r"https?://[^\s)\]>]+")
+MARKDOWN_LINK_PATTERN = re.compile(r"\[(?P<title>[^\]]+)\]\((?P<url>https?://[^)\s]+)\)")
+
+# Day subsection labels (lowercased, matched by prefix) and the field they fill
+DAY_FIELDS = (
+    ("learning objective", "objectives"),
+    ("objective", "objectives"),
+    ("core video", "videos"),
+    ("additional video", "videos"),
+    ("recommended video", "videos"),
+    ("video", "videos"),
+    ("practice exercise", "exercise"),
+    ("exercise", "exercise"),
+    ("progress check", "progress_check")
+)
+
+# Bold labels that end the days and start a path-level section, like the "## ..." headers
+# (lowercased, matched by prefix); "extra" sections are kept as notes
+SECTION_LABELS = (
+    ("additional resource", "resources"),
+    ("progress tracking", "progress_tracking"),
+    ("note", "extra"),
+    ("next step", "extra"),
+    ("final tip", "extra"),
+    ("conclusion", "extra")
+)
+
+
+@dataclass
+class Video:
+    title: str
+    url: str
+    core: bool = False
+
+
+@dataclass
+class Day:
+    number: int
+    title: str
+    objectives: List[str] = field(default_factory=list)
+    videos: List[Video] = field(default_factory=list)
+    exercise: str = ""
+    progress_check: str = ""
+    # The video search that found the day's videos, as {"tool": name, "arguments": {...}}
+    search: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LearningPath:
+    """
+    A learning path as days, objectives, videos, exercises and resources.
+    raw holds the original text only when it could not be parsed into days.
+    """
+    title: str = ""
+    overview: Dict[str, str] = field(default_factory=dict)
+    days: List[Day] = field(default_factory=list)
+    resources: List[str] = field(default_factory=list)
+    progress_tracking: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    raw: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LearningPath":
+        days = [
+            Day(**{**day, "videos": [Video(**video) for video in day.get("videos", [])]})
+            for day in data.get("days", [])
+        ]
+        return cls(**{**data, "days": days})
+
+    def to_markdown(self) -> str:
+        """Render the learning path in the prompt's output format."""
+        if not self.days:
+            return "\n\n".join(part for part in [self.raw, *self.notes] if part) or "No learning path was generated."
+
+        lines = [f"# Learning Path: {self.title}" if self.title else "# Learning Path"]
+        if self.overview:
+            lines += ["", "## Overview"] + [f"- **{key}**: {value}" for key, value in self.overview.items()]
+        lines += ["", "## Daily Breakdown"]
+        for day in self.days:
+            lines += ["", f"### Day {day.number}: {day.title}".rstrip(": ")]
+            if day.objectives:
+                lines += ["**Learning Objectives:**"] + [f"- {objective}" for objective in day.objectives]
+            core = [video for video in day.videos if video.core]
+            additional = [video for video in day.videos if not video.core]
+            if core:
+                lines += [""] + [f"**Core Video:** {video.title} - {video.url}" for video in core]
+            if additional:
+                lines += ["**Additional Videos:**"] if core else ["", "**Recommended Videos:**"]
+                lines += [f"- {video.title} - {video.url}" for video in additional]
+            if day.exercise:
+                lines += ["", "**Practice Exercise:**", day.exercise]
+            if day.progress_check:
+                lines += ["", "**Progress Check:**", day.progress_check]
+        if self.resources:
+            lines += ["", "## Additional Resources"] + [f"- {resource}" for resource in self.resources]
+        if self.progress_tracking:
+            lines += ["", "## Progress Tracking"] + [f"- {item}" for item in self.progress_tracking]
+        for note in self.notes:
+            lines += ["", note]
+        return "\n".join(lines)
+
+
+def parse_video(text: str, core: bool = False) -> Optional[Video]:
+    """Parse '[Title](url)', 'Title - url' or a bare URL into a Video."""
+    link = MARKDOWN_LINK_PATTERN.search(text)
+    if link:
+        return Video(title=link.group("title").strip(), url=link.group("url"), core=core)
+    url = URL_PATTERN.search(text)
+    if not url:
+        return None
+    title = text[:url.start()].strip().rstrip("-–—:|(").strip().strip("*\"") or url.group(0)
+    return Video(title=title, url=url.group(0), core=core)
+
+
+def _day_field(label: str) -> Optional[str]:
+    label = label.lower()
+    return next((name for prefix, name in DAY_FIELDS if label.startswith(prefix)), None)
+
+
+def _section_label(label: str) -> Optional[str]:
+    label = label.lower()
+    return next((name for prefix, name in SECTION_LABELS if label.startswith(prefix)), None)
+
+
+def parse_learning_path(text: str) -> LearningPath:
+    """Parse learning path markdown into a LearningPath in a single pass over its lines."""
+    path = LearningPath()
+    section = ""
+    day: Optional[Day] = None
+    day_field: Optional[str] = None
+    core_video = False
+    extra: List[str] = []
+
+    def append_text(target: Day, name: str, value: str) -> None:
+        current = getattr(target, name)
+        setattr(target, name, f"{current}\n{value}" if current else value)
+
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        day_match = DAY_PATTERN.match(line)
+        if day_match and (line.startswith("#") or line.startswith("**")):
+            day = Day(number=int(day_match.group("number")), title=day_match.group("title").strip(" *:"))
+            path.days.append(day)
+            section, day_field = "days", None
+            continue
+
+        title_match = TITLE_PATTERN.match(line)
+        if title_match and not path.title and not line.startswith("##"):
+            path.title = title_match.group("title").strip()
+            continue
+
+        section_match = SECTION_PATTERN.match(line)
+        if section_match and not line.startswith("###"):
+            name = section_match.group("name").lower()
+            if "overview" in name:
+                section = "overview"
+            elif "resource" in name:
+                section = "resources"
+            elif "progress" in name:
+                section = "progress_tracking"
+            elif "daily" in name or "breakdown" in name:
+                section = "days"
+            else:
+                section = "extra"
+                extra.append(line)
+            day = None if section != "days" else day
+            continue
+
+        label = LABEL_PATTERN.match(line)
+        section_name = _section_label(label.group("label")) if label else None
+        if section_name:
+            section, day = section_name, None
+            rest = label.group("rest").strip()
+            if section == "extra":
+                extra.append(line)
+            elif rest:
+                getattr(path, section).append(rest)
+            continue
+
+        bullet = BULLET_PATTERN.match(line)
+        item = bullet.group("text").strip() if bullet else line
+
+        if section == "overview":
+            field_match = FIELD_PATTERN.match(item)
+            if field_match:
+                path.overview[field_match.group("key").strip().rstrip(":")] = field_match.group("value").strip()
+            continue
+        if section == "resources":
+            path.resources.append(item)
+            continue
+        if section == "progress_tracking":
+            path.progress_tracking.append(item)
+            continue
+
+        if day is not None and section == "days":
+            label = LABEL_PATTERN.match(item)
+            field_name = _day_field(label.group("label")) if label else None
+            if field_name:
+                day_field = field_name
+                core_video = label.group("label").lower().startswith("core")
+                rest = label.group("rest").strip()
+                if rest:
+                    if field_name == "videos":
+                        video = parse_video(rest, core=core_video)
+                        if video:
+                            day.videos.append(video)
+                    elif field_name == "objectives":
+                        day.objectives.append(rest)
+                    else:
+                        append_text(day, field_name, rest)
+                continue
+            if day_field == "videos" or (day_field is None and URL_PATTERN.search(item)):
+                video = parse_video(item, core=core_video and day_field == "videos")
+                if video:
+                    day.videos.append(video)
+                    continue
+            if day_field == "objectives" and bullet:
+                day.objectives.append(item)
+            elif day_field in ("exercise", "progress_check"):
+                append_text(day, day_field, raw_line.rstrip())
+            else:
+                extra.append(line)
+            continue
+
+        extra.append(line)
+
+    if not path.days:
+        path.raw = (text or "").strip()
+    elif extra:
+        path.notes.append("\n".join(extra))
+    return path
+
+
+def final_answer_texts(messages: List[Any]) -> List[str]:
+    """Return the text of the assistant messages that carry an answer rather than tool calls."""
+    texts = []
+    for message in messages:
+        if getattr(message, "type", None) != "ai" or getattr(message, "tool_calls", None):
+            continue
+        content = content_text(message.content)
+        if content.strip():
+            texts.append(content.strip())
+    return texts
+
+
+def learning_path_from_messages(messages: List[Any]) -> LearningPath:
+    """
+    Parse the learning path out of an agent run's messages: the last assistant answer
+    that contains day-wise content, with any later answers (e.g. saved document links)
+    kept as notes.
+    """
+    texts = final_answer_texts(messages)
+    if not texts:
+        return LearningPath()
+    for index in range(len(texts) - 1, -1, -1):
+        path = parse_learning_path(texts[index])
+        if path.days:
+            path.notes.extend(texts[index + 1:])
+            return path
+    return parse_learning_path(texts[-1])
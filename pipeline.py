@@ -0,0 +1,244 @@
+"""
+Plan-then-fan-out learning path generation.
+
+Instead of letting the ReAct agent research one day at a time, this engine runs
+a fixed number of phases regardless of the plan length:
+
+1. Planning: one planning-tier model call produces the day-wise topic list as JSON
+2. Research: the YouTube search for every day runs concurrently
+3. Synthesis: one synthesis-tier model call writes the learning path in the user_goal_prompt format
+4. Publishing (full mode only): the ReAct agent saves the finished path to Drive/Notion
+"""
+
+import asyncio
+import json
+import re
+from typing import Optional, Any, Dict, List
+
+from langchain_core.messages import HumanMessage, AIMessage
+
+from compaction import compact_tool_output
+from content import content_text
+from progress import ProgressCallback, emit, generation_fraction
+
+PLANNING_PROMPT = """
+You are planning a day-wise learning path.
+
+User Goal: {user_goal}
+
+Return ONLY a JSON object, with no surrounding text, in this shape:
+{{
+  "topic": "<short topic name>",
+  "difficulty": "<Beginner|Intermediate|Advanced>",
+  "days": [
+    {{"day": 1, "title": "<topic for the day>", "search_query": "<YouTube search query for this day>"}}
+  ]
+}}
+
+Use the number of days in the goal (at most {max_days}). If no duration is given, pick a sensible one.
+"""
+
+SYNTHESIS_PROMPT = """
+User Goal: {user_goal}
+
+You are writing the final learning path. The plan and the YouTube search results for each
+day are below. Recommend only videos that appear in the search results, using their real URLs.
+
+## Plan
+{plan}
+
+## Search Results
+{research}
+
+Write the learning path in exactly this format:
+{output_format}
+"""
+
+PUBLISH_PROMPT = """
+Save the learning path below without changing its content:
+1. Create a {destination} document/page titled "Learning Path: {topic}" containing it.
+2. Create a public YouTube playlist titled "Learning Path: {topic}" and add the core video of each day.
+Reply with the document and playlist links.
+
+{learning_path}
+"""
+
+SEARCH_QUERY_ARGS = ("q", "query", "search_query", "searchQuery", "searchTerm", "keyword", "keywords")
+MAX_RESULTS_ARGS = ("maxResults", "max_results", "limit")
+
+
+def parse_plan(text: str, max_days: int) -> Dict[str, Any]:
+    """Parse the planning model's JSON reply, tolerating code fences and surrounding prose."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise ValueError("Planning step did not return a JSON plan")
+    plan = json.loads(match.group(0))
+
+    days = []
+    for index, day in enumerate(plan.get("days", [])[:max_days], start=1):
+        title = str(day.get("title") or f"Day {index}").strip()
+        days.append({
+            "day": index,
+            "title": title,
+            "search_query": str(day.get("search_query") or title).strip()
+        })
+    if not days:
+        raise ValueError("Planning step returned no days")
+
+    return {
+        "topic": str(plan.get("topic") or "Your Goal").strip(),
+        "difficulty": str(plan.get("difficulty") or "Beginner").strip(),
+        "days": days
+    }
+
+
+def find_search_tool(tools: List[Any]) -> Optional[Any]:
+    """Return the YouTube video search tool, if the server exposes one."""
+    candidates = [tool for tool in tools if "search" in tool.name.lower()]
+    for tool in candidates:
+        if "youtube" in tool.name.lower():
+            return tool
+    return candidates[0] if candidates else None
+
+
+def build_search_arguments(tool: Any, query: str, max_results: int) -> Dict[str, Any]:
+    """Map a query onto whichever argument names the search tool's schema uses."""
+    properties = getattr(tool, "args", {}) or {}
+    query_arg = next((name for name in SEARCH_QUERY_ARGS if name in properties), None)
+    if query_arg is None:
+        query_arg = next(
+            (name for name, schema in properties.items() if schema.get("type") == "string"),
+            "q"
+        )
+    arguments = {query_arg: query}
+    max_results_arg = next((name for name in MAX_RESULTS_ARGS if name in properties), None)
+    if max_results_arg:
+        arguments[max_results_arg] = max_results
+    return arguments
+
+
+async def research_days(
+    plan: Dict[str, Any],
+    search_tool: Any,
+    max_concurrency: int,
+    max_results: int,
+    max_chars_per_day: int,
+    progress_callback: Optional[ProgressCallback] = None,
+    run_config: Any = None
+) -> Dict[int, str]:
+    """
+    Run every day's YouTube search concurrently, bounded by a semaphore. Each day's
+    "search" is set to the call that was made. Videos listed in a day's "exclude_urls"
+    are left out of its results, and that many more results are asked for instead.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    completed = 0
+
+    async def _search(day: Dict[str, Any]) -> str:
+        nonlocal completed
+        async with semaphore:
+            exclude_urls = set(day.get("exclude_urls") or [])
+            try:
+                arguments = build_search_arguments(search_tool, day["search_query"], max_results + len(exclude_urls))
+                day["search"] = {"tool": search_tool.name, "arguments": arguments}
+                output = content_text(await search_tool.ainvoke(arguments, config=run_config), "\n")
+            except Exception as e:
+                print(f"Search failed for day {day['day']}: {str(e)}")
+                output = f"Search failed: {str(e)}"
+        completed += 1
+        total = len(plan["days"])
+        # Planning and synthesis are the other two model phases around the searches
+        emit(
+            progress_callback,
+            "generation",
+            f"Researched {completed}/{total} days",
+            fraction=generation_fraction(1 + completed, total + 2),
+            step=1 + completed,
+            tools_called=completed,
+            estimated_remaining_steps=total - completed + 1
+        )
+        return compact_tool_output(output, max_chars_per_day, exclude_urls)
+
+    results = await asyncio.gather(*(_search(day) for day in plan["days"]))
+    return {day["day"]: output for day, output in zip(plan["days"], results)}
+
+
+async def run_pipeline(
+    planning_model: Any,
+    synthesis_model: Any,
+    tools: List[Any],
+    agent: Any,
+    user_goal: str,
+    status_report: Dict[str, Any],
+    output_format: str,
+    config: Dict[str, Any],
+    agent_config: Any = None,
+    progress_callback: Optional[ProgressCallback] = None
+) -> dict:
+    """
+    Generate a learning path in planning, research, synthesis and (optionally) publishing phases.
+    Planning and synthesis each use their own model; publishing runs through the tool-calling agent.
+    Returns a result dict shaped like the ReAct agent's, with the final path as the last message.
+    """
+    search_tool = find_search_tool(tools)
+    if search_tool is None:
+        raise ValueError("No YouTube search tool is available for the pipeline engine")
+
+    emit(progress_callback, "generation", "Planning learning path...")
+    planning_reply = await planning_model.ainvoke([
+        HumanMessage(content=PLANNING_PROMPT.format(user_goal=user_goal, max_days=config["max_days"]))
+    ], config=agent_config)
+    plan = parse_plan(content_text(planning_reply.content), config["max_days"])
+
+    emit(
+        progress_callback,
+        "generation",
+        f"Researching videos for {len(plan['days'])} days in parallel...",
+        fraction=generation_fraction(1, len(plan["days"]) + 2),
+        step=1,
+        estimated_remaining_steps=len(plan["days"]) + 1
+    )
+    research = await research_days(
+        plan,
+        search_tool,
+        max_concurrency=config["max_concurrent_searches"],
+        max_results=config["videos_per_day"],
+        max_chars_per_day=config["max_result_chars_per_day"],
+        progress_callback=progress_callback,
+        run_config=agent_config
+    )
+
+    emit(
+        progress_callback,
+        "generation",
+        "Writing your learning path...",
+        fraction=generation_fraction(len(plan["days"]) + 1, len(plan["days"]) + 2),
+        step=len(plan["days"]) + 1,
+        tools_called=len(plan["days"]),
+        estimated_remaining_steps=1
+    )
+    plan_text = "\n".join(f"Day {day['day']}: {day['title']}" for day in plan["days"])
+    research_text = "\n\n".join(f"### Day {day}\n{output}" for day, output in research.items())
+    synthesis_prompt = SYNTHESIS_PROMPT.format(
+        user_goal=user_goal,
+        plan=f"Topic: {plan['topic']} ({plan['difficulty']})\n{plan_text}",
+        research=research_text,
+        output_format=output_format
+    )
+    learning_path = await synthesis_model.ainvoke([HumanMessage(content=synthesis_prompt)], config=agent_config)
+    messages = [HumanMessage(content=f"User Goal: {user_goal}"), learning_path]
+
+    if status_report.get("drive_available") or status_report.get("notion_available"):
+        destination = "Google Drive" if status_report.get("drive_available") else "Notion"
+        emit(progress_callback, "generation", f"Saving learning path to {destination}...",
+             fraction=generation_fraction(1, 1), step=len(plan["days"]) + 2, tools_called=len(plan["days"]))
+        publish_prompt = PUBLISH_PROMPT.format(
+            destination=destination,
+            topic=plan["topic"],
+            learning_path=content_text(learning_path.content)
+        )
+        published = await agent.ainvoke({"messages": [HumanMessage(content=publish_prompt)]}, config=agent_config)
+        links = published["messages"][-1]
+        messages.append(AIMessage(content=content_text(links.content)))
+
+    return {"messages": messages, "plan": plan}
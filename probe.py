@@ -0,0 +1,133 @@
+"""
+Concurrent startup probe of the configured MCP servers
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Any, Awaitable, Callable, Dict, List
+
+from runtime import BackgroundLoop, get_background_loop
+
+Discover = Callable[[str, Dict[str, Any]], Awaitable[List[Any]]]
+
+
+@dataclass
+class ServerProbe:
+    """One server's discovery probe; tools holds its tools once it has answered."""
+    server: str
+    url: str
+    deadline: float
+    status: str = "pending"
+    latency_ms: Optional[float] = None
+    tools: List[Any] = field(default_factory=list, repr=False)
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "tools": len(self.tools),
+            "error": self.error
+        }
+
+
+class ServerProbes:
+    """
+    Discovers each configured MCP server independently on the background loop as soon
+    as its URL is known, all started together under one shared deadline.
+
+    Setup picks up the answers: servers that answered are used without being discovered
+    again, and servers still pending are waited for at most until the deadline.
+    Successful probes stay fresh for ttl_seconds, failed ones for failure_ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float = 8.0,
+        ttl_seconds: float = 300.0,
+        failure_ttl_seconds: float = 30.0,
+        loop: Optional[BackgroundLoop] = None
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._loop = loop
+        self._probes: Dict[str, ServerProbe] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> BackgroundLoop:
+        if self._loop is None:
+            self._loop = get_background_loop()
+        return self._loop
+
+    def _is_fresh(self, probe: ServerProbe) -> bool:
+        if probe.finished_at is None:
+            return True
+        ttl = self.ttl_seconds if probe.status == "ok" else self.failure_ttl_seconds
+        return time.monotonic() - probe.finished_at < ttl
+
+    def start(self, servers: Dict[str, Dict[str, Any]], discover: Discover) -> None:
+        """Probe every server (name -> connection config) without a fresh probe; returns immediately."""
+        deadline = time.monotonic() + self.deadline_seconds
+        with self._lock:
+            for server, connection in servers.items():
+                probe = self._probes.get(connection["url"])
+                if probe is not None and self._is_fresh(probe):
+                    continue
+                probe = ServerProbe(server=server, url=connection["url"], deadline=deadline)
+                self._probes[connection["url"]] = probe
+                self.loop.submit(self._run(probe, connection, discover))
+
+    async def _run(self, probe: ServerProbe, connection: Dict[str, Any], discover: Discover) -> None:
+        try:
+            probe.tools = await asyncio.wait_for(
+                discover(probe.server, connection), timeout=max(0.0, probe.deadline - time.monotonic())
+            )
+            probe.status = "ok"
+        except asyncio.TimeoutError:
+            probe.error = f"no answer within {self.deadline_seconds:g}s"
+            probe.status = "failed"
+        except Exception as e:
+            probe.error = str(e) or type(e).__name__
+            probe.status = "failed"
+        finally:
+            probe.finished_at = time.monotonic()
+            probe.latency_ms = round((probe.finished_at - probe.started_at) * 1000, 1)
+
+    def get(self, url: str) -> Optional[ServerProbe]:
+        """Return the server's probe if it is pending or still fresh."""
+        with self._lock:
+            probe = self._probes.get(url)
+        return probe if probe is not None and self._is_fresh(probe) else None
+
+    async def wait(self, url: str) -> Optional[ServerProbe]:
+        """Return the server's probe once it has finished or its deadline has passed, or None."""
+        probe = self.get(url)
+        if probe is None:
+            return None
+        # Polled rather than awaited, so any event loop can wait on the background loop's probe
+        while probe.status == "pending" and time.monotonic() < probe.deadline:
+            await asyncio.sleep(0.05)
+        return probe
+
+    def status(self, urls: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Return the probe results so far for the given servers (name -> URL) that have a probe."""
+        report = {}
+        for server, url in urls.items():
+            probe = self.get(url) if url else None
+            if probe is not None:
+                report[server] = probe.to_dict()
+        return report
+
+    def pending(self) -> bool:
+        with self._lock:
+            return any(probe.status == "pending" for probe in self._probes.values())
+
+    def invalidate(self, url: str) -> None:
+        with self._lock:
+            self._probes.pop(url, None)
@@ -0,0 +1,64 @@
+"""
+Structured progress events for learning path generation
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Any, Callable
+
+from config import PROGRESS_CONFIG
+
+PHASE_FRACTIONS = PROGRESS_CONFIG["steps"]
+
+
+@dataclass
+class ProgressEvent:
+    """
+    A progress update. phase is one of the PROGRESS_CONFIG steps (setup, integration,
+    agent, tools, mode, generation, complete); step, tools_called and
+    estimated_remaining_steps describe the agent loop during generation.
+    """
+    phase: str
+    message: str
+    fraction: float
+    step: int = 0
+    tools_called: int = 0
+    estimated_remaining_steps: Optional[int] = None
+
+    def __str__(self) -> str:
+        return self.message
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def emit(
+    callback: Optional[ProgressCallback],
+    phase: str,
+    message: str,
+    fraction: Optional[float] = None,
+    **fields: Any
+) -> None:
+    """Send a progress event for a phase, using the phase's configured fraction by default."""
+    if callback:
+        callback(ProgressEvent(
+            phase=phase,
+            message=message,
+            fraction=PHASE_FRACTIONS[phase] if fraction is None else fraction,
+            **fields
+        ))
+
+
+def generation_fraction(done: int, expected: int) -> float:
+    """Map agent progress onto the generation..complete range, never quite reaching complete."""
+    start, end = PHASE_FRACTIONS["generation"], PHASE_FRACTIONS["complete"]
+    return start + (end - start) * min(done / max(expected, 1), 0.95)
+
+
+def estimate_days(user_goal: str, default: int = 7) -> int:
+    """Read the plan length from goals like 'in 10 days', 'in 2 weeks' or 'in 1 month'."""
+    match = re.search(r"(\d+)\s*(day|week|month)", user_goal or "", re.IGNORECASE)
+    if not match:
+        return default
+    count = int(match.group(1))
+    return count * {"day": 1, "week": 7, "month": 30}[match.group(2).lower()]
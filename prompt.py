@@ -1,53 +1,6 @@
-user_goal_prompt = """
-Main Instruction: You are an expert learning path generator that creates comprehensive, day-wise learning paths. You will be given a user goal and must generate a structured learning experience using available tools.
-
-## Available Tools Analysis:
-- YouTube: Available for video search, playlist creation, and video recommendations
-- Google Drive: Available for document creation and storage (if configured)
-- Notion: Available for page creation and organization (if configured)
-
-## Step-by-Step Execution Flow:
-
-### Phase 1: Planning & Research
-1. **Analyze User Goal**: Understand the learning objective, timeframe, and complexity
-2. **Plan Learning Structure**: Create a logical day-wise progression of topics
-3. **Research Video Resources**: Search for high-quality YouTube videos for each topic
-4. **Select Core Videos**: Choose the best videos for each day/topic
-
-### Phase 2: Content Creation
-5. **Format Learning Path**: Create structured content with:
-   - Clear daily objectives
-   - Video recommendations with links
-   - Practice exercises
-   - Progress checkpoints
-   - Additional resources
-
-### Phase 3: Tool Integration (Based on Availability)
-6. **Document Creation** (if Drive/Notion available):
-   - Create a comprehensive document/page
-   - Include all learning path content
-   - Format with proper headers and structure
-   - Add clickable video links
-   - Include practice exercises and resources
-
-7. **YouTube Playlist Creation** (if YouTube available):
-   - Create a public playlist with relevant title
-   - Add selected core videos
-   - Organize videos in logical order
-   - Include playlist description
-
-### Phase 4: Quality Assurance
-8. **Review & Enhance**:
-   - Ensure logical progression
-   - Verify all links are working
-   - Add supplementary resources
-   - Include progress tracking methods
+from typing import Optional, Any, Dict, List, Tuple
 
-## Output Format:
-
-### For Full Integration (Drive/Notion + YouTube):
-```
-# Learning Path: [Topic Name]
+full_output_format = """# Learning Path: [Topic Name]
 
 ## Overview
 - **Goal**: [User's learning goal]
@@ -84,11 +37,9 @@ Main Instruction: You are an expert learning path generator that creates compreh
 - Daily checkpoints
 - Weekly reviews
 - Final assessment criteria
-```
+"""
 
-### For YouTube-Only Mode:
-```
-# Learning Path: [Topic Name]
+youtube_only_output_format = """# Learning Path: [Topic Name]
 
 ## Overview
 - **Goal**: [User's learning goal]
@@ -119,9 +70,88 @@ Main Instruction: You are an expert learning path generator that creates compreh
 - **Recommended Channels:** [List of channels]
 - **Practice Projects:** [Project suggestions]
 - **Further Learning:** [Advanced topics to explore]
+"""
+
+# Prompt sections, in the order they appear in the full prompt
+
+main_instruction_section = """
+Main Instruction: You are an expert learning path generator that creates comprehensive, day-wise learning paths. You will be given a user goal and must generate a structured learning experience using available tools.
+
+"""
+
+youtube_tools_section = """## Available Tools Analysis:
+- YouTube: Available for video search, playlist creation, and video recommendations
+"""
+
+document_tools_section = """- Google Drive: Available for document creation and storage (if configured)
+- Notion: Available for page creation and organization (if configured)
+"""
+
+planning_phases_section = """
+## Step-by-Step Execution Flow:
+
+### Phase 1: Planning & Research
+1. **Analyze User Goal**: Understand the learning objective, timeframe, and complexity
+2. **Plan Learning Structure**: Create a logical day-wise progression of topics
+3. **Research Video Resources**: Search for high-quality YouTube videos for each topic
+4. **Select Core Videos**: Choose the best videos for each day/topic
+
+### Phase 2: Content Creation
+5. **Format Learning Path**: Create structured content with:
+   - Clear daily objectives
+   - Video recommendations with links
+   - Practice exercises
+   - Progress checkpoints
+   - Additional resources
+
+"""
+
+tool_integration_section = """### Phase 3: Tool Integration (Based on Availability)
+"""
+
+document_creation_step_section = """6. **Document Creation** (if Drive/Notion available):
+   - Create a comprehensive document/page
+   - Include all learning path content
+   - Format with proper headers and structure
+   - Add clickable video links
+   - Include practice exercises and resources
+
+"""
+
+playlist_step_section = """7. **YouTube Playlist Creation** (if YouTube available):
+   - Create a public playlist with relevant title
+   - Add selected core videos
+   - Organize videos in logical order
+   - Include playlist description
+
+"""
+
+quality_assurance_section = """### Phase 4: Quality Assurance
+8. **Review & Enhance**:
+   - Ensure logical progression
+   - Verify all links are working
+   - Add supplementary resources
+   - Include progress tracking methods
+
+"""
+
+output_format_section = """## Output Format:
+
+"""
+
+full_format_section = """### For Full Integration (Drive/Notion + YouTube):
+```
+""" + full_output_format + """```
+
+"""
+
+youtube_only_format_section = """### For YouTube-Only Mode:
 ```
+""" + youtube_only_output_format + """```
 
-## General Guidelines:
+"""
+
+general_guidelines_section = """## General Guidelines:
 
 ### Content Quality:
 - Focus on **practical, hands-on learning**
@@ -151,13 +181,17 @@ Main Instruction: You are an expert learning path generator that creates compreh
 - **Include troubleshooting tips**
 - **Offer alternative resources**
 
-## Error Handling:
+"""
+
+error_handling_section = """## Error Handling:
 - If a tool fails, **continue with available tools**
 - If video search fails, **suggest alternative search terms**
 - If document creation fails, **provide formatted text output**
 - Always **provide value** even with limited tools
 
-## Final Output Requirements:
+"""
+
+final_requirements_section = """## Final Output Requirements:
 1. **Clear structure** with headers and sections
 2. **Working video links** for all recommendations
 3. **Practical exercises** for each day
@@ -167,3 +201,78 @@ Main Instruction: You are an expert learning path generator that creates compreh
 
 Remember: The goal is to create an **engaging, practical, and achievable** learning path that helps users reach their objectives effectively.
 """
+
+FULL = "full"
+YOUTUBE_ONLY = "youtube_only"
+BOTH_MODES = (FULL, YOUTUBE_ONLY)
+
+# Required sections are always sent; optional ones are dropped in descending
+# priority order (highest number first) when the prompt exceeds its token budget.
+PROMPT_SECTIONS: List[Dict[str, Any]] = [
+    {"name": "main_instruction", "text": main_instruction_section, "modes": BOTH_MODES, "required": True},
+    {"name": "youtube_tools", "text": youtube_tools_section, "modes": BOTH_MODES, "required": True},
+    {"name": "document_tools", "text": document_tools_section, "modes": (FULL,), "required": True},
+    {"name": "planning_phases", "text": planning_phases_section, "modes": BOTH_MODES, "required": True},
+    {"name": "tool_integration", "text": tool_integration_section, "modes": BOTH_MODES, "required": True},
+    {"name": "document_creation_step", "text": document_creation_step_section, "modes": (FULL,), "required": True},
+    {"name": "playlist_step", "text": playlist_step_section, "modes": BOTH_MODES, "required": True},
+    {"name": "quality_assurance", "text": quality_assurance_section, "modes": BOTH_MODES, "required": False, "priority": 2},
+    {"name": "output_format", "text": output_format_section, "modes": BOTH_MODES, "required": True},
+    {"name": "full_format", "text": full_format_section, "modes": (FULL,), "required": True},
+    {"name": "youtube_only_format", "text": youtube_only_format_section, "modes": (YOUTUBE_ONLY,), "required": True},
+    {"name": "general_guidelines", "text": general_guidelines_section, "modes": BOTH_MODES, "required": False, "priority": 4},
+    {"name": "error_handling", "text": error_handling_section, "modes": BOTH_MODES, "required": False, "priority": 3},
+    {"name": "final_requirements", "text": final_requirements_section, "modes": BOTH_MODES, "required": False, "priority": 1},
+]
+
+# The complete prompt with every section, covering both output formats
+user_goal_prompt = "".join(section["text"] for section in PROMPT_SECTIONS)
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Approximate the token count of English prompt text without calling the model."""
+    return int(len(text) / chars_per_token + 0.999)
+
+
+def build_learning_path_prompt(
+    user_goal: str,
+    mode: str,
+    token_budget: Optional[int] = None,
+    chars_per_token: float = 4.0
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Assemble the prompt from the sections relevant to the mode ("full" or "youtube_only").
+    Optional sections are dropped until the prompt fits token_budget. Returns the prompt
+    and a report of per-section token counts, dropped sections and the total.
+    """
+    if mode not in BOTH_MODES:
+        raise ValueError(f"Unknown prompt mode: {mode}")
+
+    header = f"User Goal: {user_goal}\n"
+    sections = [section for section in PROMPT_SECTIONS if mode in section["modes"]]
+    tokens = {section["name"]: estimate_tokens(section["text"], chars_per_token) for section in sections}
+    total = estimate_tokens(header, chars_per_token) + sum(tokens.values())
+
+    dropped = []
+    if token_budget:
+        optional = sorted(
+            (section for section in sections if not section["required"]),
+            key=lambda section: -section["priority"]
+        )
+        for section in optional:
+            if total <= token_budget:
+                break
+            sections.remove(section)
+            total -= tokens[section["name"]]
+            dropped.append(section["name"])
+
+    prompt = header + "".join(section["text"] for section in sections)
+    report = {
+        "mode": mode,
+        "sections": {section["name"]: tokens[section["name"]] for section in sections},
+        "dropped": dropped,
+        "tokens": estimate_tokens(prompt, chars_per_token),
+        "budget": token_budget,
+        "over_budget": bool(token_budget) and total > token_budget
+    }
+    return prompt, report
@@ -0,0 +1,189 @@
+"""
+Timeouts, retries, hedged requests and circuit breakers for MCP server calls
+"""
+
+import asyncio
+import contextvars
+import random
+import sys
+import threading
+import time
+from typing import Optional, Any, Awaitable, Callable, Dict, Tuple, Type
+
+# Errors worth retrying: timeouts and connection failures, not tool errors. OSError covers
+# ConnectionError, and TimeoutError from Python 3.11; asyncio.TimeoutError is separate on 3.10.
+# HTTP clients add their own transport errors (see utils.transient_errors)
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, OSError)
+
+# Task groups wrap their errors in exception groups, a builtin from Python 3.11
+if sys.version_info >= (3, 11):
+    EXCEPTION_GROUPS: Tuple[Type[BaseException], ...] = (BaseExceptionGroup,)
+else:
+    try:
+        from exceptiongroup import BaseExceptionGroup as _BaseExceptionGroup
+        EXCEPTION_GROUPS = (_BaseExceptionGroup,)
+    except ImportError:
+        EXCEPTION_GROUPS = ()
+
+_run_resilience_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "run_resilience_stats", default=None
+)
+
+
+def start_resilience_run() -> Dict[str, int]:
+    """Start per-run retry, hedge and circuit counters for the current context and return them."""
+    stats = {"failures": 0, "retries": 0, "hedges": 0, "circuit_open": 0}
+    _run_resilience_stats.set(stats)
+    return stats
+
+
+def _count(name: str) -> None:
+    stats = _run_resilience_stats.get()
+    if stats is not None:
+        stats[name] += 1
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-server circuit breaker. After failure_threshold consecutive failures the
+    circuit opens and calls fail fast; after reset_timeout seconds one trial call
+    is let through (half-open), and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead, claiming the trial call when half-open."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+def is_transient(error: BaseException, transient: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS) -> bool:
+    """True for timeouts and connection errors, including task-group wrappers that hold only those."""
+    if EXCEPTION_GROUPS and isinstance(error, EXCEPTION_GROUPS):
+        return all(is_transient(inner, transient) for inner in error.exceptions)
+    return isinstance(error, transient)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with jitter: a random delay between half and all of the capped step."""
+    step = min(maximum, base * (2 ** attempt))
+    return random.uniform(step / 2, step)
+
+
+async def hedged(call: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+    """
+    Run call(); if it has not finished after hedge_after seconds, start a duplicate
+    and return whichever succeeds first. The other request, and both requests if
+    the caller is cancelled, are cancelled.
+    """
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done:
+            return tasks[0].result()
+
+        _count("hedges")
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Retrieve a losing request's error so it is not logged as never retrieved
+                task.exception()
+
+
+async def call_with_policy(
+    call: Callable[[], Awaitable[Any]],
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    backoff_base: float = 0.5,
+    backoff_max: float = 4.0,
+    hedge_after: Optional[float] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    transient: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS
+) -> Any:
+    """
+    Await call() under a per-attempt timeout, retrying transient failures with
+    jittered backoff. Every attempt's outcome feeds the circuit breaker, a cancelled
+    attempt counting as a failure; an open circuit raises CircuitOpenError without calling. Non-transient errors (e.g.
+    a tool rejecting its arguments) are raised at once and do not trip the breaker.
+    """
+    for attempt in range(retries + 1):
+        if breaker is not None and not breaker.allow():
+            _count("circuit_open")
+            raise CircuitOpenError("circuit open after repeated failures")
+        try:
+            if hedge_after is not None and (timeout is None or hedge_after < timeout):
+                result = await asyncio.wait_for(hedged(call, hedge_after), timeout=timeout)
+            else:
+                result = await asyncio.wait_for(call(), timeout=timeout)
+        except asyncio.CancelledError:
+            # An attempt cut off by its caller never reported back; count it as a failure
+            # so a half-open trial is released instead of blocking the circuit for good
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except Exception as e:
+            if not is_transient(e, transient):
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            _count("failures")
+            if attempt == retries:
+                raise
+            _count("retries")
+            await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
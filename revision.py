@@ -0,0 +1,252 @@
+"""
+Incremental revision of a generated learning path: regenerating or adding individual days
+"""
+
+import copy
+from typing import Optional, Any, Dict, List, Tuple
+
+from langchain_core.messages import HumanMessage
+
+from content import content_text
+from learning_path import Day, LearningPath, parse_learning_path
+from pipeline import parse_plan, research_days
+from progress import ProgressCallback, emit, generation_fraction
+from prompt import estimate_tokens
+
+# Appended in turn to a replaced day's query until it differs from the day's previous search
+QUERY_VARIANTS = ["", "tutorial", "explained", "for beginners"]
+
+EXTENSION_PROMPT = """
+You are extending a day-wise learning path by {count} days.
+
+User Goal: {user_goal}
+
+## Existing Days
+{summary}
+
+Return ONLY a JSON object, with no surrounding text, in this shape:
+{{
+  "days": [
+    {{"day": {first_day}, "title": "<topic for the day>", "search_query": "<YouTube search query for this day>"}}
+  ]
+}}
+
+Plan exactly {count} new days that build on the existing ones without repeating them.{feedback}
+"""
+
+REVISION_PROMPT = """
+User Goal: {user_goal}
+
+You are revising part of an existing learning path. Write only the days listed under
+"Days to Write"; the other days stay as they are and are summarized for context.
+Recommend only videos that appear in the search results, using their real URLs. Do not
+recommend videos the other days already use, or the videos a day being rewritten has now.
+
+## Other Days
+{summary}
+
+## Days to Write
+{days}
+
+## Search Results
+{research}
+{feedback}
+Write only those days, each in exactly this format:
+{day_format}
+"""
+
+
+def day_format(output_format: str) -> str:
+    """Cut the single-day section out of a learning path output format."""
+    start = output_format.find("### Day 1")
+    if start == -1:
+        return output_format
+    end = output_format.find("[Continue", start)
+    return output_format[start:end if end != -1 else None].strip()
+
+
+def summarize_day(day: Day, max_chars: int = 160) -> str:
+    """One line per day: its title and objectives, cut to max_chars."""
+    line = f"Day {day.number}: {day.title}"
+    if day.objectives:
+        line += f" ({'; '.join(day.objectives)})"
+    return line if len(line) <= max_chars else line[:max_chars - 3].rstrip() + "..."
+
+
+def summarize_days(days: List[Day], max_chars_per_day: int = 160) -> str:
+    return "\n".join(summarize_day(day, max_chars_per_day) for day in days) or "(none)"
+
+
+def _describe_day(day: Day) -> str:
+    """The version of a day being replaced, so the rewrite can improve on it."""
+    lines = [f"Day {day.number}: {day.title}"]
+    if day.videos:
+        lines.append("Replace these videos: " + "; ".join(f"{video.title} - {video.url}" for video in day.videos))
+    return "\n".join(lines)
+
+
+def fresh_query(learning_path: LearningPath, day: Day) -> str:
+    """A search query for a replaced day that differs from the search that found its current videos."""
+    previous = {
+        value.strip().lower()
+        for value in (day.search.get("arguments") or {}).values()
+        if isinstance(value, str)
+    }
+    query = f"{learning_path.title} {day.title}".strip()
+    for variant in QUERY_VARIANTS:
+        candidate = f"{query} {variant}".strip()
+        if candidate.lower() not in previous:
+            return candidate
+    return f"{day.title} {QUERY_VARIANTS[-1]}".strip()
+
+
+def splice_days(learning_path: LearningPath, revised_days: List[Day]) -> LearningPath:
+    """Return a copy of the learning path with revised days replacing or extending its own."""
+    revised = copy.deepcopy(learning_path)
+    by_number = {day.number: day for day in revised.days}
+    for day in revised_days:
+        by_number[day.number] = copy.deepcopy(day)
+    revised.days = [by_number[number] for number in sorted(by_number)]
+    if "Duration" in revised.overview:
+        revised.overview["Duration"] = f"{len(revised.days)} days"
+    return revised
+
+
+def _match_days(parsed: List[Day], numbers: List[int]) -> List[Day]:
+    """Keep the written days that were asked for; renumber them by position if the model numbered them differently."""
+    wanted = [day for day in parsed if day.number in numbers]
+    if not wanted and len(parsed) == len(numbers):
+        for day, number in zip(parsed, numbers):
+            day.number = number
+        return parsed
+    return wanted
+
+
+async def revise_learning_path(
+    planning_model: Any,
+    synthesis_model: Any,
+    search_tool: Any,
+    learning_path: LearningPath,
+    user_goal: str,
+    output_format: str,
+    config: Dict[str, Any],
+    regenerate: Optional[List[int]] = None,
+    extend: int = 0,
+    feedback: str = "",
+    agent_config: Any = None,
+    progress_callback: Optional[ProgressCallback] = None
+) -> Tuple[LearningPath, Dict[str, Any]]:
+    """
+    Rewrite the given days and/or add extend new days at the end, keeping every other
+    day and its videos as they are. Only the affected days are searched and written;
+    the rest of the path reaches the model as a one-line-per-day summary.
+    Returns the revised learning path and a report of what was sent to the model.
+    """
+    regenerate = sorted(set(regenerate or []))
+    numbers = {day.number for day in learning_path.days}
+    missing = [number for number in regenerate if number not in numbers]
+    if missing:
+        raise ValueError(f"The learning path has no day {', '.join(str(number) for number in missing)}")
+    if extend < 0 or len(learning_path.days) + extend > config["max_days"]:
+        raise ValueError(f"A learning path can have at most {config['max_days']} days")
+    if not regenerate and not extend:
+        raise ValueError("Nothing to revise: choose days to regenerate or a number of days to add")
+
+    feedback_text = f"\n\nUser feedback: {feedback.strip()}\n" if feedback.strip() else ""
+    max_chars = config["max_summary_chars_per_day"]
+    kept = [day for day in learning_path.days if day.number not in regenerate]
+    replaced = [day for day in learning_path.days if day.number in regenerate]
+    prompt_tokens = 0
+
+    # Replaced days search again with a new query, leaving out the videos they have now
+    affected = [
+        {
+            "day": day.number,
+            "title": day.title,
+            "search_query": fresh_query(learning_path, day),
+            "exclude_urls": [video.url for video in day.videos]
+        }
+        for day in replaced
+    ]
+    if extend:
+        emit(progress_callback, "generation", f"Planning {extend} more days...")
+        first_day = max(numbers, default=0) + 1
+        extension_prompt = EXTENSION_PROMPT.format(
+            count=extend,
+            user_goal=user_goal,
+            summary=summarize_days(learning_path.days, max_chars),
+            first_day=first_day,
+            feedback=feedback_text.rstrip()
+        )
+        prompt_tokens += estimate_tokens(extension_prompt)
+        reply = await planning_model.ainvoke([HumanMessage(content=extension_prompt)], config=agent_config)
+        for day in parse_plan(content_text(reply.content), extend)["days"]:
+            affected.append({**day, "day": first_day + day["day"] - 1})
+
+    total = len(affected)
+    emit(
+        progress_callback,
+        "generation",
+        f"Researching videos for {total} days...",
+        fraction=generation_fraction(1, total + 2),
+        step=1,
+        estimated_remaining_steps=total + 1
+    )
+    research = await research_days(
+        {"days": affected},
+        search_tool,
+        max_concurrency=config["max_concurrent_searches"],
+        max_results=config["videos_per_day"],
+        max_chars_per_day=config["max_result_chars_per_day"],
+        progress_callback=progress_callback,
+        run_config=agent_config
+    )
+
+    emit(
+        progress_callback,
+        "generation",
+        f"Writing {total} days...",
+        fraction=generation_fraction(total + 1, total + 2),
+        step=total + 1,
+        tools_called=total,
+        estimated_remaining_steps=1
+    )
+    replaced_by_number = {day.number: day for day in replaced}
+    days_text = "\n\n".join(
+        _describe_day(replaced_by_number[day["day"]]) if day["day"] in replaced_by_number
+        else f"Day {day['day']}: {day['title']} (new)"
+        for day in affected
+    )
+    used_urls = [video.url for day in kept for video in day.videos]
+    summary = summarize_days(kept, max_chars)
+    if used_urls:
+        summary += "\n\nVideos already used: " + " ".join(used_urls)
+    revision_prompt = REVISION_PROMPT.format(
+        user_goal=user_goal,
+        summary=summary,
+        days=days_text,
+        research="\n\n".join(f"### Day {day}\n{output}" for day, output in research.items()),
+        feedback=feedback_text,
+        day_format=day_format(output_format)
+    )
+    prompt_tokens += estimate_tokens(revision_prompt)
+    reply = await synthesis_model.ainvoke([HumanMessage(content=revision_prompt)], config=agent_config)
+
+    affected_numbers = [day["day"] for day in affected]
+    revised_days = _match_days(parse_learning_path(content_text(reply.content)).days, affected_numbers)
+    if not revised_days:
+        raise ValueError("The revision did not return any of the requested days")
+    searches = {day["day"]: day.get("search", {}) for day in affected}
+    for day in revised_days:
+        day.search = searches.get(day.number, {})
+    written = {day.number for day in revised_days}
+
+    report = {
+        "regenerated": [number for number in regenerate if number in written],
+        "added": [number for number in affected_numbers if number not in numbers and number in written],
+        "days_written": len(revised_days),
+        "days_summarized": len(kept),
+        "searches": total,
+        "prompt_tokens": prompt_tokens
+    }
+    return splice_days(learning_path, revised_days), report
@@ -0,0 +1,135 @@
+"""
+Process-wide background event loop shared by all generations
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import Optional, Any, Callable, Coroutine
+
+
+class BackgroundLoop:
+    """
+    An asyncio event loop running forever on a daemon thread.
+    Coroutines can be submitted from any thread; async resources created on the
+    loop (MCP clients, HTTP connections, model clients) outlive a single run.
+    """
+
+    def __init__(self, name: str = "mcp-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running event loop, starting it if necessary."""
+        self.start()
+        return self._loop
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running."""
+        with self._lock:
+            if self.is_running():
+                return
+            self._started.clear()
+            self._thread = threading.Thread(target=self._serve, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def _serve(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None,
+            relay: Optional["CallbackRelay"] = None) -> Any:
+        """
+        Run a coroutine on the loop and block the calling thread until it finishes.
+        Callbacks queued on the relay are replayed on the calling thread while waiting.
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the loop thread")
+
+        future = self.submit(coro)
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while True:
+                try:
+                    return future.result(timeout=0.05)
+                except concurrent.futures.TimeoutError:
+                    if relay:
+                        relay.drain()
+                    if deadline and time.monotonic() > deadline:
+                        raise TimeoutError(f"Operation did not finish within {timeout} seconds")
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if relay:
+                relay.drain()
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        if not self.is_running():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class CallbackRelay:
+    """
+    Collects callback invocations made on the loop thread so they can be replayed
+    on the thread that owns the callback (e.g. the Streamlit script thread).
+    """
+
+    def __init__(self, callback: Optional[Callable[..., None]]):
+        self.callback = callback
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+
+    def __call__(self, *args: Any) -> None:
+        self._queue.put(args)
+
+    def drain(self) -> None:
+        """Invoke the callback for every queued call, in order."""
+        while True:
+            try:
+                args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if self.callback:
+                self.callback(*args)
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide background loop, starting it on first use."""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+            atexit.register(_background_loop.stop)
+    _background_loop.start()
+    return _background_loop
@@ -0,0 +1,189 @@
+"""
+Single-flight deduplication of identical in-flight generations
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Tuple
+
+EventCallback = Callable[[Any], None]
+
+
+class Flight:
+    """One in-flight execution: the events it has published, its subscribers and its result."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.events: List[Any] = []
+        self.subscribers: List[EventCallback] = []
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def publish(self, event: Any) -> None:
+        with self._lock:
+            self.events.append(event)
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            callback(event)
+
+    def subscribe(self, callback: EventCallback) -> None:
+        """Replay the events published so far to callback, then forward new ones."""
+        with self._lock:
+            backlog = list(self.events)
+            self.subscribers.append(callback)
+        for event in backlog:
+            callback(event)
+
+    def unsubscribe(self, callback: EventCallback) -> None:
+        with self._lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+
+class SingleFlight:
+    """
+    Collapses concurrent executions with the same key into one.
+
+    The first caller starts work(publish) as its own task; callers arriving while it
+    is in flight join it, receive every event it has published so far and from then
+    on, and get its result. Results and errors go to every caller. The work is
+    cancelled only once every caller has been cancelled. Safe to use from several
+    threads and event loops in one process.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "joined": 0}
+
+    async def run(
+        self,
+        key: str,
+        work: Callable[[EventCallback], Awaitable[Any]],
+        on_event: Optional[EventCallback] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run work for the key, or join the execution already in flight.
+        Returns the result and whether it came from another caller's execution.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            joined = flight is not None
+            if not joined:
+                flight = Flight(key)
+                self._flights[key] = flight
+            self._stats["joined" if joined else "executions"] += 1
+            flight.waiters += 1
+        if on_event is not None:
+            flight.subscribe(on_event)
+        if not joined:
+            flight.loop = asyncio.get_running_loop()
+            flight.task = flight.loop.create_task(self._execute(flight, work))
+        try:
+            result = await asyncio.shield(asyncio.wrap_future(flight.future))
+        except asyncio.CancelledError:
+            self._leave(flight)
+            raise
+        finally:
+            if on_event is not None:
+                flight.unsubscribe(on_event)
+        return result, joined
+
+    async def _execute(self, flight: Flight, work: Callable[[EventCallback], Awaitable[Any]]) -> None:
+        try:
+            result = await work(flight.publish)
+        except asyncio.CancelledError:
+            self._finish(flight)
+            flight.future.cancel()
+            raise
+        except Exception as e:
+            self._finish(flight)
+            flight.future.set_exception(e)
+        else:
+            self._finish(flight)
+            flight.future.set_result(result)
+
+    def _finish(self, flight: Flight) -> None:
+        # Callers arriving from now on start a fresh execution
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def _leave(self, flight: Flight) -> None:
+        with self._lock:
+            flight.waiters -= 1
+            abandoned = flight.waiters == 0 and not flight.future.done()
+        if abandoned and flight.task is not None:
+            flight.loop.call_soon_threadsafe(flight.task.cancel)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights)}
+
+
+class FileLock:
+    """
+    An exclusive advisory lock file shared by the worker processes on one host.
+    Acquired by polling, so waiting never blocks the event loop and can be cancelled.
+    The holder removes the file on release, so lock files do not pile up.
+    Where fcntl is unavailable the lock is a no-op.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.2):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._file = None
+
+    async def acquire(self, on_wait: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Take the lock; returns True if another process held it and had to be waited for.
+        on_wait is called once when the lock turns out to be held.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        waited = False
+        while True:
+            file = open(self.path, "a")
+            try:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                file.close()
+                if not waited and on_wait is not None:
+                    on_wait()
+                waited = True
+                await asyncio.sleep(self.poll_interval)
+                continue
+            # The previous holder may have removed the file after it was opened here;
+            # a lock on a removed file excludes nobody, so open the path again
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_ino == os.fstat(file.fileno()).st_ino:
+                self._file = file
+                return waited
+            file.close()
+
+    def release(self) -> None:
+        if self._file is not None:
+            # Removed while still locked: a waiter that locks the old file next finds it gone and reopens
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self._file.close()
+            self._file = None
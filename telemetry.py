@@ -0,0 +1,137 @@
+"""
+Per-run timing instrumentation: setup phases, LLM turns and tool calls
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Any, Dict, Iterator, List
+
+_current_trace: contextvars.ContextVar[Optional["RunTrace"]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class RunTrace:
+    """Collects timed spans for one generation run."""
+
+    def __init__(self, name: str = "generate_learning_path"):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start_time = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_span(
+        self,
+        name: str,
+        start_time: float,
+        duration_ms: float,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        status: str = "ok"
+    ) -> None:
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "kind": kind,
+                "span_id": uuid.uuid4().hex[:16],
+                "start_time": start_time,
+                "duration_ms": round(duration_ms, 2),
+                "status": status,
+                "attributes": attributes or {}
+            })
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block; the yielded dict can be used to add attributes."""
+        start_time = time.time()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield attributes
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.add_span(name, start_time, (time.perf_counter() - started) * 1000, kind, attributes, status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the run: total time, per-phase totals and counts, and every span."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_time"])
+        phases: Dict[str, Dict[str, float]] = {}
+        for span_record in spans:
+            phase = phases.setdefault(span_record["name"], {"count": 0, "total_ms": 0.0})
+            phase["count"] += 1
+            phase["total_ms"] = round(phase["total_ms"] + span_record["duration_ms"], 2)
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "phases": phases,
+            "spans": spans
+        }
+
+
+def start_trace(name: str = "generate_learning_path") -> RunTrace:
+    """Start a trace for the current context and return it."""
+    trace = RunTrace(name)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Time a block against the current trace; a no-op outside a traced run."""
+    trace = current_trace()
+    if trace is None:
+        yield attributes
+        return
+    with trace.span(name, kind, **attributes) as span_attributes:
+        yield span_attributes
+
+
+def export_spans(trace: RunTrace, path: str, service_name: str = "mcp-learning-path") -> None:
+    """
+    Append the trace to a JSONL file as OpenTelemetry-style spans
+    (one root span for the run plus one child span per recorded span).
+    """
+    summary = trace.to_dict()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    def _otel(name, span_id, parent_id, start_time, duration_ms, kind, status, attributes):
+        start_ns = int(start_time * 1e9)
+        return {
+            "resource": {"service.name": service_name},
+            "trace_id": trace.trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_id,
+            "name": name,
+            "kind": f"SPAN_KIND_{kind.upper()}",
+            "start_time_unix_nano": start_ns,
+            "end_time_unix_nano": start_ns + int(duration_ms * 1e6),
+            "status": {"code": "STATUS_CODE_ERROR" if status == "error" else "STATUS_CODE_OK"},
+            "attributes": {k: v for k, v in attributes.items() if v is not None}
+        }
+
+    records = [_otel(trace.name, trace.span_id, None, trace.start_time, summary["total_ms"], "internal", "ok", {})]
+    records += [
+        _otel(s["name"], s["span_id"], trace.span_id, s["start_time"], s["duration_ms"], s["kind"], s["status"],
+              s["attributes"])
+        for s in summary["spans"]
+    ]
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from cache import DiskCache, ToolCallCache, make_cache_key, normalize_goal, start_tool_cache_run
+
+
+def test_trivially_different_goals_share_a_cache_key():
+    assert normalize_goal("  Learn   Python in 7 days! ") == normalize_goal("learn python in 7 days")
+    assert make_cache_key(normalize_goal("Learn Python."), "youtube_only") == \
+        make_cache_key(normalize_goal("learn python"), "youtube_only")
+
+
+def test_disk_cache_round_trips_values_across_instances(tmp_path):
+    path = str(tmp_path / "cache" / "results.sqlite")
+    DiskCache(path).set("goal", {"learning_path": {"days": [1, 2]}, "status_report": {}})
+    cache = DiskCache(path)
+    assert cache.get("goal") == {"learning_path": {"days": [1, 2]}, "status_report": {}}
+    assert cache.get("other") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+
+def test_disk_cache_expires_entries_after_their_ttl(tmp_path):
+    cache = DiskCache(str(tmp_path / "results.sqlite"), ttl_seconds=0.05)
+    cache.set("goal", "path")
+    assert cache.get("goal") == "path"
+    time.sleep(0.06)
+    assert cache.get("goal") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disk_cache_evicts_the_least_recently_used_entry(tmp_path):
+    cache = DiskCache(str(tmp_path / "results.sqlite"), max_entries=2)
+    cache.set("first", 1)
+    time.sleep(0.01)
+    cache.set("second", 2)
+    time.sleep(0.01)
+    assert cache.get("first") == 1
+    time.sleep(0.01)
+    cache.set("third", 3)
+    assert cache.get("second") is None
+    assert (cache.get("first"), cache.get("third")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+class FakeTool:
+    """The parts of a LangChain StructuredTool the tool cache uses."""
+
+    def __init__(self, name, coroutine):
+        self.name = name
+        self.coroutine = coroutine
+
+    def model_copy(self, update):
+        return FakeTool(self.name, update["coroutine"])
+
+
+def _counting_tool(name):
+    calls = []
+
+    async def call(**arguments):
+        calls.append(arguments)
+        return f"{name} result {len(calls)}"
+
+    return FakeTool(name, call), calls
+
+
+RULES = [
+    {"pattern": r"search", "ttl_seconds": 0.05, "shared": True, "casefold": True},
+    {"pattern": r"details", "ttl_seconds": 60, "shared": False}
+]
+
+
+def test_tool_cache_memoizes_read_only_calls_with_canonical_arguments():
+    cache = ToolCallCache(RULES, never_cache_pattern=r"create|write")
+    search, calls = _counting_tool("youtube_search")
+    cached = cache.wrap_tool(search)
+
+    async def scenario() -> None:
+        start_tool_cache_run()
+        assert await cached.coroutine(query="Rust  Basics") == "youtube_search result 1"
+        assert await cached.coroutine(query=" rust basics", pageToken=None) == "youtube_search result 1"
+        assert len(calls) == 1
+        await asyncio.sleep(0.06)
+        assert await cached.coroutine(query="rust basics") == "youtube_search result 2"
+
+    asyncio.run(scenario())
+    assert cache.stats()["tools"]["youtube_search"] == {"hits": 1, "misses": 2}
+
+
+def test_tool_cache_never_caches_writes_and_scopes_unshared_results():
+    cache = ToolCallCache(RULES, never_cache_pattern=r"create|write")
+    playlist, _ = _counting_tool("create_playlist_search")
+    assert cache.wrap_tool(playlist) is playlist
+
+    details, calls = _counting_tool("video_details")
+    first, second = cache.wrap_tool(details, scope="key-a"), cache.wrap_tool(details, scope="key-b")
+
+    async def scenario() -> None:
+        await first.coroutine(id="abc")
+        await first.coroutine(id="abc")
+        await second.coroutine(id="abc")
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
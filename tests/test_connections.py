@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from connections import ConnectionPools, PersistentSession, PooledTransport, start_connection_run
+
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """Fails the first requests with the given errors, after the given trace events, then answers 200."""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.requests = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        if self.failures:
+            events, error = self.failures.pop(0)
+            for event in events:
+                await request.extensions["trace"](event, {})
+            raise error
+        return httpx.Response(200, request=request)
+
+    async def aclose(self):
+        pass
+
+
+def _pooled(failures) -> tuple:
+    transport = PooledTransport()
+    fake = FakeTransport(failures)
+    transport._transport = fake
+    return transport, fake
+
+
+def test_request_failing_on_a_stale_connection_before_sending_is_retried():
+    async def scenario() -> None:
+        transport, fake = _pooled([([], httpx.ReadError("connection reset"))])
+        response = await transport.handle_async_request(httpx.Request("POST", "https://mcp.example/youtube"))
+        assert response.status_code == 200
+        assert fake.requests == 2
+        assert transport.stats()["reconnects"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_request_failing_after_it_was_sent_is_not_resent():
+    async def scenario() -> None:
+        transport, fake = _pooled([(["http11.send_request_headers.started"], httpx.ReadError("connection reset"))])
+        with pytest.raises(httpx.ReadError):
+            await transport.handle_async_request(httpx.Request("POST", "https://mcp.example/youtube"))
+        assert fake.requests == 1
+        assert transport.stats()["errors"] == 1
+
+    asyncio.run(scenario())
+
+
+class FakeSession:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.calls = []
+
+    async def initialize(self):
+        pass
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append(name)
+        if self.fail_with is not None:
+            raise self.fail_with
+        return {"tool": name}
+
+
+def _fake_create_session(monkeypatch, sessions):
+    sessions_module = pytest.importorskip("langchain_mcp_adapters.sessions")
+    opened = []
+
+    @contextlib.asynccontextmanager
+    async def create_session(connection):
+        session = sessions.pop(0)
+        opened.append(session)
+        yield session
+
+    monkeypatch.setattr(sessions_module, "create_session", create_session)
+    return opened
+
+
+def test_tool_calls_share_one_session(monkeypatch):
+    opened = _fake_create_session(monkeypatch, [FakeSession()])
+
+    async def scenario() -> None:
+        stats = start_connection_run()
+        session = PersistentSession({"url": "https://mcp.example/youtube"})
+        results = await asyncio.gather(session.call_tool("search"), session.call_tool("details"))
+        assert results == [{"tool": "search"}, {"tool": "details"}]
+        assert len(opened) == 1
+        assert stats["sessions"] == 1
+        session.close()
+
+    asyncio.run(scenario())
+
+
+def test_broken_session_is_reopened_on_the_next_call(monkeypatch):
+    opened = _fake_create_session(monkeypatch, [FakeSession(httpx.ReadError("stream closed")), FakeSession()])
+
+    async def scenario() -> None:
+        session = PersistentSession({"url": "https://mcp.example/youtube"})
+        with pytest.raises(httpx.ReadError):
+            await session.call_tool("search")
+        assert await session.call_tool("search") == {"tool": "search"}
+        assert len(opened) == 2
+        # The failed call was not resent on the new session
+        assert [len(fake.calls) for fake in opened] == [1, 1]
+        session.close()
+
+    asyncio.run(scenario())
+
+
+def test_closing_the_pools_closes_their_sessions(monkeypatch):
+    opened = _fake_create_session(monkeypatch, [FakeSession(), FakeSession()])
+
+    async def scenario() -> None:
+        pools = ConnectionPools()
+        url = "https://mcp.example/youtube"
+        session = pools.session(url, {"url": url})
+        await session.call_tool("search")
+        pools.close(url)
+        assert pools.session(url, {"url": url}) is not session
+        await asyncio.sleep(0)
+        await session.call_tool("search")
+        assert len(opened) == 2
+        session.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from governor import partial_learning_path
+
+
+def test_partial_learning_path_keeps_a_final_answer_given_as_content_parts():
+    messages = [
+        HumanMessage(content="Learn Rust in 3 days"),
+        AIMessage(content=[{"type": "text", "text": "# Learning Path: Rust\n"}, {"type": "text", "text": "### Day 1"}])
+    ]
+    text = partial_learning_path(messages, "step limit")
+    assert "Generation stopped early (step limit)" in text
+    assert "# Learning Path: Rust\n### Day 1" in text
+
+
+def test_partial_learning_path_lists_videos_from_tool_output_given_as_content_parts():
+    listing = json.dumps([{"title": "Rust Basics", "url": "https://www.youtube.com/watch?v=abc", "channel": "Rustaceans"}])
+    messages = [
+        AIMessage(content="", tool_calls=[{"id": "call-1", "name": "youtube_search", "args": {"query": "rust basics"}}]),
+        ToolMessage(content=[{"type": "text", "text": listing}], tool_call_id="call-1")
+    ]
+    text = partial_learning_path(messages, "deadline")
+    assert "### rust basics" in text
+    assert "- Rust Basics - https://www.youtube.com/watch?v=abc (Rustaceans)" in text
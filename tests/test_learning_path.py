@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+from learning_path import LearningPath, Video, learning_path_from_messages, parse_learning_path
+
+FALLBACK_ANSWER = """# Learning Path: Python
+
+## Day 1: Syntax
+**Learning Objectives:**
+- Write a script
+
+**Recommended Videos:**
+1. Python Basics - https://www.youtube.com/watch?v=basics
+
+**Practice Exercise:**
+Print a multiplication table.
+
+## Day 2: Functions
+**Learning Objectives:**
+- Define functions
+
+**Recommended Videos:**
+1. Python Functions - https://www.youtube.com/watch?v=functions
+
+**Practice Exercise:**
+Write a calculator.
+
+**Additional Resources:**
+- Corey Schafer's channel
+- docs.python.org
+
+**Note:** Videos were chosen for beginners.
+"""
+
+HEADER_ANSWER = """# Learning Path: Python
+
+## Overview
+- **Goal**: Learn Python
+- **Duration**: 1 days
+
+## Daily Breakdown
+
+### Day 1: Syntax
+**Learning Objectives:**
+- Write a script
+
+**Core Video:** Python Basics - https://www.youtube.com/watch?v=basics
+**Additional Videos:**
+- Python Syntax - https://www.youtube.com/watch?v=syntax
+
+**Practice Exercise:**
+Print a multiplication table.
+
+**Progress Check:**
+Explain what a variable is.
+
+## Additional Resources
+- **Recommended Channels:** Corey Schafer
+
+## Progress Tracking
+- Daily checkpoints
+"""
+
+
+def test_fallback_format_ends_the_last_day_at_its_bold_section_labels():
+    path = parse_learning_path(FALLBACK_ANSWER)
+    assert path.title == "Python"
+    assert [day.title for day in path.days] == ["Syntax", "Functions"]
+    assert path.days[1].exercise == "Write a calculator."
+    assert path.days[1].videos == [Video("Python Functions", "https://www.youtube.com/watch?v=functions")]
+    assert path.resources == ["Corey Schafer's channel", "docs.python.org"]
+    assert path.notes == ["**Note:** Videos were chosen for beginners."]
+
+
+def test_header_format_fills_every_section():
+    path = parse_learning_path(HEADER_ANSWER)
+    assert path.overview == {"Goal": "Learn Python", "Duration": "1 days"}
+    day = path.days[0]
+    assert day.objectives == ["Write a script"]
+    assert day.videos == [
+        Video("Python Basics", "https://www.youtube.com/watch?v=basics", core=True),
+        Video("Python Syntax", "https://www.youtube.com/watch?v=syntax")
+    ]
+    assert day.exercise == "Print a multiplication table."
+    assert day.progress_check == "Explain what a variable is."
+    assert path.resources == ["**Recommended Channels:** Corey Schafer"]
+    assert path.progress_tracking == ["Daily checkpoints"]
+    assert path.notes == []
+
+
+def test_answer_given_as_content_parts_is_parsed():
+    messages = [
+        SimpleNamespace(type="human", content="Learn Python"),
+        SimpleNamespace(type="ai", content="", tool_calls=[{"name": "youtube_search", "args": {}}]),
+        SimpleNamespace(
+            type="ai",
+            content=[{"type": "text", "text": FALLBACK_ANSWER[:300]}, {"type": "text", "text": FALLBACK_ANSWER[300:]}],
+            tool_calls=[]
+        ),
+        SimpleNamespace(type="ai", content=["Saved to Notion: https://notion.so/page"], tool_calls=[])
+    ]
+    expected = parse_learning_path(FALLBACK_ANSWER)
+    expected.notes.append("Saved to Notion: https://notion.so/page")
+    assert learning_path_from_messages(messages) == expected
+
+
+def test_round_trip_through_markdown():
+    path = parse_learning_path(HEADER_ANSWER)
+    assert parse_learning_path(path.to_markdown()) == path
+    assert LearningPath.from_dict(path.to_dict()) == path
@@ -0,0 +1,14 @@
+import pytest
+
+from progress import estimate_days
+
+
+@pytest.mark.parametrize("goal, days", [
+    ("Learn SQL in 10 days", 10),
+    ("Learn Go in 2 weeks", 14),
+    ("Learn Spanish in 1 month", 30),
+    ("Learn Kotlin in 3 Months", 90),
+    ("Learn to cook", 7)
+])
+def test_estimate_days(goal, days):
+    assert estimate_days(goal) == days
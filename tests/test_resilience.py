@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from resilience import EXCEPTION_GROUPS, CircuitBreaker, CircuitOpenError, call_with_policy, hedged, is_transient
+
+
+async def _fail() -> None:
+    raise ConnectionError("server unavailable")
+
+
+async def _succeed() -> str:
+    return "ok"
+
+
+def test_cancelled_half_open_trial_releases_the_circuit():
+    async def scenario() -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with pytest.raises(ConnectionError):
+            await call_with_policy(_fail, breaker=breaker)
+        assert breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        assert breaker.state == "half_open"
+        trial = asyncio.ensure_future(call_with_policy(lambda: asyncio.sleep(10), breaker=breaker))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The cancelled trial counts as a failure and re-opens the circuit
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await call_with_policy(_succeed, breaker=breaker)
+
+        # Once the reset timeout has passed again a new trial is let through
+        await asyncio.sleep(0.06)
+        assert await call_with_policy(_succeed, breaker=breaker) == "ok"
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_trial_reopens_the_circuit():
+    async def scenario() -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        with pytest.raises(ConnectionError):
+            await call_with_policy(_fail, breaker=breaker)
+
+        await asyncio.sleep(0.06)
+        with pytest.raises(asyncio.TimeoutError):
+            await call_with_policy(lambda: asyncio.sleep(10), timeout=0.01, breaker=breaker)
+        assert breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        assert breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_exception_groups_are_transient_only_if_every_error_is():
+    group = EXCEPTION_GROUPS[0]
+    assert is_transient(group("task group", [ConnectionError(), asyncio.TimeoutError()]))
+    assert not is_transient(group("task group", [ConnectionError(), ValueError("bad arguments")]))
+    assert not is_transient(ValueError("bad arguments"))
+
+
+def test_cancelling_a_hedged_call_cancels_the_request():
+    async def scenario() -> None:
+        finished = []
+
+        async def slow_search() -> str:
+            await asyncio.sleep(0.1)
+            finished.append(True)
+            return "results"
+
+        call = asyncio.ensure_future(hedged(slow_search, hedge_after=0.5))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0.15)
+        assert finished == []
+
+    asyncio.run(scenario())
+
+
+def test_hedged_call_returns_the_first_success():
+    async def scenario() -> None:
+        calls = []
+
+        async def search() -> int:
+            calls.append(len(calls))
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            return len(calls)
+
+        assert await hedged(search, hedge_after=0.01) == 2
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("error", [asyncio.TimeoutError(), TimeoutError(), ConnectionResetError(), OSError()])
+def test_timeouts_and_connection_failures_are_transient(error):
+    assert is_transient(error)
+
+
+def test_tool_errors_are_not_transient():
+    assert not is_transient(ValueError("bad arguments"))
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from compaction import compact_tool_output
+from learning_path import Day, LearningPath, Video
+from revision import fresh_query, revise_learning_path
+
+CONFIG = {
+    "max_concurrent_searches": 2,
+    "videos_per_day": 2,
+    "max_days": 30,
+    "max_result_chars_per_day": 4000,
+    "max_summary_chars_per_day": 160
+}
+
+OUTPUT_FORMAT = "### Day 1: [Topic]\n**Learning Objectives:**\n- [Objective]\n[Continue for each day]"
+
+
+class FakeSearchTool:
+    name = "youtube_search"
+    args = {"query": {"type": "string"}, "maxResults": {"type": "integer"}}
+
+    def __init__(self, videos):
+        self.videos = videos
+        self.calls = []
+
+    async def ainvoke(self, arguments, config=None):
+        self.calls.append(arguments)
+        return json.dumps(self.videos)
+
+
+class FakeModel:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    async def ainvoke(self, messages, config=None):
+        self.prompts.append(messages[-1].content)
+        return SimpleNamespace(content=self.reply)
+
+
+def _learning_path() -> LearningPath:
+    return LearningPath(title="Rust", days=[
+        Day(number=1, title="Basics", videos=[Video("Rust Basics", "https://www.youtube.com/watch?v=basics")]),
+        Day(
+            number=2,
+            title="Ownership",
+            videos=[Video("Ownership Old", "https://www.youtube.com/watch?v=old")],
+            search={"tool": "youtube_search", "arguments": {"query": "Rust Ownership", "maxResults": 2}}
+        )
+    ])
+
+
+def test_fresh_query_differs_from_the_previous_search():
+    learning_path = _learning_path()
+    assert fresh_query(learning_path, learning_path.days[0]) == "Rust Basics"
+    assert fresh_query(learning_path, learning_path.days[1]) == "Rust Ownership tutorial"
+
+
+def test_compact_tool_output_leaves_out_excluded_videos():
+    listing = json.dumps([
+        {"title": "Old", "url": "https://www.youtube.com/watch?v=old"},
+        {"title": "New", "url": "https://www.youtube.com/watch?v=new"}
+    ])
+    assert compact_tool_output(listing, exclude_urls={"https://www.youtube.com/watch?v=old"}) == \
+        "New | https://www.youtube.com/watch?v=new"
+
+
+def test_regenerated_day_searches_again_without_its_current_videos():
+    search_tool = FakeSearchTool([
+        {"title": "Ownership Old", "url": "https://www.youtube.com/watch?v=old"},
+        {"title": "Ownership New", "url": "https://www.youtube.com/watch?v=new"}
+    ])
+    synthesis_model = FakeModel(
+        "### Day 2: Ownership\n**Learning Objectives:**\n- Borrowing\n"
+        "**Recommended Videos:**\n- Ownership New - https://www.youtube.com/watch?v=new"
+    )
+
+    async def scenario() -> None:
+        revised, report = await revise_learning_path(
+            planning_model=FakeModel(""),
+            synthesis_model=synthesis_model,
+            search_tool=search_tool,
+            learning_path=_learning_path(),
+            user_goal="Learn Rust",
+            output_format=OUTPUT_FORMAT,
+            config=CONFIG,
+            regenerate=[2]
+        )
+        # A new query, with room for the excluded video
+        assert search_tool.calls == [{"query": "Rust Ownership tutorial", "maxResults": 3}]
+        research = synthesis_model.prompts[0].split("## Search Results")[1]
+        assert "watch?v=old" not in research
+        assert "watch?v=new" in research
+        assert [video.url for video in revised.days[1].videos] == ["https://www.youtube.com/watch?v=new"]
+        assert revised.days[1].search["arguments"]["query"] == "Rust Ownership tutorial"
+        # The unchanged day is neither searched nor rewritten
+        assert revised.days[0] == _learning_path().days[0]
+        assert report["regenerated"] == [2]
+
+    asyncio.run(scenario())
+
+
+def _revision_setup(search_tool):
+    async def get_or_create_setup(**kwargs):
+        entry = SimpleNamespace(tools=[search_tool], models={"planning": FakeModel(""), "synthesis": FakeModel("")})
+        return entry, {"drive_available": False, "notion_available": False}
+    return get_or_create_setup
+
+
+def _run_revision(utils) -> dict:
+    return asyncio.run(utils.run_revision(
+        google_api_key="key",
+        youtube_pipedream_url="https://mcp.example/youtube",
+        user_goal="Learn Rust",
+        learning_path=_learning_path(),
+        regenerate_days=[2]
+    ))
+
+
+def test_revision_past_its_deadline_keeps_the_learning_path(monkeypatch):
+    pytest.importorskip("langgraph")
+    pytest.importorskip("httpx")
+    import utils
+    from governor import RunGovernor
+
+    class SlowSearchTool(FakeSearchTool):
+        async def ainvoke(self, arguments, config=None):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(utils, "get_or_create_setup", _revision_setup(SlowSearchTool([])))
+    monkeypatch.setattr(utils, "create_run_governor", lambda user_goal: RunGovernor(max_steps=10, deadline_seconds=0.05))
+    result = _run_revision(utils)
+    assert result["learning_path"] == _learning_path()
+    assert result["status_report"]["revision"] is None
+    assert result["status_report"]["governor"]["stop_reason"] == "deadline of 0s reached"
+
+
+def test_revision_failing_on_a_server_connection_closes_its_connections(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    import utils
+
+    async def get_or_create_setup(**kwargs):
+        raise httpx.ConnectError("connection refused")
+
+    invalidated = []
+    monkeypatch.setattr(utils, "get_or_create_setup", get_or_create_setup)
+    monkeypatch.setattr(utils, "invalidate_agent_pool", lambda *args, **kwargs: invalidated.append(kwargs))
+    with pytest.raises(httpx.ConnectError):
+        _run_revision(utils)
+    assert invalidated == [{"close_connections": True}]
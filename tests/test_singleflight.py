@@ -0,0 +1,121 @@
+import asyncio
+import os
+
+import utils
+from singleflight import FileLock, SingleFlight
+
+
+GENERATION = {
+    "google_api_key": "key-a",
+    "youtube_pipedream_url": "https://mcp.example/youtube",
+    "user_goal": "Learn Rust in 3 days"
+}
+
+
+def _fake_run_agent(calls: list):
+    async def run_agent(progress_callback=None, **kwargs) -> dict:
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        return {"status_report": {"google_api_key": kwargs["google_api_key"]}}
+    return run_agent
+
+
+def test_identical_work_runs_once_and_is_shared():
+    async def scenario() -> None:
+        flights = SingleFlight()
+        runs = []
+        events_a, events_b = [], []
+
+        async def work(publish) -> str:
+            runs.append(1)
+            publish("started")
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first, second = await asyncio.gather(
+            flights.run("key", work, events_a.append),
+            flights.run("key", work, events_b.append)
+        )
+        assert runs == [1]
+        assert first == ("done", False)
+        assert second == ("done", True)
+        # A caller that joins late still receives the events published before it joined
+        assert events_a == events_b == ["started"]
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_generations_with_different_keys_are_not_deduplicated(monkeypatch):
+    calls = []
+    monkeypatch.setattr(utils, "run_agent", _fake_run_agent(calls))
+
+    async def scenario() -> None:
+        variants = [
+            GENERATION,
+            {**GENERATION, "google_api_key": "key-b"},
+            {**GENERATION, "youtube_pipedream_url": "https://mcp.example/other-youtube"},
+            {**GENERATION, "refresh_cache": True},
+            {**GENERATION, "use_cache": False},
+            {**GENERATION, "use_pool": False}
+        ]
+        results = await asyncio.gather(*(utils.run_generation(lambda event: None, **kwargs) for kwargs in variants))
+        assert len(calls) == len(variants)
+        assert not any(result["status_report"].get("deduplicated") for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_identical_generations_are_deduplicated(monkeypatch):
+    calls = []
+    monkeypatch.setattr(utils, "run_agent", _fake_run_agent(calls))
+
+    async def scenario() -> None:
+        first, second = await asyncio.gather(
+            utils.run_generation(lambda event: None, **GENERATION),
+            utils.run_generation(lambda event: None, **GENERATION)
+        )
+        assert len(calls) == 1
+        assert [first["status_report"].get("deduplicated"), second["status_report"].get("deduplicated")] == [None, True]
+
+    asyncio.run(scenario())
+
+
+def test_file_lock_waits_for_the_holder_and_leaves_no_lock_file(tmp_path):
+    path = str(tmp_path / "locks" / "generation.lock")
+
+    async def scenario() -> None:
+        first = FileLock(path, poll_interval=0.01)
+        second = FileLock(path, poll_interval=0.01)
+        waits = []
+        assert await first.acquire() is False
+        waiting = asyncio.ensure_future(second.acquire(on_wait=lambda: waits.append(1)))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        first.release()
+        assert await waiting is True
+        assert waits == [1]
+        second.release()
+        assert not os.path.exists(path)
+
+    asyncio.run(scenario())
+
+
+def test_file_lock_serializes_many_holders(tmp_path):
+    path = str(tmp_path / "generation.lock")
+    holders = []
+
+    async def hold(index: int) -> None:
+        lock = FileLock(path, poll_interval=0.001)
+        await lock.acquire()
+        holders.append(index)
+        assert len(holders) == 1
+        await asyncio.sleep(0.005)
+        holders.remove(index)
+        lock.release()
+
+    async def scenario() -> None:
+        await asyncio.gather(*(hold(index) for index in range(8)))
+
+    asyncio.run(scenario())
+    assert os.listdir(tmp_path) == []
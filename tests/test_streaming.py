@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph")
+pytest.importorskip("httpx")
+
+import utils
+from progress import emit
+
+
+def test_setup_progress_is_streamed_while_setup_runs(monkeypatch):
+    released = asyncio.Event()
+    cancelled = []
+
+    async def get_or_create_agent(progress_callback=None, **kwargs):
+        emit(progress_callback, "setup", "Initializing MCP client... ✅")
+        try:
+            await released.wait()
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(utils, "get_or_create_agent", get_or_create_agent)
+
+    async def scenario() -> None:
+        stream = utils.stream_agent("key", "https://mcp.example/youtube", user_goal="Learn Rust", use_cache=False)
+        event = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        assert event["type"] == "progress"
+        assert event["message"] == "Initializing MCP client... ✅"
+        assert not released.is_set()
+        # Leaving the stream during setup cancels it
+        await stream.aclose()
+        await asyncio.sleep(0)
+        assert cancelled == [True]
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+"""
+Selection of the MCP tools the agent needs, keeping unused tool schemas out of every model turn
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from cache import tool_manifest
+from prompt import estimate_tokens
+
+
+def schema_tokens(tool: Any, chars_per_token: float = 4.0) -> int:
+    """Approximate the tokens a tool's name, description and input schema add to each model request."""
+    return estimate_tokens(json.dumps(tool_manifest([tool])[0], sort_keys=True), chars_per_token)
+
+
+def rank_tools(tools: List[Any], patterns: List[str], chars_per_token: float = 4.0) -> List[Any]:
+    """Return the tools matching any pattern, ordered by the first pattern they match, then by schema size."""
+    ranked = []
+    for tool in tools:
+        index = next(
+            (i for i, pattern in enumerate(patterns) if re.search(pattern, tool.name, re.IGNORECASE)), None
+        )
+        if index is not None:
+            ranked.append((index, schema_tokens(tool, chars_per_token), tool))
+    return [tool for _, _, tool in sorted(ranked, key=lambda item: item[:2])]
+
+
+def select_tools(
+    tools_by_server: Dict[str, List[Any]],
+    allowlist: Dict[str, List[str]],
+    max_tools_per_server: int = 4,
+    chars_per_token: float = 4.0
+) -> Tuple[Dict[str, List[Any]], Dict[str, Any]]:
+    """
+    Keep each server's allowlisted tools, best ranked first, up to max_tools_per_server.
+    A server without an allowlist entry, or with no matching tool, keeps all of its tools
+    so selection never removes a capability outright.
+    Returns the selected tools per server and a report of the schema tokens removed.
+    """
+    selected: Dict[str, List[Any]] = {}
+    dropped: List[str] = []
+    before = after = 0
+    for server, tools in tools_by_server.items():
+        kept = rank_tools(tools, allowlist.get(server, []), chars_per_token)[:max_tools_per_server] or tools
+        selected[server] = kept
+        kept_ids = {id(tool) for tool in kept}
+        for tool in tools:
+            tokens = schema_tokens(tool, chars_per_token)
+            before += tokens
+            if id(tool) in kept_ids:
+                after += tokens
+            else:
+                dropped.append(tool.name)
+
+    report = {
+        "discovered": sum(len(tools) for tools in tools_by_server.values()),
+        "selected": sum(len(tools) for tools in selected.values()),
+        "dropped": dropped,
+        "schema_tokens_before": before,
+        "schema_tokens_after": after,
+        "schema_tokens_removed": before - after
+    }
+    return selected, report
@@ -1,25 +1,343 @@
-from langchain_core.messages import HumanMessage
-from langchain_core.runnables import RunnableConfig
-from prompt import user_goal_prompt
-from langgraph.prebuilt import create_react_agent
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import Optional, Tuple, Any, Callable, Dict, List
+# LangChain, LangGraph, the MCP adapters and the Gemini client are imported inside the
+# functions that use them, so importing this module (and first rendering the app) stays fast
+from prompt import full_output_format, youtube_only_output_format, build_learning_path_prompt, estimate_tokens
+from config import MODEL_CONFIG, POOL_CONFIG, CACHE_CONFIG, TOOL_CACHE_CONFIG, PIPELINE_CONFIG, TELEMETRY_CONFIG, PROMPT_CONFIG
+from config import COMPACTION_CONFIG, GOVERNOR_CONFIG, JOB_CONFIG, HISTORY_CONFIG, TOOL_MANIFEST_CONFIG
+from config import TOOL_SELECTION_CONFIG, CONNECTION_POOL_CONFIG, RESILIENCE_CONFIG, TOOL_CONFIG, PROBE_CONFIG
+from config import SINGLE_FLIGHT_CONFIG, REVISION_CONFIG
+from agent_pool import AgentPool, PooledAgent, make_pool_key, fingerprint_api_key
+from cache import DiskCache, ToolCallCache, make_cache_key, normalize_goal, start_tool_cache_run
+from cache import ToolManifestCache, tool_manifest, tools_from_manifest
+from runtime import get_background_loop, CallbackRelay
+from jobs import Job, JobManager
+from learning_path import LearningPath, learning_path_from_messages
+from content import content_text
+from history import HistoryStore
+from probe import ServerProbes
+from singleflight import SingleFlight, FileLock
+from tool_selection import select_tools
+from resilience import CircuitBreaker, CircuitOpenError, TRANSIENT_ERRORS, call_with_policy, is_transient
+from resilience import start_resilience_run
+from telemetry import RunTrace, start_trace, span, export_spans
+from progress import ProgressEvent, ProgressCallback, emit, estimate_days
+from typing import Optional, Tuple, Any, Callable, Dict, List, AsyncIterator, TYPE_CHECKING
+from datetime import timedelta
 import asyncio
+import concurrent.futures
+import copy
+import importlib
+import os
 import re
 import json
+import threading
+import time
 
-cfg = RunnableConfig(recursion_limit=100)
+if TYPE_CHECKING:
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    from langchain_core.runnables import RunnableConfig
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from governor import RunGovernor
+    from connections import ConnectionPools
 
-def initialize_model(google_api_key: str) -> ChatGoogleGenerativeAI:
-    """Initialize the Google Generative AI model with enhanced configuration."""
+# Imported by warm_up() ahead of the first generation
+HEAVY_MODULES = (
+    "langchain_core.messages",
+    "langchain_core.runnables",
+    "langgraph.prebuilt",
+    "langchain_mcp_adapters.client",
+    "langchain_google_genai",
+    "connections",
+    "callbacks",
+    "compaction",
+    "governor",
+    "pipeline",
+    "revision"
+)
+
+ENGINES = ("react", "pipeline")
+
+agent_pool = AgentPool(
+    max_size=POOL_CONFIG["max_size"],
+    ttl_seconds=POOL_CONFIG["ttl_seconds"]
+)
+
+_result_cache: Optional[DiskCache] = None
+_history_store: Optional[HistoryStore] = None
+_tool_manifest_cache: Optional[ToolManifestCache] = None
+
+# Background manifest rediscoveries in flight, keyed by server URL
+_manifest_refreshes: Dict[str, asyncio.Task] = {}
+
+tool_call_cache = ToolCallCache(
+    rules=TOOL_CACHE_CONFIG["rules"],
+    never_cache_pattern=TOOL_CACHE_CONFIG["never_cache_pattern"],
+    max_entries=TOOL_CACHE_CONFIG["max_entries"]
+)
+
+_message_compactor = None
+_connection_pools: Optional["ConnectionPools"] = None
+
+# Circuit breakers for MCP servers, keyed by server URL
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+# Model clients created ahead of time by warm_up(), keyed by API key fingerprint and tier
+_warm_models: Dict[Tuple[str, str], Any] = {}
+_warm_models_lock = threading.Lock()
+_warm_up_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+job_manager = JobManager(
+    max_concurrent=JOB_CONFIG["max_concurrent_jobs"],
+    max_queued=JOB_CONFIG["max_queued_jobs"],
+    max_finished=JOB_CONFIG["max_finished_jobs"]
+)
+
+# Identical generations in flight at the same time run once
+generation_flights = SingleFlight()
+
+server_probes = ServerProbes(
+    deadline_seconds=PROBE_CONFIG["deadline_seconds"],
+    ttl_seconds=PROBE_CONFIG["ttl_seconds"],
+    failure_ttl_seconds=PROBE_CONFIG["failure_ttl_seconds"]
+)
+
+# Optional process-wide rate limiters, set with configure_rate_limits()
+rate_limiters: Dict[str, Optional["InMemoryRateLimiter"]] = {"gemini": None, "mcp": None}
+
+def configure_rate_limits(
+    gemini_requests_per_second: Optional[float] = None,
+    mcp_requests_per_second: Optional[float] = None
+) -> None:
+    """
+    Limit the rate of model and MCP tool calls for this process.
+    Applies to agents set up afterwards, so call it before the first generation.
+    """
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    
+    rate_limiters["gemini"] = (
+        InMemoryRateLimiter(requests_per_second=gemini_requests_per_second)
+        if gemini_requests_per_second else None
+    )
+    rate_limiters["mcp"] = (
+        InMemoryRateLimiter(requests_per_second=mcp_requests_per_second)
+        if mcp_requests_per_second else None
+    )
+    agent_pool.invalidate()
+    with _warm_models_lock:
+        _warm_models.clear()
+
+def rate_limit_tools(tools: List[Any], limiter: "InMemoryRateLimiter") -> List[Any]:
+    """Return the tools with every call gated by the rate limiter."""
+    def _limited(tool):
+        original = getattr(tool, "coroutine", None)
+        if original is None:
+            return tool
+
+        async def limited_call(**arguments):
+            await limiter.aacquire()
+            return await original(**arguments)
+
+        return tool.model_copy(update={"coroutine": limited_call})
+    return [_limited(tool) for tool in tools]
+
+def get_message_compactor() -> Any:
+    """Return the process-wide tool-output compactor used as the agent's pre-model hook."""
+    global _message_compactor
+    if _message_compactor is None:
+        from compaction import MessageCompactor
+        
+        _message_compactor = MessageCompactor(
+            recent_tool_messages=COMPACTION_CONFIG["recent_tool_messages"],
+            max_tool_chars=COMPACTION_CONFIG["max_tool_chars"],
+            stale_tool_chars=COMPACTION_CONFIG["stale_tool_chars"],
+            chars_per_token=PROMPT_CONFIG["chars_per_token"]
+        )
+    return _message_compactor
+
+def get_connection_pools() -> "ConnectionPools":
+    """Return the process-wide keep-alive connection pools for MCP servers."""
+    global _connection_pools
+    if _connection_pools is None:
+        from connections import ConnectionPools
+        
+        _connection_pools = ConnectionPools(
+            max_connections=CONNECTION_POOL_CONFIG["max_connections"],
+            max_keepalive_connections=CONNECTION_POOL_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=CONNECTION_POOL_CONFIG["keepalive_expiry"],
+            connect_retries=CONNECTION_POOL_CONFIG["connect_retries"]
+        )
+    return _connection_pools
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Return the circuit breaker for an MCP server URL, creating it on first use."""
+    with _circuit_breakers_lock:
+        if url not in circuit_breakers:
+            circuit_breakers[url] = CircuitBreaker(
+                failure_threshold=RESILIENCE_CONFIG["failure_threshold"],
+                reset_timeout=RESILIENCE_CONFIG["reset_timeout_seconds"]
+            )
+        return circuit_breakers[url]
+
+def transient_errors() -> Tuple[type, ...]:
+    """Errors retried under the resilience policy: timeouts and connection failures, including httpx's."""
+    import httpx
+    
+    return TRANSIENT_ERRORS + (httpx.TransportError,)
+
+def is_transport_failure(error: BaseException) -> bool:
+    """True if a run failed on an MCP server connection rather than on the model or a tool."""
+    import httpx
+    
+    return is_transient(error, (httpx.TransportError,))
+
+async def call_server(server_name: str, url: str, call: Callable[[], Any], timeout_key: str = "call_timeout",
+                      retries: Optional[int] = None, hedge_after: Optional[float] = None) -> Any:
+    """Await call() under the server's timeout, retry and circuit breaker policy."""
+    policy = RESILIENCE_CONFIG["servers"][server_name]
+    return await call_with_policy(
+        call,
+        timeout=policy[timeout_key],
+        retries=policy["retries"] if retries is None else retries,
+        backoff_base=RESILIENCE_CONFIG["backoff_base_seconds"],
+        backoff_max=RESILIENCE_CONFIG["backoff_max_seconds"],
+        hedge_after=hedge_after,
+        breaker=get_circuit_breaker(url),
+        transient=transient_errors()
+    )
+
+def resilient_tools(tools: List[Any], server_name: str, url: str) -> List[Any]:
+    """
+    Return the server's tools with every call run under its resilience policy.
+    Write tools get a single attempt; read-only searches may be hedged.
+    """
+    policy = RESILIENCE_CONFIG["servers"][server_name]
+    
+    def _resilient(tool):
+        original = getattr(tool, "coroutine", None)
+        if original is None:
+            return tool
+        writes = re.search(TOOL_CACHE_CONFIG["never_cache_pattern"], tool.name, re.IGNORECASE) is not None
+        hedge = not writes and re.search(RESILIENCE_CONFIG["hedge_pattern"], tool.name, re.IGNORECASE) is not None
+        
+        async def resilient_call(**arguments):
+            return await call_server(
+                server_name,
+                url,
+                lambda: original(**arguments),
+                retries=0 if writes else None,
+                hedge_after=policy["hedge_after_seconds"] if hedge else None
+            )
+        
+        return tool.model_copy(update={"coroutine": resilient_call})
+    return [_resilient(tool) for tool in tools]
+
+def degrade_open_circuits(
+    status_report: Dict[str, Any],
+    server_urls: Dict[str, Optional[str]],
+    progress_callback: Optional[ProgressCallback] = None
+) -> None:
+    """Mark optional servers whose circuit is open as unavailable, so the run uses YouTube-only mode."""
+    if not RESILIENCE_CONFIG["enabled"]:
+        return
+    for server_name, url in server_urls.items():
+        if not url or not status_report.get(f"{server_name}_available"):
+            continue
+        if get_circuit_breaker(url).state == "open":
+            status_report[f"{server_name}_available"] = False
+            status_report.setdefault("degraded", []).append(server_name)
+            emit(progress_callback, "mode", f"{TOOL_CONFIG[server_name]['name']} is failing; continuing without it...")
+
+def select_agent_tier(messages: List[Any]) -> str:
+    """
+    Pick the model tier for the ReAct agent's next turn. Turns that search for videos
+    use the tool-calling tier; once a search has been made for every day of the goal,
+    or a document or playlist is being saved, the turns write the learning path itself
+    and use the synthesis tier. Goals without a stated duration use the synthesis tier.
+    """
+    goal = next((message.content for message in messages if getattr(message, "type", None) == "human"), "")
+    match = re.search(r"User Goal:\s*(.+)", goal if isinstance(goal, str) else "")
+    days = estimate_days(match.group(1) if match else "", default=0)
+    tool_names = [getattr(message, "name", None) or "" for message in messages if getattr(message, "type", None) == "tool"]
+    searches = sum(1 for name in tool_names if "search" in name.lower())
+    saving = any(re.search(TOOL_CACHE_CONFIG["never_cache_pattern"], name, re.IGNORECASE) for name in tool_names)
+    if not days or searches >= days or saving:
+        return "synthesis"
+    return "tool_calling"
+
+def create_agent(models: Dict[str, Any], tools: List[Any]) -> Any:
+    """
+    Create the ReAct agent, compacting tool outputs before each model turn if enabled.
+    Each turn runs on the tier select_agent_tier() picks, so the search turns use the
+    cheap tool-calling model and the write-up uses the synthesis model.
+    """
+    from langgraph.prebuilt import create_react_agent
+    
+    bound = {tier: models[tier].bind_tools(tools) for tier in ("tool_calling", "synthesis")}
+    
+    def route_model(state: Any, runtime: Any = None) -> Any:
+        messages = state["messages"] if isinstance(state, dict) else state.messages
+        return bound[select_agent_tier(messages)]
+    
+    if COMPACTION_CONFIG["enabled"]:
+        return create_react_agent(route_model, tools, pre_model_hook=get_message_compactor())
+    return create_react_agent(route_model, tools)
+
+def initialize_model(google_api_key: str, tier: str = "tool_calling") -> "ChatGoogleGenerativeAI":
+    """
+    Initialize the Google Generative AI model for one of the MODEL_CONFIG tiers.
+    Reuses the client warm_up() created for this key and tier, if any.
+    """
+    if tier not in MODEL_CONFIG["tiers"]:
+        raise ValueError(f"Unknown model tier: {tier}")
+    with _warm_models_lock:
+        model = _warm_models.pop((fingerprint_api_key(google_api_key), tier), None)
+    if model is not None:
+        return model
+    
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
     return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
         google_api_key=google_api_key,
-        temperature=0.7,
-        max_tokens=4000
+        rate_limiter=rate_limiters["gemini"],
+        **MODEL_CONFIG["tiers"][tier]
     )
 
+def initialize_models(google_api_key: str) -> Dict[str, Any]:
+    """Initialize one model per MODEL_CONFIG tier, keyed by tier name."""
+    return {tier: initialize_model(google_api_key, tier) for tier in MODEL_CONFIG["tiers"]}
+
+def warm_up(google_api_key: Optional[str] = None) -> Dict[str, float]:
+    """
+    Import the generation dependencies and, given an API key, create its model clients
+    ahead of the first generation. Returns the seconds spent on each step.
+    """
+    timings = {}
+    for module_name in HEAVY_MODULES:
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        timings[module_name] = round(time.perf_counter() - started, 4)
+    
+    if google_api_key:
+        fingerprint = fingerprint_api_key(google_api_key)
+        for tier in MODEL_CONFIG["tiers"]:
+            key = (fingerprint, tier)
+            with _warm_models_lock:
+                warmed = key in _warm_models
+            if not warmed:
+                started = time.perf_counter()
+                model = initialize_model(google_api_key, tier)
+                with _warm_models_lock:
+                    _warm_models[key] = model
+                timings[f"model_client.{tier}"] = round(time.perf_counter() - started, 4)
+    return timings
+
+def start_warm_up(google_api_key: Optional[str] = None) -> concurrent.futures.Future:
+    """Run warm_up() on a background thread and return its future."""
+    global _warm_up_executor
+    if _warm_up_executor is None:
+        _warm_up_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-up")
+    return _warm_up_executor.submit(warm_up, google_api_key)
+
 def validate_url(url: str) -> bool:
     """Validate if a URL is properly formatted."""
     if not url:
@@ -34,24 +352,193 @@ def validate_url(url: str) -> bool:
         r'(?:/?|[/?]\S+)$', re.IGNORECASE)
     return bool(url_pattern.match(url))
 
-def extract_tool_names(tools: List[Dict]) -> List[str]:
-    """Extract tool names from the tools list."""
+def extract_tool_names(tools: List[Any]) -> List[str]:
+    """Extract tool names from the tools list (LangChain tools or plain dicts)."""
     tool_names = []
     for tool in tools:
-        if 'name' in tool:
-            tool_names.append(tool['name'])
+        if isinstance(tool, dict):
+            if 'name' in tool:
+                tool_names.append(tool['name'])
+        elif getattr(tool, 'name', None):
+            tool_names.append(tool.name)
     return tool_names
 
-async def setup_agent_with_tools(
+def get_tool_manifest_cache() -> ToolManifestCache:
+    """Return the on-disk tool manifest cache, opening it on first use."""
+    global _tool_manifest_cache
+    if _tool_manifest_cache is None:
+        _tool_manifest_cache = ToolManifestCache(
+            TOOL_MANIFEST_CONFIG["path"],
+            ttl_seconds=TOOL_MANIFEST_CONFIG["ttl_seconds"],
+            refresh_after_seconds=TOOL_MANIFEST_CONFIG["refresh_after_seconds"],
+            max_entries=TOOL_MANIFEST_CONFIG["max_entries"]
+        )
+    return _tool_manifest_cache
+
+async def discover_server_tools(mcp_client: Any, server_name: str, url: str) -> List[Any]:
+    """Ask one MCP server for its tools and record its manifest."""
+    tools = await mcp_client.get_tools(server_name=server_name)
+    if TOOL_MANIFEST_CONFIG["enabled"]:
+        try:
+            if get_tool_manifest_cache().put(url, tool_manifest(tools)):
+                # Pooled agents were built from the old schemas
+                agent_pool.invalidate()
+        except Exception as e:
+            print(f"Tool manifest cache write failed: {str(e)}")
+    return tools
+
+def _refresh_manifest(mcp_client: Any, server_name: str, url: str) -> None:
+    """Rediscover a server's tools in the background, at most once at a time per URL."""
+    if url in _manifest_refreshes:
+        return
+    
+    def _done(task: asyncio.Task) -> None:
+        _manifest_refreshes.pop(url, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Tool manifest refresh failed for {server_name}: {str(task.exception())}")
+    
+    task = asyncio.get_running_loop().create_task(discover_server_tools(mcp_client, server_name, url))
+    _manifest_refreshes[url] = task
+    task.add_done_callback(_done)
+
+def build_tools_config(
+    youtube_pipedream_url: Optional[str],
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Build the MCP connection config of every server with a valid URL."""
+    tools_config = {}
+    for server_name, url in (
+        ("youtube", youtube_pipedream_url), ("drive", drive_pipedream_url), ("notion", notion_pipedream_url)
+    ):
+        if url and validate_url(url):
+            tools_config[server_name] = {"url": url, "transport": "streamable_http"}
+    
+    # Share one keep-alive connection pool per server across all of its sessions
+    if CONNECTION_POOL_CONFIG["enabled"]:
+        for server in tools_config.values():
+            server["httpx_client_factory"] = get_connection_pools().client_factory(server["url"])
+    if RESILIENCE_CONFIG["enabled"]:
+        for server_name, server in tools_config.items():
+            server["timeout"] = timedelta(seconds=RESILIENCE_CONFIG["servers"][server_name]["connect_timeout"])
+    return tools_config
+
+def start_server_probe(
+    youtube_pipedream_url: Optional[str],
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None
+) -> None:
+    """Start discovering every configured server in the background, each independently."""
+    if not PROBE_CONFIG["enabled"]:
+        return
+    
+    async def _discover(server_name: str, connection: Dict[str, Any]) -> List[Any]:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        
+        return await discover_with_policy(MultiServerMCPClient({server_name: connection}), server_name, connection)
+    
+    server_probes.start(build_tools_config(youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url), _discover)
+
+def get_server_probe_status(
+    youtube_pipedream_url: Optional[str],
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Return the startup probe results so far ("status", "latency_ms", "tools", "error") per server."""
+    return server_probes.status({
+        "youtube": youtube_pipedream_url, "drive": drive_pipedream_url, "notion": notion_pipedream_url
+    })
+
+async def discover_with_policy(mcp_client: Any, server_name: str, connection: Dict[str, Any]) -> List[Any]:
+    """Discover a server's tools under its resilience policy, if enabled."""
+    if not RESILIENCE_CONFIG["enabled"]:
+        return await discover_server_tools(mcp_client, server_name, connection["url"])
+    return await call_server(
+        server_name,
+        connection["url"],
+        lambda: discover_server_tools(mcp_client, server_name, connection["url"]),
+        timeout_key="discovery_timeout"
+    )
+
+async def load_server_tools(
+    mcp_client: Any,
+    tools_config: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[str, List[Any]], Dict[str, int], Dict[str, Dict[str, Any]]]:
+    """
+    Return each configured server's tools, indexed by server name, manifest cache hit/miss
+    counts, and a per-server report of where its tools came from, latency and any error.
+    Servers answered by the startup probe are not discovered again. Cached manifests
+    skip discovery; stale ones are served and rediscovered in the background.
+    With persistent sessions, the tools call through each server's long-lived session.
+    An optional server that fails discovery or its probe, or whose circuit is open, gets no tools.
+    """
+    stats = {"hits": 0, "misses": 0}
+    servers: Dict[str, Dict[str, Any]] = {}
+    
+    async def _load(server_name: str, connection: Dict[str, Any]) -> List[Any]:
+        required = TOOL_CONFIG.get(server_name, {}).get("required", True)
+        if RESILIENCE_CONFIG["enabled"] and get_circuit_breaker(connection["url"]).state == "open":
+            raise CircuitOpenError(f"{server_name} circuit open after repeated failures")
+        if PROBE_CONFIG["enabled"]:
+            probe = await server_probes.wait(connection["url"])
+            if probe is not None and probe.status == "ok":
+                servers[server_name].update(source="probe", latency_ms=probe.latency_ms)
+                return probe.tools
+            if probe is not None and not required:
+                raise RuntimeError(probe.error or "no answer before the probe deadline")
+        if TOOL_MANIFEST_CONFIG["enabled"]:
+            try:
+                entry = get_tool_manifest_cache().get(connection["url"])
+                if entry is not None:
+                    tools = tools_from_manifest(entry["tools"], connection)
+                    stats["hits"] += 1
+                    servers[server_name]["source"] = "manifest"
+                    if entry["stale"]:
+                        _refresh_manifest(mcp_client, server_name, connection["url"])
+                    return tools
+            except Exception as e:
+                print(f"Tool manifest cache read failed: {str(e)}")
+        stats["misses"] += 1
+        servers[server_name]["source"] = "discovery"
+        return await discover_with_policy(mcp_client, server_name, connection)
+    
+    async def _load_timed(server_name: str, connection: Dict[str, Any]) -> List[Any]:
+        servers[server_name] = {"available": False, "source": None, "latency_ms": None, "tools": 0, "error": None}
+        started = time.perf_counter()
+        try:
+            tools = await _load(server_name, connection)
+        except Exception as e:
+            if TOOL_CONFIG.get(server_name, {}).get("required", True):
+                raise
+            servers[server_name]["error"] = str(e) or type(e).__name__
+            tools = []
+        if tools and CONNECTION_POOL_CONFIG["enabled"] and CONNECTION_POOL_CONFIG["persistent_sessions"]:
+            # Call through the server's long-lived session rather than one session per call
+            tools = tools_from_manifest(
+                tool_manifest(tools), session=get_connection_pools().session(connection["url"], connection)
+            )
+        report = servers[server_name]
+        if report["latency_ms"] is None:
+            report["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        report["available"] = len(tools) > 0
+        report["tools"] = len(tools)
+        return tools
+    
+    server_tools = await asyncio.gather(
+        *(_load_timed(name, connection) for name, connection in tools_config.items())
+    )
+    return dict(zip(tools_config, server_tools)), stats, servers
+
+async def setup_tools_and_model(
     google_api_key: str,
     youtube_pipedream_url: str,
     drive_pipedream_url: Optional[str] = None,
     notion_pipedream_url: Optional[str] = None,
-    progress_callback: Optional[Callable[[str], None]] = None
-) -> Tuple[Any, Dict[str, Any]]:
+    progress_callback: Optional[ProgressCallback] = None
+) -> Tuple[List[Any], Any, Dict[str, Any]]:
     """
-    Set up the agent with YouTube (mandatory) and optional Drive or Notion tools.
-    Returns the agent and a status report.
+    Discover YouTube (mandatory) and optional Drive or Notion tools and initialize the models.
+    Returns the tools, the models by tier and a status report.
     """
     status_report = {
         "youtube_available": False,
@@ -62,83 +549,221 @@ async def setup_agent_with_tools(
     }
     
     try:
-        if progress_callback:
-            progress_callback("Setting up agent with tools... ✅")
+        emit(progress_callback, "setup", "Setting up agent with tools... ✅")
         
         # Validate YouTube URL (mandatory)
         if not validate_url(youtube_pipedream_url):
             raise ValueError("Invalid YouTube Pipedream URL provided")
         
-        # Initialize tools configuration with mandatory YouTube
-        tools_config = {
-            "youtube": {
-                "url": youtube_pipedream_url,
-                "transport": "streamable_http"
-            }
-        }
-
-        # Add Drive if URL provided and valid
-        if drive_pipedream_url and validate_url(drive_pipedream_url):
-            tools_config["drive"] = {
-                "url": drive_pipedream_url,
-                "transport": "streamable_http"
-            }
-            if progress_callback:
-                progress_callback("Added Google Drive integration... ✅")
-
-        # Add Notion if URL provided and valid
-        if notion_pipedream_url and validate_url(notion_pipedream_url):
-            tools_config["notion"] = {
-                "url": notion_pipedream_url,
-                "transport": "streamable_http"
-            }
-            if progress_callback:
-                progress_callback("Added Notion integration... ✅")
-
-        if progress_callback:
-            progress_callback("Initializing MCP client... ✅")
+        # Initialize tools configuration with mandatory YouTube and Drive/Notion if provided and valid
+        tools_config = build_tools_config(youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url)
+        if "drive" in tools_config:
+            emit(progress_callback, "integration", "Added Google Drive integration... ✅")
+        if "notion" in tools_config:
+            emit(progress_callback, "integration", "Added Notion integration... ✅")
+        
+        emit(progress_callback, "setup", "Initializing MCP client... ✅")
         
         # Initialize MCP client with configured tools
-        mcp_client = MultiServerMCPClient(tools_config)
+        with span("mcp_client_init", servers=len(tools_config)):
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+            
+            mcp_client = MultiServerMCPClient(tools_config)
         
-        if progress_callback:
-            progress_callback("Getting available tools... ✅")
+        emit(progress_callback, "setup", "Getting available tools... ✅")
         
-        # Get all tools and validate them
-        tools = await mcp_client.get_tools()
-        tool_names = extract_tool_names(tools)
-        status_report["available_tools"] = tool_names
+        # Get all tools, indexed by the server they came from
+        with span("get_tools", kind="client", servers=len(tools_config)) as attributes:
+            tools_by_server, manifest_stats, servers = await load_server_tools(mcp_client, tools_config)
+            tools = [tool for server_tools in tools_by_server.values() for tool in server_tools]
+            attributes["tools"] = len(tools)
+            attributes["manifest_hits"] = manifest_stats["hits"]
+        status_report["tool_manifest"] = manifest_stats
+        status_report["servers"] = servers
+        
+        # Continue without optional servers that are down rather than failing the run
+        for server_name, report in servers.items():
+            if report["error"] is None:
+                continue
+            status_report["errors"].append(f"{TOOL_CONFIG[server_name]['name']} unavailable: {report['error']}")
+            status_report.setdefault("degraded", []).append(server_name)
+            emit(
+                progress_callback,
+                "integration",
+                f"{TOOL_CONFIG[server_name]['name']} is unavailable; continuing without it..."
+            )
         
         # Check which tools are actually available
-        youtube_tools = [tool for tool in tool_names if 'youtube' in tool.lower()]
-        drive_tools = [tool for tool in tool_names if 'drive' in tool.lower() or 'google' in tool.lower()]
-        notion_tools = [tool for tool in tool_names if 'notion' in tool.lower()]
+        status_report["youtube_available"] = len(tools_by_server.get("youtube", [])) > 0
+        status_report["drive_available"] = len(tools_by_server.get("drive", [])) > 0
+        status_report["notion_available"] = len(tools_by_server.get("notion", [])) > 0
         
-        status_report["youtube_available"] = len(youtube_tools) > 0
-        status_report["drive_available"] = len(drive_tools) > 0
-        status_report["notion_available"] = len(notion_tools) > 0
+        # Bind only the tools this mode needs, so unused schemas are not sent on every turn
+        if TOOL_SELECTION_CONFIG["enabled"]:
+            mode = "full" if status_report["drive_available"] or status_report["notion_available"] else "youtube_only"
+            with span("tool_selection", mode=mode) as attributes:
+                tools_by_server, selection_report = select_tools(
+                    tools_by_server,
+                    TOOL_SELECTION_CONFIG["modes"][mode],
+                    max_tools_per_server=TOOL_SELECTION_CONFIG["max_tools_per_server"],
+                    chars_per_token=PROMPT_CONFIG["chars_per_token"]
+                )
+                tools = [tool for server_tools in tools_by_server.values() for tool in server_tools]
+                attributes["tools"] = len(tools)
+                attributes["schema_tokens_removed"] = selection_report["schema_tokens_removed"]
+            status_report["tool_selection"] = {"mode": mode, **selection_report}
+        tool_names = extract_tool_names(tools)
+        status_report["available_tools"] = tool_names
         
-        if progress_callback:
-            progress_callback(f"Available tools: {', '.join(tool_names)}")
+        # Gate calls by the rate limiter, then run them under each server's resilience policy
+        for server_name, server_tools in tools_by_server.items():
+            if rate_limiters["mcp"] is not None:
+                server_tools = rate_limit_tools(server_tools, rate_limiters["mcp"])
+            if RESILIENCE_CONFIG["enabled"]:
+                server_tools = resilient_tools(server_tools, server_name, tools_config[server_name]["url"])
+            tools_by_server[server_name] = server_tools
+        tools = [tool for server_tools in tools_by_server.values() for tool in server_tools]
         
-        if progress_callback:
-            progress_callback("Creating AI agent... ✅")
+        # Memoize read-only tool calls; non-shared results are scoped to these servers
+        if TOOL_CACHE_CONFIG["enabled"]:
+            scope = make_cache_key(sorted(server["url"] for server in tools_config.values()))
+            tools = tool_call_cache.wrap_tools(tools, scope=scope)
         
-        # Create agent with initialized model
-        mcp_orch_model = initialize_model(google_api_key)
-        agent = create_react_agent(mcp_orch_model, tools)
+        status_report["tool_servers"] = {
+            name: server for server, server_tools in tools_by_server.items()
+            for name in extract_tool_names(server_tools)
+        }
+        
+        emit(progress_callback, "tools", f"Available tools: {', '.join(tool_names)}")
         
-        if progress_callback:
-            progress_callback("Setup complete! Starting to generate learning path... ✅")
+        emit(progress_callback, "agent", "Creating AI agent... ✅")
         
-        return agent, status_report
+        with span("model_init", tiers=len(MODEL_CONFIG["tiers"])):
+            models = initialize_models(google_api_key)
+        status_report["models"] = {tier: settings["model"] for tier, settings in MODEL_CONFIG["tiers"].items()}
+        return tools, models, status_report
         
     except Exception as e:
-        error_msg = f"Error in setup_agent_with_tools: {str(e)}"
+        error_msg = f"Error in setup_tools_and_model: {str(e)}"
         status_report["errors"].append(error_msg)
         print(error_msg)
         raise
 
+async def setup_agent_with_tools(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    progress_callback: Optional[ProgressCallback] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Set up the agent with YouTube (mandatory) and optional Drive or Notion tools.
+    Returns the agent and a status report.
+    """
+    tools, models, status_report = await setup_tools_and_model(
+        google_api_key=google_api_key,
+        youtube_pipedream_url=youtube_pipedream_url,
+        drive_pipedream_url=drive_pipedream_url,
+        notion_pipedream_url=notion_pipedream_url,
+        progress_callback=progress_callback
+    )
+    
+    # Create agent with the tool-calling model
+    with span("agent_create", tools=len(tools)):
+        agent = create_agent(models, tools)
+    
+    emit(progress_callback, "agent", "Setup complete! Starting to generate learning path... ✅")
+    
+    return agent, status_report
+
+async def get_or_create_setup(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    use_pool: bool = True
+) -> Tuple[PooledAgent, Dict[str, Any]]:
+    """
+    Return the pooled agent, tools and models for this configuration, setting them up on a miss.
+    The returned status report is a per-run copy of the pooled one.
+    """
+    key = make_pool_key(google_api_key, youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url)
+
+    if use_pool:
+        entry = agent_pool.get(key)
+        if entry is not None:
+            emit(progress_callback, "tools", f"Available tools: {', '.join(entry.status_report['available_tools'])}")
+            emit(progress_callback, "agent", "Reusing configured agent... ✅")
+            emit(progress_callback, "agent", "Setup complete! Starting to generate learning path... ✅")
+            status_report = copy.deepcopy(entry.status_report)
+            status_report["agent_reused"] = True
+            return entry, status_report
+
+    tools, models, status_report = await setup_tools_and_model(
+        google_api_key=google_api_key,
+        youtube_pipedream_url=youtube_pipedream_url,
+        drive_pipedream_url=drive_pipedream_url,
+        notion_pipedream_url=notion_pipedream_url,
+        progress_callback=progress_callback
+    )
+    with span("agent_create", tools=len(tools)):
+        agent = create_agent(models, tools)
+    emit(progress_callback, "agent", "Setup complete! Starting to generate learning path... ✅")
+
+    # A degraded setup is not pooled, so the next run tries the missing servers again
+    if use_pool and not status_report.get("degraded"):
+        entry = agent_pool.put(key, agent, copy.deepcopy(status_report), tools=tools, models=models)
+    else:
+        entry = PooledAgent(agent=agent, status_report=status_report, tools=tools, models=models)
+    status_report["agent_reused"] = False
+    return entry, status_report
+
+async def get_or_create_agent(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    use_pool: bool = True
+) -> Tuple[Any, Dict[str, Any]]:
+    """Return a pooled agent and a per-run status report for this configuration."""
+    entry, status_report = await get_or_create_setup(
+        google_api_key=google_api_key,
+        youtube_pipedream_url=youtube_pipedream_url,
+        drive_pipedream_url=drive_pipedream_url,
+        notion_pipedream_url=notion_pipedream_url,
+        progress_callback=progress_callback,
+        use_pool=use_pool
+    )
+    return entry.agent, status_report
+
+def invalidate_agent_pool(
+    google_api_key: Optional[str] = None,
+    youtube_pipedream_url: Optional[str] = None,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    close_connections: bool = False
+) -> int:
+    """
+    Drop the pooled agent for a configuration, or every pooled agent if none is given.
+    Cached tool manifests and probe results for the given server URLs are dropped too,
+    so tools are rediscovered. Their connection pools and sessions are shared by every
+    run, so they are only closed when close_connections is set.
+    """
+    for url in (youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url):
+        if not url:
+            continue
+        server_probes.invalidate(url)
+        if TOOL_MANIFEST_CONFIG["enabled"]:
+            get_tool_manifest_cache().invalidate(url)
+        if close_connections and _connection_pools is not None:
+            _connection_pools.close(url)
+    if google_api_key is None and youtube_pipedream_url is None:
+        return agent_pool.invalidate()
+    key = make_pool_key(google_api_key or "", youtube_pipedream_url or "", drive_pipedream_url, notion_pipedream_url)
+    return agent_pool.invalidate(key)
+
 def create_fallback_prompt(user_goal: str, available_tools: List[str]) -> str:
     """Create a fallback prompt when document creation tools are unavailable."""
     base_prompt = f"""
@@ -174,78 +799,723 @@ Format the response as:
 """
     return base_prompt
 
-def run_agent_sync(
+def get_result_cache() -> DiskCache:
+    """Return the on-disk learning path cache, opening it on first use."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = DiskCache(
+            CACHE_CONFIG["result_cache_path"],
+            max_entries=CACHE_CONFIG["result_max_entries"],
+            ttl_seconds=CACHE_CONFIG["result_ttl_seconds"]
+        )
+    return _result_cache
+
+def get_history_store() -> HistoryStore:
+    """Return the on-disk learning path history, opening it on first use."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(HISTORY_CONFIG["path"], max_entries=HISTORY_CONFIG["max_entries"])
+    return _history_store
+
+def result_cache_key(
+    user_goal: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    engine: str = "react"
+) -> str:
+    """
+    Build the result cache key from the normalized goal, mode, engine and model tier settings.
+    YouTube-only results are shared; full-mode results also write a Drive/Notion
+    document, so they are scoped to the destination URL.
+    """
+    if drive_pipedream_url or notion_pipedream_url:
+        mode = "full"
+        destination = fingerprint_api_key((drive_pipedream_url or "") + "|" + (notion_pipedream_url or ""))
+    else:
+        mode = "youtube_only"
+        destination = ""
+    return make_cache_key(normalize_goal(user_goal), mode, destination, engine, MODEL_CONFIG["tiers"])
+
+def load_cached_result(cache_key: str) -> Optional[dict]:
+    """Return a cached result with its learning path rehydrated, or None."""
+    try:
+        cached = get_result_cache().get(cache_key)
+    except Exception as e:
+        print(f"Result cache read failed: {str(e)}")
+        return None
+    if cached is None:
+        return None
+    status_report = cached["status_report"]
+    status_report["cache_hit"] = True
+    if "learning_path" in cached:
+        learning_path = LearningPath.from_dict(cached["learning_path"])
+    else:
+        # Entries written before results were structured hold the raw messages
+        from langchain_core.messages import messages_from_dict
+        
+        learning_path = learning_path_from_messages(messages_from_dict(cached["messages"]))
+    return {"learning_path": learning_path, "status_report": status_report}
+
+def store_cached_result(cache_key: str, result: dict) -> None:
+    """Persist a successful result's learning path and status report in the result cache."""
+    try:
+        get_result_cache().set(cache_key, {
+            "learning_path": result["learning_path"].to_dict(),
+            "status_report": result["status_report"]
+        })
+    except Exception as e:
+        print(f"Result cache write failed: {str(e)}")
+
+def create_run_governor(user_goal: str) -> "RunGovernor":
+    """Create the run governor for a goal, with a step budget scaled to the plan's days."""
+    from governor import RunGovernor, step_budget
+    
+    return RunGovernor(
+        max_steps=step_budget(
+            estimate_days(user_goal),
+            base_steps=GOVERNOR_CONFIG["base_steps"],
+            steps_per_day=GOVERNOR_CONFIG["steps_per_day"],
+            max_steps=GOVERNOR_CONFIG["max_steps"]
+        ),
+        deadline_seconds=GOVERNOR_CONFIG["deadline_seconds"],
+        max_repeated_tool_calls=GOVERNOR_CONFIG["max_repeated_tool_calls"]
+    )
+
+def traced_run_config(
+    trace: RunTrace,
+    status_report: Dict[str, Any],
+    governor: "RunGovernor",
+    progress_callback: Optional[ProgressCallback] = None,
+    expected_steps: int = 0
+) -> "RunnableConfig":
+    """
+    Return the agent run config with the governor's limits, a callback that times LLM
+    turns and tool calls, and one that reports agent-loop progress when a progress
+    callback is given.
+    """
+    from langchain_core.runnables import RunnableConfig
+    from callbacks import TimingCallbackHandler, AgentProgressHandler
+    
+    callbacks = [governor, TimingCallbackHandler(trace, status_report.get("tool_servers"))]
+    if progress_callback:
+        callbacks.append(AgentProgressHandler(progress_callback, expected_steps))
+    return RunnableConfig(recursion_limit=governor.recursion_limit, callbacks=callbacks)
+
+def learning_path_from_run(result: dict) -> LearningPath:
+    """
+    Parse a run's learning path and record on each day the video search that found
+    its videos, so regenerating the day can search differently. Pipeline runs know
+    each day's search; ReAct runs are matched by position when they made exactly
+    one search per day.
+    """
+    learning_path = learning_path_from_messages(result["messages"])
+    if "plan" in result:
+        searches = {day["day"]: day.get("search", {}) for day in result["plan"]["days"]}
+    else:
+        calls = [
+            {"tool": call["name"], "arguments": call["args"]}
+            for message in result["messages"] if getattr(message, "type", None) == "ai"
+            for call in getattr(message, "tool_calls", None) or []
+            if "search" in call["name"].lower()
+        ]
+        searches = dict(enumerate(calls, start=1)) if len(calls) == len(learning_path.days) else {}
+    for day in learning_path.days:
+        day.search = searches.get(day.number, {})
+    return learning_path
+
+def record_stop(governor: "RunGovernor", error: Exception) -> None:
+    """Record on the governor why a run stopped: its deadline, the graph's recursion limit or its own limits."""
+    from langgraph.errors import GraphRecursionError
+    
+    if isinstance(error, asyncio.TimeoutError):
+        governor.stop(f"deadline of {governor.deadline_seconds:.0f}s reached")
+    elif isinstance(error, GraphRecursionError):
+        governor.stop(f"recursion limit of {governor.recursion_limit} graph steps reached")
+    else:
+        governor.stop(str(error))
+
+def stopped_run_result(user_goal: str, governor: "RunGovernor", error: Exception) -> dict:
+    """Return a result holding the best partial learning path from a run the governor stopped."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from governor import partial_learning_path
+    
+    record_stop(governor, error)
+    return {
+        "messages": [
+            HumanMessage(content=f"User Goal: {user_goal}"),
+            AIMessage(content=partial_learning_path(governor.messages, governor.stop_reason))
+        ]
+    }
+
+def record_prompt_cost(status_report: Dict[str, Any]) -> None:
+    """
+    Add the prompt's total input-token cost for the run: the ReAct loop re-sends
+    the prompt on every model turn, so the cost scales with the number of turns.
+    The tool schema tokens removed by tool selection are scaled the same way.
+    """
+    prompt_report = status_report.get("prompt")
+    performance = status_report.get("performance")
+    if not prompt_report or not performance:
+        return
+    llm_turns = performance["phases"].get("llm_turn", {}).get("count", 0)
+    prompt_report["llm_turns"] = llm_turns
+    prompt_report["run_tokens"] = prompt_report["tokens"] * max(llm_turns, 1)
+    selection_report = status_report.get("tool_selection")
+    if selection_report:
+        # Tool schemas are sent with every model turn as well
+        selection_report["run_tokens_removed"] = selection_report["schema_tokens_removed"] * max(llm_turns, 1)
+
+def finish_trace(trace: RunTrace) -> Dict[str, Any]:
+    """Summarize a run's timings and export its spans if an export path is configured."""
+    if TELEMETRY_CONFIG["spans_export_path"]:
+        try:
+            export_spans(trace, TELEMETRY_CONFIG["spans_export_path"])
+        except Exception as e:
+            print(f"Span export failed: {str(e)}")
+    return trace.to_dict()
+
+def select_learning_path_prompt(
+    user_goal: str,
+    status_report: Dict[str, Any],
+    progress_callback: Optional[ProgressCallback] = None
+) -> str:
+    """
+    Pick the full or YouTube-only prompt based on the available tools.
+    The prompt's token cost is recorded in status_report["prompt"].
+    """
+    # Determine which prompt to use based on available tools
+    if status_report["drive_available"] or status_report["notion_available"]:
+        # Use full prompt with document creation, trimmed to the token budget
+        learning_path_prompt, prompt_report = build_learning_path_prompt(
+            user_goal,
+            "full",
+            token_budget=PROMPT_CONFIG["input_token_budget"],
+            chars_per_token=PROMPT_CONFIG["chars_per_token"]
+        )
+        emit(progress_callback, "mode", "Using full learning path generation with document creation...")
+    else:
+        # Use fallback prompt for YouTube-only functionality
+        learning_path_prompt = create_fallback_prompt(user_goal, status_report["available_tools"])
+        prompt_report = {
+            "mode": "youtube_only",
+            "sections": {},
+            "dropped": [],
+            "tokens": estimate_tokens(learning_path_prompt, PROMPT_CONFIG["chars_per_token"]),
+            "budget": PROMPT_CONFIG["input_token_budget"],
+            "over_budget": False
+        }
+        emit(progress_callback, "mode", "Using YouTube-only learning path generation...")
+    
+    status_report["prompt"] = prompt_report
+    emit(progress_callback, "generation", "Generating your learning path...")
+    return learning_path_prompt
+
+async def run_agent(
     google_api_key: str,
     youtube_pipedream_url: str,
     drive_pipedream_url: Optional[str] = None,
     notion_pipedream_url: Optional[str] = None,
     user_goal: str = "",
-    progress_callback: Optional[Callable[[str], None]] = None
+    progress_callback: Optional[ProgressCallback] = None,
+    use_pool: bool = True,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    engine: str = "react"
 ) -> dict:
     """
-    Synchronous wrapper for running the agent with enhanced error handling.
+    Generate a learning path on the current event loop.
+    Agents are reused from the agent pool unless use_pool is False. Results are
+    served from the on-disk cache unless use_cache is False; refresh_cache skips
+    the lookup but still stores the fresh result. engine selects the ReAct loop
+    ("react") or the plan-then-fan-out pipeline ("pipeline").
+    The result's "learning_path" is the parsed LearningPath; cached results
+    carry it without the run's "messages".
     """
-    async def _run():
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    trace = start_trace()
+    cache_key = result_cache_key(user_goal, drive_pipedream_url, notion_pipedream_url, engine)
+    if use_cache and not refresh_cache:
+        with span("result_cache_lookup"):
+            cached = load_cached_result(cache_key)
+        if cached is not None:
+            emit(progress_callback, "complete", "Loaded learning path from cache ✅")
+            emit(progress_callback, "complete", "Learning path generation complete!")
+            cached["status_report"]["performance"] = finish_trace(trace)
+            return cached
+
+    from langchain_core.messages import HumanMessage
+    from langgraph.errors import GraphRecursionError
+    from compaction import start_compaction_run
+    from governor import RunLimitExceeded
+    from pipeline import run_pipeline
+    from connections import start_connection_run
+
+    try:
+        connection_stats = start_connection_run()
+        resilience_stats = start_resilience_run()
+        entry, status_report = await get_or_create_setup(
+            google_api_key=google_api_key,
+            youtube_pipedream_url=youtube_pipedream_url,
+            drive_pipedream_url=drive_pipedream_url,
+            notion_pipedream_url=notion_pipedream_url,
+            progress_callback=progress_callback,
+            use_pool=use_pool
+        )
+        degrade_open_circuits(
+            status_report, {"drive": drive_pipedream_url, "notion": notion_pipedream_url}, progress_callback
+        )
+        
+        tool_cache_stats = start_tool_cache_run()
+        compaction_stats = start_compaction_run()
+        governor = create_run_governor(user_goal)
         try:
-            agent, status_report = await setup_agent_with_tools(
+            if engine == "pipeline":
+                full_mode = status_report["drive_available"] or status_report["notion_available"]
+                run = run_pipeline(
+                    planning_model=entry.models["planning"],
+                    synthesis_model=entry.models["synthesis"],
+                    tools=entry.tools,
+                    agent=entry.agent,
+                    user_goal=user_goal,
+                    status_report=status_report,
+                    output_format=full_output_format if full_mode else youtube_only_output_format,
+                    config=PIPELINE_CONFIG,
+                    agent_config=traced_run_config(trace, status_report, governor),
+                    progress_callback=progress_callback
+                )
+            else:
+                learning_path_prompt = select_learning_path_prompt(user_goal, status_report, progress_callback)
+                
+                # Run the agent
+                # Roughly one search turn per day plus document, playlist and final turns
+                run = entry.agent.ainvoke(
+                    {"messages": [HumanMessage(content=learning_path_prompt)]},
+                    config=traced_run_config(
+                        trace, status_report, governor, progress_callback, estimate_days(user_goal) + 3
+                    )
+                )
+            result = await asyncio.wait_for(run, timeout=governor.remaining())
+        except (RunLimitExceeded, GraphRecursionError, asyncio.TimeoutError) as e:
+            result = stopped_run_result(user_goal, governor, e)
+        result["learning_path"] = learning_path_from_run(result)
+        
+        if governor.stop_reason:
+            emit(progress_callback, "complete", f"Stopped early: {governor.stop_reason}")
+        else:
+            emit(progress_callback, "complete", "Learning path generation complete!")
+        
+        # Add status report to result
+        status_report["cache_hit"] = False
+        status_report["tool_cache"] = tool_cache_stats
+        status_report["compaction"] = compaction_stats
+        status_report["connections"] = connection_stats
+        status_report["resilience"] = resilience_stats
+        status_report["governor"] = governor.report()
+        status_report["performance"] = finish_trace(trace)
+        record_prompt_cost(status_report)
+        result["status_report"] = status_report
+        # Partial learning paths are not worth serving again, nor are YouTube-only
+        # fallbacks stored under the destination's key once its server recovers
+        if use_cache and not governor.stop_reason and not status_report.get("degraded"):
+            store_cached_result(cache_key, result)
+        return result
+        
+    except Exception as e:
+        error_msg = f"Error in run_agent: {str(e)}"
+        print(error_msg)
+        # A failed run may mean a stale MCP session or revoked key, so rebuild next time;
+        # shared connections are only replaced when a server connection itself failed
+        invalidate_agent_pool(
+            google_api_key, youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url,
+            close_connections=is_transport_failure(e)
+        )
+        raise
+
+async def stream_agent(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    user_goal: str = "",
+    use_pool: bool = True,
+    use_cache: bool = True,
+    refresh_cache: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate a learning path and yield events as they happen.
+
+    Each event is a dict with a "type" key:
+    - "progress": {"message", "event"} setup and mode updates as ProgressEvents
+    - "token": {"text"} a chunk of model output
+    - "tool_start": {"name", "input"} a tool call was issued
+    - "tool_end": {"name", "output"} a tool call returned
+    - "result": {"result"} the final agent state with its status_report
+    """
+    trace = start_trace()
+    cache_key = result_cache_key(user_goal, drive_pipedream_url, notion_pipedream_url)
+    if use_cache and not refresh_cache:
+        with span("result_cache_lookup"):
+            cached = load_cached_result(cache_key)
+        if cached is not None:
+            cached["status_report"]["performance"] = finish_trace(trace)
+            for message in ("Loaded learning path from cache ✅", "Learning path generation complete!"):
+                yield {"type": "progress", "message": message, "event": ProgressEvent("complete", message, 1.0)}
+            yield {"type": "result", "result": cached}
+            return
+
+    from langchain_core.messages import HumanMessage
+    from langgraph.errors import GraphRecursionError
+    from compaction import start_compaction_run
+    from governor import RunLimitExceeded
+    from connections import start_connection_run
+
+    progress_events: asyncio.Queue = asyncio.Queue()
+    
+    async def _setup() -> Tuple[Any, Dict[str, Any]]:
+        try:
+            return await get_or_create_agent(
                 google_api_key=google_api_key,
                 youtube_pipedream_url=youtube_pipedream_url,
                 drive_pipedream_url=drive_pipedream_url,
                 notion_pipedream_url=notion_pipedream_url,
-                progress_callback=progress_callback
+                progress_callback=progress_events.put_nowait,
+                use_pool=use_pool
             )
-            
-            # Determine which prompt to use based on available tools
-            if status_report["drive_available"] or status_report["notion_available"]:
-                # Use full prompt with document creation
-                learning_path_prompt = "User Goal: " + user_goal + "\n" + user_goal_prompt
-                if progress_callback:
-                    progress_callback("Using full learning path generation with document creation...")
-            else:
-                # Use fallback prompt for YouTube-only functionality
-                learning_path_prompt = create_fallback_prompt(user_goal, status_report["available_tools"])
-                if progress_callback:
-                    progress_callback("Using YouTube-only learning path generation...")
-            
-            if progress_callback:
-                progress_callback("Generating your learning path...")
-            
-            # Run the agent
-            result = await agent.ainvoke(
+        finally:
+            # Marks the end of the setup progress events
+            progress_events.put_nowait(None)
+    
+    try:
+        connection_stats = start_connection_run()
+        resilience_stats = start_resilience_run()
+        # Pass setup progress on as it happens rather than once setup has finished
+        setup = asyncio.ensure_future(_setup())
+        try:
+            while True:
+                progress_event = await progress_events.get()
+                if progress_event is None:
+                    break
+                yield {"type": "progress", "message": progress_event.message, "event": progress_event}
+            agent, status_report = await setup
+        finally:
+            setup.cancel()
+        degrade_open_circuits(
+            status_report, {"drive": drive_pipedream_url, "notion": notion_pipedream_url}, progress_events.put_nowait
+        )
+        learning_path_prompt = select_learning_path_prompt(user_goal, status_report, progress_events.put_nowait)
+        while not progress_events.empty():
+            progress_event = progress_events.get_nowait()
+            yield {"type": "progress", "message": progress_event.message, "event": progress_event}
+
+        result = None
+        tool_cache_stats = start_tool_cache_run()
+        compaction_stats = start_compaction_run()
+        # The deadline is enforced at model turns, since a timeout cannot span the yields below
+        governor = create_run_governor(user_goal)
+        try:
+            async for event in agent.astream_events(
                 {"messages": [HumanMessage(content=learning_path_prompt)]},
-                config=cfg
+                config=traced_run_config(trace, status_report, governor),
+                version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    text = content_text(event["data"]["chunk"].content)
+                    if text:
+                        yield {"type": "token", "text": text}
+                elif kind == "on_tool_start":
+                    yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    yield {"type": "tool_end", "name": event["name"], "output": getattr(output, "content", output)}
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"].get("output")
+        except (RunLimitExceeded, GraphRecursionError) as e:
+            result = stopped_run_result(user_goal, governor, e)
+
+        if not isinstance(result, dict):
+            raise RuntimeError("Agent stream ended without a final state")
+        result["learning_path"] = learning_path_from_run(result)
+
+        status_report["cache_hit"] = False
+        status_report["tool_cache"] = tool_cache_stats
+        status_report["compaction"] = compaction_stats
+        status_report["connections"] = connection_stats
+        status_report["resilience"] = resilience_stats
+        status_report["governor"] = governor.report()
+        status_report["performance"] = finish_trace(trace)
+        record_prompt_cost(status_report)
+        result["status_report"] = status_report
+        if use_cache and not governor.stop_reason and not status_report.get("degraded"):
+            store_cached_result(cache_key, result)
+        if governor.stop_reason:
+            message = f"Stopped early: {governor.stop_reason}"
+        else:
+            message = "Learning path generation complete!"
+        yield {"type": "progress", "message": message, "event": ProgressEvent("complete", message, 1.0)}
+        yield {"type": "result", "result": result}
+
+    except Exception as e:
+        error_msg = f"Error in stream_agent: {str(e)}"
+        print(error_msg)
+        invalidate_agent_pool(
+            google_api_key, youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url,
+            close_connections=is_transport_failure(e)
+        )
+        raise
+
+async def run_generation(
+    on_event: Callable[[Dict[str, Any]], None],
+    stream: bool = False,
+    **kwargs
+) -> dict:
+    """
+    Run a generation, or join an identical one already in flight in this process.
+    With stream=True it runs stream_agent and passes on its events (tokens and tool
+    calls); otherwise it runs run_agent and passes on its progress events. Both are
+    given to on_event as {"type": "progress", "message", "event"} style dicts, for
+    every caller sharing the execution. A shared result is a copy marked with
+    status_report["deduplicated"].
+    """
+    async def _generate(publish: Callable[[Dict[str, Any]], None], **overrides) -> dict:
+        run_kwargs = {**kwargs, **overrides}
+        if not stream:
+            return await run_agent(
+                progress_callback=lambda event: publish({"type": "progress", "message": event.message, "event": event}),
+                **run_kwargs
             )
-            
-            if progress_callback:
-                progress_callback("Learning path generation complete!")
-            
-            # Add status report to result
-            result["status_report"] = status_report
-            return result
-            
-        except Exception as e:
-            error_msg = f"Error in _run: {str(e)}"
-            print(error_msg)
-            raise
+        result = {}
+        async for event in stream_agent(**run_kwargs):
+            if event["type"] == "result":
+                result = event["result"]
+            else:
+                publish(event)
+        return result
+    
+    async def _locked(publish: Callable[[Dict[str, Any]], None]) -> dict:
+        # Serialize with identical generations in other worker processes on this host
+        lock = FileLock(
+            os.path.join(SINGLE_FLIGHT_CONFIG["lock_dir"], f"{key}.lock"),
+            poll_interval=SINGLE_FLIGHT_CONFIG["lock_poll_interval"]
+        )
+        
+        def _on_wait() -> None:
+            message = "Waiting for an identical generation in another worker..."
+            publish({"type": "progress", "message": message, "event": ProgressEvent("setup", message, 0.0)})
+        
+        try:
+            waited = await lock.acquire(on_wait=_on_wait)
+            # The other worker's result is in the result cache now, unless it failed
+            return await _generate(publish, refresh_cache=False) if waited else await _generate(publish)
+        finally:
+            lock.release()
+    
+    if not SINGLE_FLIGHT_CONFIG["enabled"]:
+        return await _generate(on_event)
+    # Only calls that would run the same agents against the same servers, with the
+    # same cache behaviour, can share an execution
+    key = make_cache_key(
+        make_pool_key(
+            kwargs.get("google_api_key", ""),
+            kwargs.get("youtube_pipedream_url", ""),
+            kwargs.get("drive_pipedream_url"),
+            kwargs.get("notion_pipedream_url")
+        ),
+        result_cache_key(
+            kwargs.get("user_goal", ""),
+            kwargs.get("drive_pipedream_url"),
+            kwargs.get("notion_pipedream_url"),
+            kwargs.get("engine", "react")
+        ),
+        kwargs.get("use_pool", True),
+        kwargs.get("use_cache", True),
+        kwargs.get("refresh_cache", False),
+        stream
+    )
+    result, joined = await generation_flights.run(
+        key, _locked if SINGLE_FLIGHT_CONFIG["file_lock"] else _generate, on_event
+    )
+    if joined:
+        result = copy.deepcopy(result)
+        result["status_report"]["deduplicated"] = True
+    return result
+
+def start_generation_job(stream: bool = False, **kwargs) -> str:
+    """
+    Start a generation as a background job and return its job id.
+    The job records the run_generation() events on job.events; identical jobs in
+    flight at the same time share one execution.
+    """
+    async def _generate(job: Job) -> dict:
+        result = await run_generation(job.publish, stream=stream, **kwargs)
+        # Pollers render from the parsed learning path, so finished jobs don't hold the raw messages
+        return {name: value for name, value in result.items() if name != "messages"}
+
+    return job_manager.submit(_generate)
+
+def get_generation_job(job_id: str) -> Optional[Job]:
+    return job_manager.get(job_id)
+
+def cancel_generation_job(job_id: str) -> bool:
+    """Cancel a generation job, interrupting any in-flight model or tool call."""
+    return job_manager.cancel(job_id)
+
+async def run_revision(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    user_goal: str = "",
+    learning_path: Optional[LearningPath] = None,
+    regenerate_days: Optional[List[int]] = None,
+    extend_days: int = 0,
+    feedback: str = "",
+    progress_callback: Optional[ProgressCallback] = None,
+    use_pool: bool = True
+) -> dict:
+    """
+    Regenerate individual days of a learning path and/or extend it by extend_days,
+    keeping every other day and its videos. Uses the pooled tools and models; a
+    regenerated day searches again with a query unlike the one recorded on it (see
+    learning_path_from_run) and leaves out the videos it has now.
+    The result is shaped like run_agent's, with status_report["revision"] describing
+    what was sent to the model. A revision the governor stops keeps the learning path
+    unchanged, with status_report["revision"] set to None. Revised paths are not
+    saved to Drive or Notion.
+    """
+    if learning_path is None or not learning_path.days:
+        raise ValueError("Only a learning path with parsed days can be revised")
+    trace = start_trace()
+
+    from governor import RunLimitExceeded
+    from pipeline import find_search_tool
+    from revision import revise_learning_path
+    from connections import start_connection_run
 
-    # Run in new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
     try:
-        return loop.run_until_complete(_run())
-    finally:
-        loop.close()
+        connection_stats = start_connection_run()
+        resilience_stats = start_resilience_run()
+        entry, status_report = await get_or_create_setup(
+            google_api_key=google_api_key,
+            youtube_pipedream_url=youtube_pipedream_url,
+            drive_pipedream_url=drive_pipedream_url,
+            notion_pipedream_url=notion_pipedream_url,
+            progress_callback=progress_callback,
+            use_pool=use_pool
+        )
+        search_tool = find_search_tool(entry.tools)
+        if search_tool is None:
+            raise ValueError("No YouTube search tool is available to revise the learning path")
+
+        tool_cache_stats = start_tool_cache_run()
+        governor = create_run_governor(user_goal)
+        full_mode = status_report["drive_available"] or status_report["notion_available"]
+        revision = revise_learning_path(
+            planning_model=entry.models["planning"],
+            synthesis_model=entry.models["synthesis"],
+            search_tool=search_tool,
+            learning_path=learning_path,
+            user_goal=user_goal,
+            output_format=full_output_format if full_mode else youtube_only_output_format,
+            config={**PIPELINE_CONFIG, **REVISION_CONFIG},
+            regenerate=regenerate_days,
+            extend=extend_days,
+            feedback=feedback,
+            agent_config=traced_run_config(trace, status_report, governor),
+            progress_callback=progress_callback
+        )
+        try:
+            revised_path, revision_report = await asyncio.wait_for(revision, timeout=governor.remaining())
+        except (RunLimitExceeded, asyncio.TimeoutError) as e:
+            # Days are only spliced in once all of them are written, so nothing changed
+            record_stop(governor, e)
+            revised_path, revision_report = learning_path, None
+
+        if governor.stop_reason:
+            emit(progress_callback, "complete", f"Stopped early: {governor.stop_reason}")
+        else:
+            emit(progress_callback, "complete", "Learning path updated!")
+
+        status_report["cache_hit"] = False
+        status_report["revision"] = revision_report
+        status_report["governor"] = governor.report()
+        status_report["tool_cache"] = tool_cache_stats
+        status_report["connections"] = connection_stats
+        status_report["resilience"] = resilience_stats
+        status_report["performance"] = finish_trace(trace)
+        # The revision prompts replace the generation prompt in the cost report
+        status_report.pop("prompt", None)
+        return {"learning_path": revised_path, "status_report": status_report}
+
+    except Exception as e:
+        error_msg = f"Error in run_revision: {str(e)}"
+        print(error_msg)
+        # As in run_agent: rebuild the agent next time, and replace shared connections
+        # only when a server connection itself failed
+        invalidate_agent_pool(
+            google_api_key, youtube_pipedream_url, drive_pipedream_url, notion_pipedream_url,
+            close_connections=is_transport_failure(e)
+        )
+        raise
+
+def start_revision_job(**kwargs) -> str:
+    """Start run_revision() as a background job and return its job id; progress goes to job.events."""
+    async def _revise(job: Job) -> dict:
+        return await run_revision(
+            progress_callback=lambda event: job.publish({"type": "progress", "message": event.message, "event": event}),
+            **kwargs
+        )
+
+    return job_manager.submit(_revise)
+
+def run_agent_sync(
+    google_api_key: str,
+    youtube_pipedream_url: str,
+    drive_pipedream_url: Optional[str] = None,
+    notion_pipedream_url: Optional[str] = None,
+    user_goal: str = "",
+    progress_callback: Optional[ProgressCallback] = None,
+    use_pool: bool = True,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    engine: str = "react",
+    timeout: Optional[float] = None
+) -> dict:
+    """
+    Synchronous wrapper for running the agent with enhanced error handling.
+    The run executes on the shared background event loop; progress messages are
+    relayed back to the calling thread so UI callbacks stay on the script thread.
+    Identical calls in flight at the same time share one execution.
+    """
+    relay = CallbackRelay(progress_callback)
+    
+    def _on_event(event: Dict[str, Any]) -> None:
+        if progress_callback and event["type"] == "progress":
+            relay(event["event"])
+    
+    return get_background_loop().run(
+        run_generation(
+            _on_event,
+            google_api_key=google_api_key,
+            youtube_pipedream_url=youtube_pipedream_url,
+            drive_pipedream_url=drive_pipedream_url,
+            notion_pipedream_url=notion_pipedream_url,
+            user_goal=user_goal,
+            use_pool=use_pool,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            engine=engine
+        ),
+        timeout=timeout,
+        relay=relay
+    )
 
 def format_learning_path_result(result: dict) -> str:
     """Format the learning path result for better display."""
-    if not result or "messages" not in result:
+    if not result or ("learning_path" not in result and "messages" not in result):
         return "No results were generated. Please try again."
     
-    formatted_result = ""
-    for msg in result["messages"]:
-        content = msg.content
-        # Clean up the content for better display
-        content = content.replace("📚", "").strip()
-        formatted_result += f"{content}\n\n"
-    
-    return formatted_result
+    learning_path = result.get("learning_path") or learning_path_from_messages(result["messages"])
+    # Clean up the content for better display
+    return learning_path.to_markdown().replace("📚", "").strip()